@@ -0,0 +1,210 @@
+'''
+Abstraction
+
+Summaries of the language of a regex that decide some checks without
+matching: the shortest and the longest match (None if unbounded), the match
+lengths modulo MODULUS, and the symbols that a nonempty match can start and
+end with. PartialRegexNode.summaries computes them bottom-up, and
+example_facts collects the same facts about a set of examples. Comparing the
+two can prove that a pattern rejects some example of a set, or all of them;
+when it cannot, the examples are matched as before.
+
+Summaries are tuples of ints, so the many kept on the nodes of seen states
+cost the garbage collector nothing. Lengths modulo MODULUS are a bitmask,
+and so are symbol sets: a bit per symbol (see _bit), ANY for '.' (every
+symbol but a newline) and EVERY for every symbol.
+
+A summary describes the tree's language. The pattern string of a tree can
+differ from it in two ways. First, to_str prints a leftover ε or ∅ as a
+literal symbol. Second, a union with ε prints as x? around its other side,
+which binds ? to the last unit of x when x is a union that printed without
+its parentheses (having an ε or ∅ side itself); such a union gets the summary
+ANYTHING. Every example without ε or ∅ in it is accepted by the string only
+if it is in the tree's language, so example_facts refuses sets that contain
+those symbols.
+'''
+from typing import Iterable, NamedTuple, Optional
+
+MODULUS = 6
+_ALL_RESIDUES = (1 << MODULUS) - 1
+ANY = 1
+EVERY = -1
+_BITS: dict[str, int] = {}
+
+def _bit(c: str) -> int:
+  # the bit of a symbol, allocated on first use
+  bit = _BITS.get(c)
+  if bit is None:
+    bit = _BITS[c] = 2 << len(_BITS)
+  return bit
+
+_NEWLINE = _bit('\n')
+
+# (min_length, max_length or None if unbounded, residues, first, last): bit r of residues is set iff some
+# match has length r modulo MODULUS; first and last are the symbols nonempty matches start and end with
+Summary = tuple[int, Optional[int], int, int, int]
+
+def _shifted(a: int, b: int) -> int:
+  # {x + y mod MODULUS | x in a, y in b}, as bitmasks
+  total = 0
+  for shift in range(MODULUS):
+    if (a >> shift) & 1:
+      total |= ((b << shift) | (b >> (MODULUS - shift))) & _ALL_RESIDUES
+  return total
+
+def _closed(a: int) -> int:
+  # sums of one or more elements of a, as a bitmask
+  total = a
+  while _shifted(total, a) | total != total:
+    total |= _shifted(total, a)
+  return total
+
+# tables of residue sets: _SUMS[a][b] for concatenation, _CLOSURES[a] for repetition
+_SUMS = [[_shifted(a, b) for b in range(1 << MODULUS)] for a in range(1 << MODULUS)]
+_CLOSURES = [_closed(a) for a in range(1 << MODULUS)]
+
+def _covered(symbols: int) -> int:
+  # the symbols a set matches, ANY standing for all but a newline
+  return symbols | ~_NEWLINE if symbols & ANY else symbols
+
+NOTHING: Summary = (0, 0, 0, 0, 0)
+EPSILON: Summary = (0, 0, 1, 0, 0)
+ANY_STRING: Summary = (0, None, _ALL_RESIDUES, ANY, ANY)
+ANYTHING: Summary = (0, None, _ALL_RESIDUES, EVERY, EVERY)
+
+def symbol(literal: str) -> Summary:
+  '''
+  the summary of a literal ('.' for any symbol but a newline)
+  '''
+  bit = ANY if literal == '.' else _bit(literal)
+  return (1, 1, 1 << (1 % MODULUS), bit, bit)
+
+def concatenation(a: Summary, b: Summary) -> Summary:
+  '''
+  the summary of ab
+  '''
+  a_min, a_max, a_residues, a_first, a_last = a
+  b_min, b_max, b_residues, b_first, b_last = b
+  if not a_residues or not b_residues:
+    return NOTHING
+  return (a_min + b_min, None if a_max is None or b_max is None else a_max + b_max, _SUMS[a_residues][b_residues],
+          a_first | b_first if a_min == 0 else a_first, a_last | b_last if b_min == 0 else b_last)
+
+def union(a: Summary, b: Summary) -> Summary:
+  '''
+  the summary of a|b
+  '''
+  a_min, a_max, a_residues, a_first, a_last = a
+  b_min, b_max, b_residues, b_first, b_last = b
+  if not a_residues:
+    return b
+  if not b_residues:
+    return a
+  return (min(a_min, b_min), None if a_max is None or b_max is None else max(a_max, b_max), a_residues | b_residues,
+          a_first | b_first, a_last | b_last)
+
+def star(a: Summary) -> Summary:
+  '''
+  the summary of a*
+  '''
+  _, a_max, a_residues, a_first, a_last = a
+  if not a_residues or a_max == 0:
+    return EPSILON
+  return (0, None, _CLOSURES[a_residues] | 1, a_first, a_last)
+
+def optional(a: Summary) -> Summary:
+  '''
+  the summary of a?
+  '''
+  return union(a, EPSILON)
+
+class ExampleFacts(NamedTuple):
+  '''
+  the facts about a set of examples that summaries are compared with
+  '''
+  has_empty: bool
+  lengths: frozenset[int]   # lengths of the nonempty examples
+  min_length: int           # the shortest and longest of them (0 if there are none)
+  max_length: int
+  residues: int             # their lengths modulo MODULUS
+  first: int                # their first symbols
+  last: int                 # their last symbols
+
+def example_facts(examples: Iterable, wildcards: str = '') -> Optional[ExampleFacts]:
+  '''
+  collect the facts about some examples
+
+  Args:
+      examples (Iterable): the examples (str, or bytes-like read as latin-1)
+      wildcards (str, optional): the symbols an X stands for (see main.symbolic_examples), or ''
+        if X is a symbol. Defaults to ''.
+
+  Returns:
+      Optional[ExampleFacts]: the facts, or None if some example contains ε or ∅
+  '''
+  has_empty = False
+  lengths = set()
+  first = last = 0
+  wild = 0
+  for symbol in wildcards:
+    wild |= _bit(symbol)
+  for example in examples:
+    if isinstance(example, str):
+      if 'ε' in example or '∅' in example:
+        return None
+      head, tail = example[:1], example[-1:]
+    else:
+      # read in place; ε and ∅ are not latin-1, so a bytes-like example has neither
+      head, tail = (chr(example[0]), chr(example[-1])) if len(example) else ('', '')
+    if head:
+      lengths.add(len(example))
+      first |= wild if wildcards and head == 'X' else _bit(head)
+      last |= wild if wildcards and tail == 'X' else _bit(tail)
+    else:
+      has_empty = True
+  residues = 0
+  for length in lengths:
+    residues |= 1 << length % MODULUS
+  return ExampleFacts(has_empty, frozenset(lengths), min(lengths, default=0), max(lengths, default=0), residues,
+                      first, last)
+
+def _admits(summary: Summary, length: int) -> bool:
+  min_length, max_length, residues, _, _ = summary
+  return min_length <= length and (max_length is None or length <= max_length) \
+    and (residues >> length % MODULUS) & 1 == 1
+
+def misses_some(summary: Summary, facts: ExampleFacts) -> bool:
+  '''
+  whether a pattern surely rejects some of the examples
+
+  Args:
+      summary (Summary): the pattern's summary
+      facts (ExampleFacts): the examples' facts
+
+  Returns:
+      bool: True if some example cannot match; False if that is not known
+  '''
+  if facts.has_empty and not _admits(summary, 0):
+    return True
+  if not facts.lengths:
+    return False
+  min_length, max_length, residues, first, last = summary
+  return facts.min_length < min_length or (max_length is not None and facts.max_length > max_length) \
+    or facts.residues & ~residues != 0 or facts.first & ~_covered(first) != 0 or facts.last & ~_covered(last) != 0
+
+def misses_all(summary: Summary, facts: ExampleFacts) -> bool:
+  '''
+  whether a pattern surely rejects every one of the examples
+
+  Args:
+      summary (Summary): the pattern's summary
+      facts (ExampleFacts): the examples' facts
+
+  Returns:
+      bool: True if no example can match; False if that is not known
+  '''
+  if facts.has_empty and _admits(summary, 0):
+    return False
+  _, _, _, first, last = summary
+  return facts.first & _covered(first) == 0 or facts.last & _covered(last) == 0 \
+    or not any(_admits(summary, length) for length in facts.lengths)
@@ -0,0 +1,139 @@
+'''
+Adversarial
+
+A benchmark of long examples that make backtracking matchers stall. The task
+is "even number of 0s" (benchmarks/no08) plus a few examples of a chosen
+length; solving it has the search evaluate over-approximations such as
+(.*0*1)* and ((1|1*))*, which re needs exponential time to reject on a long
+run of 1s. (The summaries of main.abstraction would decide most of those
+checks without matching, so the benchmark's search goes without them.) The
+benchmark runs the search (on main.automaton), then times every pattern it
+evaluated against the examples under re and under the automaton, each in a
+child process with a time limit.
+
+usage: python3 -m main.adversarial [--length N] [--time-limit S]
+'''
+import multiprocessing
+import re
+import sys
+from time import perf_counter
+from typing import Callable, Optional
+from main.automaton import Automaton
+from main.helpers import inflate_all, simplify
+from main.search import Search, SharedCaches
+
+_FORK = multiprocessing.get_context('fork')
+
+def adversarial_task(length: int = 30) -> tuple[set[str], set[str]]:
+  '''
+  even number of 0s, with long examples
+
+  Args:
+      length (int, optional): the length of the long examples. Defaults to 30.
+
+  Returns:
+      tuple[set[str], set[str]]: positive and negative examples
+  '''
+  P = {'1', '00', '10101', '11011011', '0000', '101010101', '11011011011011', '1' * length, '0' + '1' * length + '0'}
+  N = {'0', '10', '01', '011', '000', '1010101', '00000', '0' + '1' * length, '1' * length + '0'}
+  return P, N
+
+def evaluated_patterns(P: set[str], N: set[str], alphabet: str = '01') -> tuple[Optional[str], list[str]]:
+  '''
+  solve a task and collect the patterns its dead checks evaluate when they
+  match every example (see main.abstraction for the summaries that usually spare them)
+
+  Args:
+      P (set[str]): positive examples
+      N (set[str]): negative examples
+      alphabet (str, optional): the input alphabet. Defaults to '01'.
+
+  Returns:
+      tuple[Optional[str], list[str]]: the solution, and the (simplified) patterns
+  '''
+  caches = SharedCaches(alphabet)
+  s = Search(P, N, alphabet, caches)
+  # without facts about the examples no summary decides a check, so every one matches (and is recorded)
+  s.facts = (None, None)
+  pattern = s.run()
+  patterns = set()
+  for entry in caches.library.values():
+    # a state found dead early has no later patterns
+    patterns.update(entry[key] for key in ('over', 'under') if key in entry)
+    patterns.update(entry.get('split', ()))
+  return pattern, sorted({simplify(pattern) for pattern in patterns})
+
+def _match_all(compile_pattern: Callable, patterns: list[str], examples: list[str], conn) -> None:
+  # run in a child: time matching every pattern against every example, reporting progress as it goes
+  t0 = perf_counter()
+  for done, pattern in enumerate(patterns, start=1):
+    fullmatch = compile_pattern(pattern).fullmatch
+    for example in examples:
+      fullmatch(example)
+    conn.send((done, perf_counter() - t0))
+  conn.close()
+
+def time_engine(compile_pattern: Callable, patterns: list[str], examples: list[str], time_limit: float) -> dict:
+  '''
+  time an engine in a child process, killing it at the time limit
+
+  Args:
+      compile_pattern (Callable): pattern -> object with fullmatch (e.g. re.compile)
+      patterns (list[str]): the patterns
+      examples (list[str]): the examples
+      time_limit (float): seconds
+
+  Returns:
+      dict: patterns done, seconds, and whether it finished
+  '''
+  parent_conn, child_conn = _FORK.Pipe(duplex=False)
+  process = _FORK.Process(target=_match_all, args=(compile_pattern, patterns, examples, child_conn), daemon=True)
+  t0 = perf_counter()
+  process.start()
+  child_conn.close()
+  done, seconds = 0, 0.0
+  while parent_conn.poll(max(0.0, time_limit - (perf_counter() - t0))):
+    try:
+      done, seconds = parent_conn.recv()
+    except EOFError:
+      break
+  finished = done == len(patterns)
+  if not finished:
+    process.kill()
+    seconds = perf_counter() - t0
+  process.join()
+  return {'done': done, 'seconds': seconds, 'finished': finished}
+
+def run(length: int = 30, time_limit: float = 10) -> dict:
+  '''
+  run the benchmark
+
+  Args:
+      length (int, optional): the length of the long examples. Defaults to 30.
+      time_limit (float, optional): seconds allowed to each engine. Defaults to 10.
+
+  Returns:
+      dict: the solution, search seconds, the number of patterns, and per engine its timing (see time_engine)
+  '''
+  P, N = adversarial_task(length)
+  t0 = perf_counter()
+  pattern, patterns = evaluated_patterns(P, N)
+  seconds = perf_counter() - t0
+  examples = sorted(inflate_all(P, '01') | inflate_all(N, '01'))
+  return {
+    'pattern': pattern,
+    'search_seconds': seconds,
+    'patterns': len(patterns),
+    're': time_engine(re.compile, patterns, examples, time_limit),
+    'automaton': time_engine(Automaton, patterns, examples, time_limit),
+  }
+
+if __name__ == '__main__': # pragma: no cover
+  LENGTH = int(sys.argv[sys.argv.index('--length') + 1]) if '--length' in sys.argv else 30
+  TIME_LIMIT = float(sys.argv[sys.argv.index('--time-limit') + 1]) if '--time-limit' in sys.argv else 10
+  RESULT = run(LENGTH, TIME_LIMIT)
+  print(f'search: {RESULT["pattern"]} in {RESULT["search_seconds"]:.2f}s, evaluating {RESULT["patterns"]} patterns')
+  for ENGINE in ('re', 'automaton'):
+    TIMING = RESULT[ENGINE]
+    print(f'{ENGINE:>9}: {TIMING["done"]}/{RESULT["patterns"]} patterns in {TIMING["seconds"]:.2f}s'
+          + ('' if TIMING['finished'] else ' (time limit)'))
@@ -0,0 +1,245 @@
+'''
+Automaton
+
+A regex matcher that runs in time linear in the length of the example, for
+the patterns the search generates: literals, '.', grouping, '|' and the
+postfix '*', '?' and '+'. A pattern is compiled to a Thompson NFA, which is
+determinized lazily: each DFA state is a set of NFA states, and its
+transition on a symbol is computed the first time that symbol is read in
+that state. A symbol therefore costs one dict lookup once the DFA is warm,
+and at most one pass over the NFA when it is not; no input makes it
+backtrack, unlike re on patterns such as (.*0.*)*.
+
+Matching follows re: every other character is a literal (so ε, ∅ and □
+only match themselves), '.' matches anything but a newline, and a match
+must cover the whole example. Examples may also be bytes-like (such as the
+memoryviews of main.shared_examples), read as latin-1.
+'''
+from functools import lru_cache
+from typing import Optional
+
+_ANY = object()   # the label of '.'
+_LATIN1 = [chr(byte) for byte in range(256)]
+MAX_DFA_STATES = 10_000
+
+class _NFA:
+  '''
+  a Thompson NFA: node i reads labels[i] and goes to targets[i], or (if its label is None) moves on epsilon[i]
+  '''
+  def __init__(self):
+    self.labels: list = []
+    self.targets: list[int] = []
+    self.epsilon: list[list[int]] = []
+
+  def node(self, label=None) -> int:
+    self.labels.append(label)
+    self.targets.append(-1)
+    self.epsilon.append([])
+    return len(self.labels) - 1
+
+class _Parser:
+  '''
+  a recursive descent parser building (start, end) NFA fragments
+  '''
+  def __init__(self, pattern: str, nfa: _NFA):
+    self.pattern = pattern
+    self.i = 0
+    self.nfa = nfa
+
+  def peek(self) -> Optional[str]:
+    return self.pattern[self.i] if self.i < len(self.pattern) else None
+
+  def alternation(self) -> tuple[int, int]:
+    fragment = self.concatenation()
+    if self.peek() != '|':
+      return fragment
+    start, end = self.nfa.node(), self.nfa.node()
+    self.nfa.epsilon[start].append(fragment[0])
+    self.nfa.epsilon[fragment[1]].append(end)
+    while self.peek() == '|':
+      self.i += 1
+      fragment = self.concatenation()
+      self.nfa.epsilon[start].append(fragment[0])
+      self.nfa.epsilon[fragment[1]].append(end)
+    return start, end
+
+  def concatenation(self) -> tuple[int, int]:
+    start = end = self.nfa.node()
+    while self.peek() not in (None, '|', ')'):
+      fragment = self.repetition()
+      self.nfa.epsilon[end].append(fragment[0])
+      end = fragment[1]
+    return start, end
+
+  def repetition(self) -> tuple[int, int]:
+    fragment = self.atom()
+    while self.peek() in ('*', '?', '+'):
+      operator = self.pattern[self.i]
+      self.i += 1
+      start, end = self.nfa.node(), self.nfa.node()
+      self.nfa.epsilon[start].append(fragment[0])
+      self.nfa.epsilon[fragment[1]].append(end)
+      if operator in ('*', '?'):
+        self.nfa.epsilon[start].append(end)
+      if operator in ('*', '+'):
+        self.nfa.epsilon[fragment[1]].append(fragment[0])
+      fragment = (start, end)
+    return fragment
+
+  def atom(self) -> tuple[int, int]:
+    symbol = self.pattern[self.i]
+    self.i += 1
+    if symbol == '(':
+      fragment = self.alternation()
+      if self.peek() != ')':
+        raise ValueError(f'missing ) at position {self.i} of {self.pattern!r}')
+      self.i += 1
+      return fragment
+    if symbol in ('*', '?', '+', ')'):
+      raise ValueError(f'unexpected {symbol} at position {self.i - 1} of {self.pattern!r}')
+    if symbol == '\\':
+      if self.i >= len(self.pattern):
+        raise ValueError(f'dangling \\ in {self.pattern!r}')
+      symbol = self.pattern[self.i]
+      self.i += 1
+      label = symbol
+    else:
+      label = _ANY if symbol == '.' else symbol
+    start, end = self.nfa.node(label), self.nfa.node()
+    self.nfa.targets[start] = end
+    return start, end
+
+class _State:
+  '''
+  a DFA state: a set of NFA nodes that read a symbol (or accept), and its transitions so far
+  '''
+  __slots__ = ('nodes', 'next', 'accepting', 'dead')
+
+  def __init__(self, nodes: frozenset[int], accepting: bool):
+    self.nodes = nodes
+    self.next: dict[str, '_State'] = {}
+    self.accepting = accepting
+    self.dead = not nodes
+
+class Automaton:
+  '''
+  a compiled pattern, matched by a lazily built DFA
+  '''
+  def __init__(self, pattern: str):
+    self.pattern = pattern
+    self.nfa = _NFA()
+    parser = _Parser(pattern, self.nfa)
+    start, self.accept = parser.alternation()
+    if parser.i != len(pattern):
+      raise ValueError(f'unexpected ) at position {parser.i} of {pattern!r}')
+    self.states: dict[frozenset[int], _State] = {}
+    self.start = self.state(self.closure([start]))
+
+  def closure(self, nodes) -> frozenset[int]:
+    '''
+    the NFA nodes reachable from some nodes on epsilon moves, keeping those that read a symbol or accept
+
+    Args:
+        nodes (Iterable[int]): the nodes
+
+    Returns:
+        frozenset[int]: the closure
+    '''
+    labels, epsilon, accept = self.nfa.labels, self.nfa.epsilon, self.accept
+    seen = set(nodes)
+    stack = list(seen)
+    while stack:
+      for node in epsilon[stack.pop()]:
+        if node not in seen:
+          seen.add(node)
+          stack.append(node)
+    return frozenset(node for node in seen if labels[node] is not None or node == accept)
+
+  def state(self, nodes: frozenset[int]) -> _State:
+    '''
+    the DFA state of a set of NFA nodes, made on first use
+
+    Args:
+        nodes (frozenset[int]): the nodes
+
+    Returns:
+        _State: the state
+    '''
+    state = self.states.get(nodes)
+    if state is None:
+      if len(self.states) >= MAX_DFA_STATES:
+        # forget the DFA built so far (keeping the start state) rather than grow without bound
+        for old in self.states.values():
+          old.next.clear()
+        self.states = {self.start.nodes: self.start}
+      state = self.states[nodes] = _State(nodes, self.accept in nodes)
+    return state
+
+  def step(self, state: _State, symbol: str) -> _State:
+    '''
+    compute (and remember) a transition
+
+    Args:
+        state (_State): the state
+        symbol (str): the symbol read
+
+    Returns:
+        _State: the next state
+    '''
+    labels, targets = self.nfa.labels, self.nfa.targets
+    moved = [targets[node] for node in state.nodes
+             if labels[node] == symbol or (labels[node] is _ANY and symbol != '\n')]
+    following = self.state(self.closure(moved))
+    state.next[symbol] = following
+    return following
+
+  def fullmatch(self, example) -> bool:
+    '''
+    whether the pattern matches the whole example
+
+    Args:
+        example (str | bytes-like): the example
+
+    Returns:
+        bool: True iff it matches
+    '''
+    state = self.start
+    # bytes-like examples yield ints, read as latin-1 without copying
+    symbols = example if isinstance(example, str) else map(_LATIN1.__getitem__, example)
+    for symbol in symbols:
+      following = state.next.get(symbol)
+      if following is None:
+        following = self.step(state, symbol)
+      if following.dead:
+        return False
+      state = following
+    return state.accepting
+
+@lru_cache(maxsize=4096)
+def automaton(pattern: str) -> Automaton:
+  '''
+  compile a pattern, or reuse a recent compilation
+
+  Args:
+      pattern (str): the pattern
+
+  Raises:
+      ValueError: if the pattern is malformed
+
+  Returns:
+      Automaton: the compiled pattern
+  '''
+  return Automaton(pattern)
+
+def fullmatch(pattern: str, example) -> bool:
+  '''
+  whether a pattern matches the whole of an example, like re.fullmatch
+
+  Args:
+      pattern (str): the pattern
+      example (str | bytes-like): the example
+
+  Returns:
+      bool: True iff it matches
+  '''
+  return automaton(pattern).fullmatch(example)
@@ -0,0 +1,139 @@
+'''
+Batch
+
+Solve many tasks in one process tree. Each task runs in its own forked
+process (so imports are paid for once, by the parent) with its own time and
+memory limits, and results are yielded as soon as each task finishes.
+
+a task is a JSON object:
+  {"id": "no01", "P": ["0", ...], "N": ["", ...], "alphabet": "01", "time_limit": 10, "memory_limit": 512}
+only P and N are required; limits are in seconds and MiB. A line that is not
+a JSON object fails on its own, with status error, and the batch goes on.
+'''
+import json
+import multiprocessing
+import os
+import resource
+from multiprocessing.connection import wait
+from time import monotonic
+from typing import Iterable, Iterator, Optional, TextIO
+from main.search import Search, search
+from main.cache import ResultCache
+
+_FORK = multiprocessing.get_context('fork')
+
+def read_tasks(stream: TextIO) -> Iterator[dict]:
+  '''
+  read tasks from JSON lines, skipping blank lines
+
+  Args:
+      stream (TextIO): the input
+
+  Returns:
+      Iterator[dict]: the tasks; a task without an id is numbered by its line, and a line that
+        is not a JSON object yields {'id': its number, 'error': why}, which run_batch reports as failed
+  '''
+  for number, line in enumerate(stream, start=1):
+    line = line.strip()
+    if line:
+      try:
+        task = json.loads(line)
+      except ValueError as e:
+        yield {'id': number, 'error': f'line {number}: {e}'}
+        continue
+      if not isinstance(task, dict):
+        yield {'id': number, 'error': f'line {number}: not a JSON object'}
+        continue
+      task.setdefault('id', number)
+      yield task
+
+def _solve(task: dict, conn, cache_path: Optional[str]) -> None:
+  '''
+  run one task in a forked child and send its result to the parent
+  '''
+  memory_limit = task.get('memory_limit')
+  if memory_limit is not None:
+    limit = int(memory_limit * 1024 * 1024)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+  result: dict = {}
+  try:
+    P, N, alphabet = set(task['P']), set(task['N']), task.get('alphabet', '01')
+    if cache_path:
+      result['pattern'] = search(P, N, alphabet, cache=ResultCache(cache_path))
+    else:
+      s = Search(P, N, alphabet)
+      result['pattern'] = s.run()
+      result['expanded'] = s.expanded
+    result['status'] = 'ok'
+  except MemoryError:
+    result = {'status': 'memory'}
+  except Exception as e: # pylint: disable=broad-exception-caught
+    result = {'status': 'error', 'error': repr(e)}
+  usage = resource.getrusage(resource.RUSAGE_SELF)
+  result['peak_rss_kb'] = usage.ru_maxrss
+  result['cpu_seconds'] = usage.ru_utime + usage.ru_stime
+  conn.send(result)
+  conn.close()
+
+def run_batch(tasks: Iterable[dict], jobs: Optional[int] = None, time_limit: Optional[float] = None,
+              memory_limit: Optional[float] = None, cache_path: Optional[str] = None) -> Iterator[dict]:
+  '''
+  solve tasks concurrently, yielding each result as it finishes (not in input order)
+
+  Args:
+      tasks (Iterable[dict]): the tasks (see module docstring)
+      jobs (Optional[int], optional): tasks to run at once. Defaults to the number of CPUs.
+      time_limit (Optional[float], optional): default seconds per task. Defaults to None (unlimited).
+      memory_limit (Optional[float], optional): default MiB per task. Defaults to None (unlimited).
+      cache_path (Optional[str], optional): a ResultCache file to consult and fill. Defaults to None.
+
+  Returns:
+      Iterator[dict]: results with id, status (ok, timeout, memory, error), pattern and seconds;
+          a task that reported back also has expanded (unless cached), peak_rss_kb and cpu_seconds
+  '''
+  jobs = jobs or os.cpu_count() or 1
+  pending = iter(tasks)
+  running: dict = {}  # connection -> (task, process, start, deadline)
+  exhausted = False
+  while running or not exhausted:
+    while not exhausted and len(running) < jobs:
+      task = next(pending, None)
+      if task is None:
+        exhausted = True
+        break
+      if 'error' in task:
+        # unreadable (see read_tasks): nothing to run
+        yield {'id': task['id'], 'status': 'error', 'error': task['error'], 'seconds': 0.0}
+        continue
+      # the defaults are filled in on a copy, leaving the caller's task as it was
+      task = {'memory_limit': memory_limit, 'time_limit': time_limit, **task}
+      parent_conn, child_conn = _FORK.Pipe(duplex=False)
+      process = _FORK.Process(target=_solve, args=(task, child_conn, cache_path), daemon=True)
+      process.start()
+      child_conn.close()
+      start = monotonic()
+      deadline = start + task['time_limit'] if task['time_limit'] is not None else None
+      running[parent_conn] = (task, process, start, deadline)
+    if not running:
+      break
+    deadlines = [deadline for _, _, _, deadline in running.values() if deadline is not None]
+    timeout = max(0, min(deadlines) - monotonic()) if deadlines else None
+    ready = wait(list(running), timeout)
+    now = monotonic()
+    for conn in list(running):
+      task, process, start, deadline = running[conn]
+      if conn in ready:
+        try:
+          result = conn.recv()
+        except EOFError:
+          # killed without reporting, e.g. by the memory limit
+          result = {'status': 'memory' if task['memory_limit'] is not None else 'error'}
+      elif deadline is not None and now >= deadline:
+        process.terminate()
+        result = {'status': 'timeout'}
+      else:
+        continue
+      process.join()
+      conn.close()
+      del running[conn]
+      yield {'id': task['id'], **result, 'seconds': now - start}
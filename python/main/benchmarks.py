@@ -0,0 +1,179 @@
+'''
+Benchmarks
+
+Run the benchmarks/ suite in parallel, each task in its own process with its
+own time and memory limits (see main.batch), and write a JSON report of wall
+time, CPU time, expanded states, peak RSS and the resulting regex.
+
+Given a baseline report, each task is compared against it. Timings are
+noisy, so a task only counts as faster or slower when its median CPU time
+moved by more than the threshold AND by more than the spread seen across
+repeats in either report (and by more than min_seconds, below which timer
+and start-up noise dominate). A changed status or expanded-state count is
+always reported, since those are deterministic.
+
+usage: python3 -m main.benchmarks [--jobs N] [--timeout S] [--memory-limit MiB] [--repeat K]
+                                  [--output report.json] [--baseline baseline.json] [<filename> ...]
+'''
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+from time import time
+from typing import Optional
+from main.batch import run_batch
+from main.main import read_examples
+
+FASTER = 'faster'
+SLOWER = 'slower'
+SAME = 'same'
+SOLVED_NOW = 'solved'       # baseline did not finish, now it does
+UNSOLVED_NOW = 'unsolved'   # baseline finished, now it does not
+CHANGED = 'changed'         # both finished, with different expanded states or regex
+
+def default_files() -> list[str]:
+  '''
+  the benchmark files, relative to the python directory
+
+  Returns:
+      list[str]: the files
+  '''
+  return sorted(glob.glob('../benchmarks/no*'))
+
+def run_suite(files: list[str], jobs: Optional[int] = None, time_limit: Optional[float] = 10,
+              memory_limit: Optional[float] = None, repeat: int = 1) -> dict:
+  '''
+  run every benchmark repeat times, in parallel
+
+  Args:
+      files (list[str]): examples files
+      jobs (Optional[int], optional): tasks to run at once. Defaults to the number of CPUs.
+      time_limit (Optional[float], optional): seconds per run. Defaults to 10.
+      memory_limit (Optional[float], optional): MiB per run. Defaults to None (unlimited).
+      repeat (int, optional): runs per benchmark. Defaults to 1.
+
+  Returns:
+      dict: the report: settings, and per benchmark (by file name) its status, pattern, expanded,
+          the median and every run of seconds and cpu_seconds (of runs that reported it), and the
+          largest peak_rss_kb
+  '''
+  tasks = []
+  for file in files:
+    examples = read_examples(file, verbose=False)
+    for run in range(repeat):
+      tasks.append({'id': (os.path.basename(file), run), 'P': sorted(examples['P']), 'N': sorted(examples['N'])})
+  runs: dict[str, list[dict]] = {os.path.basename(file): [] for file in files}
+  for result in run_batch(tasks, jobs, time_limit, memory_limit):
+    runs[result['id'][0]].append(result)
+  report = {
+    'created': time(),
+    'python': platform.python_version(),
+    'machine': platform.machine(),
+    'time_limit': time_limit,
+    'memory_limit': memory_limit,
+    'repeat': repeat,
+    'tasks': {},
+  }
+  for name, results in runs.items():
+    # a benchmark counts as finished only if every run finished
+    failed = [result['status'] for result in results if result['status'] != 'ok']
+    first = results[0]
+    # a run that was killed did not report its CPU time
+    cpu = sorted(result['cpu_seconds'] for result in results if 'cpu_seconds' in result)
+    report['tasks'][name] = {
+      'status': failed[0] if failed else 'ok',
+      'pattern': first.get('pattern'),
+      'expanded': first.get('expanded'),
+      'seconds': statistics.median(result['seconds'] for result in results),
+      'cpu_seconds': statistics.median(cpu) if cpu else None,
+      'runs_seconds': sorted(result['seconds'] for result in results),
+      'runs_cpu_seconds': cpu,
+      'peak_rss_kb': max(result.get('peak_rss_kb', 0) for result in results),
+    }
+  return report
+
+def _spread(runs: list[float]) -> float:
+  # the relative range of repeated runs; 0 for a single run
+  median = statistics.median(runs)
+  return (max(runs) - min(runs)) / median if median > 0 else 0.0
+
+def compare(report: dict, baseline: dict, threshold: float = 0.10, min_seconds: float = 0.05) -> dict[str, dict]:
+  '''
+  compare a report against a baseline report, task by task
+
+  Args:
+      report (dict): the new report (see run_suite)
+      baseline (dict): the baseline report
+      threshold (float, optional): the smallest relative change of median CPU time that counts. Defaults to 0.10.
+      min_seconds (float, optional): the smallest absolute change that counts. Defaults to 0.05.
+
+  Returns:
+      dict[str, dict]: per task in both reports: verdict (FASTER, SLOWER, SAME, SOLVED_NOW, UNSOLVED_NOW or
+          CHANGED), speedup (baseline over new median CPU time, when both finished) and the threshold applied
+  '''
+  comparison: dict[str, dict] = {}
+  for name, new in report['tasks'].items():
+    old = baseline['tasks'].get(name)
+    if old is None:
+      continue
+    row = {'verdict': SAME, 'speedup': None, 'threshold': None}
+    comparison[name] = row
+    if old['status'] != 'ok' or new['status'] != 'ok':
+      if old['status'] == 'ok':
+        row['verdict'] = UNSOLVED_NOW
+      elif new['status'] == 'ok':
+        row['verdict'] = SOLVED_NOW
+      continue
+    if old['cpu_seconds'] > 0 and new['cpu_seconds'] > 0:
+      row['speedup'] = old['cpu_seconds'] / new['cpu_seconds']
+    noise = max(threshold, _spread(old['runs_cpu_seconds']), _spread(new['runs_cpu_seconds']))
+    row['threshold'] = noise
+    change = new['cpu_seconds'] - old['cpu_seconds']
+    if abs(change) > min_seconds and abs(change) > noise * old['cpu_seconds']:
+      row['verdict'] = FASTER if change < 0 else SLOWER
+    if (new['expanded'], new['pattern']) != (old['expanded'], old['pattern']) and row['verdict'] == SAME:
+      row['verdict'] = CHANGED
+  return comparison
+
+def print_report(report: dict, comparison: Optional[dict[str, dict]] = None) -> None:
+  '''
+  print a report as a table, with the comparison if there is one
+
+  Args:
+      report (dict): the report (see run_suite)
+      comparison (Optional[dict[str, dict]], optional): see compare. Defaults to None.
+  '''
+  print(f'{"benchmark":40} | {"status":7} | {"wall s":>8} | {"cpu s":>8} | {"expanded":>9} | {"rss MiB":>7} | '
+        f'{"vs baseline":>16} | regex')
+  for name, task in report['tasks'].items():
+    versus = ''
+    if comparison and name in comparison:
+      row = comparison[name]
+      versus = f'{row["verdict"]} {row["speedup"]:.2f}x' if row['speedup'] else row['verdict']
+    expanded = task['expanded'] if task['expanded'] is not None else '-'
+    cpu = f'{task["cpu_seconds"]:8.3f}' if task['cpu_seconds'] is not None else '-'
+    print(f'{name[:40]:40} | {task["status"]:7} | {task["seconds"]:8.3f} | {cpu:>8} | '
+          f'{expanded:>9} | {task["peak_rss_kb"] / 1024:7.1f} | {versus:>16} | {task["pattern"] or ""}')
+
+if __name__ == '__main__': # pragma: no cover
+  VALUED = ('--jobs', '--timeout', '--memory-limit', '--repeat', '--output', '--baseline')
+  def _option(name: str) -> Optional[str]:
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else None
+  FILES = [arg for i, arg in enumerate(sys.argv[1:], 1) if not arg.startswith('--') and sys.argv[i - 1] not in VALUED]
+  REPORT = run_suite(FILES or default_files(),
+                     int(_option('--jobs')) if _option('--jobs') else None,
+                     float(_option('--timeout')) if _option('--timeout') else 10,
+                     float(_option('--memory-limit')) if _option('--memory-limit') else None,
+                     int(_option('--repeat')) if _option('--repeat') else 1)
+  COMPARISON = None
+  if _option('--baseline'):
+    with open(_option('--baseline'), 'r', encoding='utf-8') as f:
+      COMPARISON = compare(REPORT, json.load(f))
+  print_report(REPORT, COMPARISON)
+  if _option('--output'):
+    with open(_option('--output'), 'w', encoding='utf-8') as f:
+      json.dump(REPORT, f, indent=2)
+  if COMPARISON and any(row['verdict'] in (SLOWER, UNSOLVED_NOW) for row in COMPARISON.values()):
+    sys.exit(1)
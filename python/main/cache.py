@@ -0,0 +1,124 @@
+'''
+Cache
+
+A persistent, content-addressed cache of search results in sqlite. A task is
+keyed by a hash of everything that determines its answer: the inflated
+examples (order-insensitive), the alphabet, the cost model and the
+productions a hole can be filled with. Examples that Search would keep
+symbolic (see main.symbolic_examples) are hashed as given instead, so a
+lookup never inflates more than a search would; two such tasks whose
+examples inflate to the same strings are keyed apart, which costs a cache
+miss. The database runs in WAL mode with a busy timeout, so any number of
+processes can share one cache file.
+'''
+import hashlib
+import itertools
+import json
+import sqlite3
+import threading
+from time import time
+from typing import Optional
+from main.helpers import inflate_all
+from main.partial_regex import COST_MODEL, Hole, serialize
+from main.symbolic_examples import MAX_INFLATED_SYMBOLS, inflated_symbols
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+  key TEXT PRIMARY KEY,
+  pattern TEXT NOT NULL,
+  cost INTEGER NOT NULL,
+  stats TEXT NOT NULL,
+  created REAL NOT NULL,
+  last_used REAL NOT NULL
+)
+'''
+_INDEX = 'CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)'
+
+def task_key(P: set[str], N: set[str], alphabet: str = '01') -> str:
+  '''
+  the canonical hash of a synthesis task
+
+  Args:
+      P (set[str]): positive examples
+      N (set[str]): negative examples
+      alphabet (str, optional): the input alphabet. Defaults to '01'.
+
+  Returns:
+      str: hex digest identifying the task
+  '''
+  symbolic = inflated_symbols(itertools.chain(P, N), alphabet) > MAX_INFLATED_SYMBOLS
+  task = {
+    'P': sorted(P if symbolic else inflate_all(P, alphabet)),
+    'N': sorted(N if symbolic else inflate_all(N, alphabet)),
+    'symbolic': symbolic,
+    'alphabet': alphabet,
+    'costs': COST_MODEL,
+    'productions': [serialize(state) for state in Hole().next_states(alphabet)],
+  }
+  return hashlib.sha256(json.dumps(task, sort_keys=True).encode('utf-8')).hexdigest()
+
+class ResultCache:
+  '''
+  search results stored on disk, evicting the least recently used beyond max_entries
+  '''
+  def __init__(self, path: str, max_entries: int = 100_000, timeout: float = 30.0):
+    self.path = path
+    self.max_entries = max_entries
+    self.lock = threading.Lock()
+    self.db = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+    self.db.execute('PRAGMA journal_mode=WAL')
+    self.db.execute(_SCHEMA)
+    self.db.execute(_INDEX)
+
+  def get(self, key: str) -> Optional[dict]:
+    '''
+    look up a task
+
+    Args:
+        key (str): the task key (see task_key)
+
+    Returns:
+        Optional[dict]: pattern, cost and stats, or None on a miss
+    '''
+    with self.lock:
+      row = self.db.execute('SELECT pattern, cost, stats FROM results WHERE key = ?', (key,)).fetchone()
+      if row is None:
+        return None
+      self.db.execute('UPDATE results SET last_used = ? WHERE key = ?', (time(), key))
+    return {'pattern': row[0], 'cost': row[1], 'stats': json.loads(row[2])}
+
+  def put(self, key: str, pattern: str, cost: int, stats: Optional[dict] = None) -> None:
+    '''
+    store the result of a task, evicting the least recently used results if the cache is full
+
+    Args:
+        key (str): the task key (see task_key)
+        pattern (str): the solution
+        cost (int): the solution's cost
+        stats (Optional[dict], optional): search statistics. Defaults to None.
+    '''
+    now = time()
+    with self.lock:
+      self.db.execute('BEGIN IMMEDIATE')
+      try:
+        self.db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                        (key, pattern, cost, json.dumps(stats or {}), now, now))
+        excess = self.db.execute('SELECT COUNT(*) FROM results').fetchone()[0] - self.max_entries
+        if excess > 0:
+          # the oldest, read off the last_used index rather than by sorting the table
+          self.db.execute('DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)',
+                          (excess,))
+        self.db.execute('COMMIT')
+      except BaseException:
+        self.db.execute('ROLLBACK')
+        raise
+
+  def __len__(self) -> int:
+    with self.lock:
+      return self.db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+  def close(self) -> None:
+    '''
+    close the database connection
+    '''
+    self.db.close()
@@ -0,0 +1,116 @@
+'''
+CEGIS
+
+Counterexample-guided search for tasks with very many examples. The search
+runs on a small working subset of P and N. Each solution it finds is
+verified against all of the examples; if it misclassifies some, a few of
+them join the subset and the same search resumes (see main.session). States
+found dead on the subset stay dead as it grows, except those pruned as
+redundant, which are checked again (see Search.add_examples), so the
+frontier is repaired rather than rebuilt. Pruning on fewer examples is
+weaker, so the solution found may differ from the one a search on all of
+the examples finds; it is verified on all of them all the same.
+
+usage: python3 -m main.cegis [--subset N] [--batch N] [--seed N] <filename>
+'''
+import random
+import sys
+from dataclasses import dataclass
+from typing import Callable, Optional
+from main.glob_match import matcher
+from main.helpers import inflate_all
+from main.session import SynthesisSession
+
+@dataclass
+class CegisResult:
+  '''
+  the outcome of a counterexample-guided search
+  '''
+  pattern: Optional[str]  # the solution, or None if max_steps ran out first
+  rounds: int             # candidate solutions verified against all of the examples
+  positive: int           # positive examples in the working subset at the end
+  negative: int           # negative examples in the working subset at the end
+  expanded: int
+
+def _sample(examples: list[str], size: int, rng: random.Random) -> list[str]:
+  return examples if len(examples) <= size else rng.sample(examples, size)
+
+def counterexamples(fullmatch: Callable, examples: list[str], accept: bool, limit: int) -> list[str]:
+  '''
+  the first examples a pattern misclassifies
+
+  Args:
+      fullmatch (Callable): the pattern's fullmatch
+      examples (list[str]): the examples, in the order to check them
+      accept (bool): whether the pattern should match them
+      limit (int): stop after this many
+
+  Returns:
+      list[str]: up to limit examples that fullmatch gets wrong
+  '''
+  wrong = []
+  for example in examples:
+    if bool(fullmatch(example)) != accept:
+      wrong.append(example)
+      if len(wrong) == limit:
+        break
+  return wrong
+
+def cegis_search(P: set[str], N: set[str], alphabet: str = '01', subset: int = 64, batch: int = 4, seed: int = 0,
+                 max_steps: Optional[int] = None) -> CegisResult:
+  '''
+  search on a working subset of the examples, adding counterexamples to it until a solution holds for all of them
+
+  Args:
+      P (set[str]): positive examples
+      N (set[str]): negative examples
+      alphabet (str, optional): the input alphabet. Defaults to '01'.
+      subset (int, optional): positive and negative examples to start with (each). Defaults to 64.
+      batch (int, optional): most counterexamples of each kind added per refuted candidate. Defaults to 4.
+      seed (int, optional): seeds the choice of the first subset. Defaults to 0.
+      max_steps (Optional[int], optional): give up after this many steps in all. Defaults to None.
+
+  Raises:
+      ValueError: if an example is both positive and negative
+
+  Returns:
+      CegisResult: the outcome
+  '''
+  # shortest first, so the counterexamples added are short
+  positives = sorted(inflate_all(P, alphabet), key=lambda example: (len(example), example))
+  negatives = sorted(inflate_all(N, alphabet), key=lambda example: (len(example), example))
+  rng = random.Random(seed)
+  session = SynthesisSession(_sample(positives, subset, rng), _sample(negatives, subset, rng), alphabet)
+  rounds = 0
+  pattern = None
+  while True:
+    steps = None if max_steps is None else max_steps - (session.search.expanded if session.search else 0)
+    if steps is not None and steps <= 0:
+      break
+    pattern = session.solve(steps)
+    if pattern is None:
+      break
+    rounds += 1
+    # verify the state, as the session does, rather than its optimized string
+    fullmatch = matcher(str(session.search.solution_state)).fullmatch
+    missed = counterexamples(fullmatch, positives, True, batch)
+    matched = counterexamples(fullmatch, negatives, False, batch)
+    if not missed and not matched:
+      break
+    pattern = None
+    session.add_positive(*missed)
+    session.add_negative(*matched)
+  return CegisResult(pattern, rounds, len(session.P), len(session.N), session.search.expanded if session.search else 0)
+
+if __name__ == '__main__': # pragma: no cover
+  from main.main import read_examples
+  def _option(name: str) -> Optional[str]:
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else None
+  if len(sys.argv) == 1:
+    print(__doc__[__doc__.index('usage'):])
+    sys.exit(1)
+  EXAMPLES = read_examples(sys.argv[-1])
+  RESULT = cegis_search(EXAMPLES['P'], EXAMPLES['N'], subset=int(_option('--subset') or 64),
+                        batch=int(_option('--batch') or 4), seed=int(_option('--seed') or 0))
+  print(f'{RESULT.pattern} | {RESULT.rounds} rounds, subset {RESULT.positive}+{RESULT.negative}, '
+        f'{RESULT.expanded} expanded')
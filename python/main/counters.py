@@ -0,0 +1,108 @@
+'''
+Counters
+
+Machine-independent performance counters of the benchmarks: states
+expanded, children generated, regex evaluations and trie nodes visited,
+which (unlike timings) are exactly reproducible. tests/test_counters.py
+checks them against the golden file, so an algorithmic regression in
+next_states, is_dead or the frontier fails deterministically. A counter that drops by more than the
+tolerance fails too, until the golden file is regenerated (--update): a
+stale file would let a later regression back up to the old numbers pass.
+
+Only benchmarks that finish within MAX_STATES expanded states are recorded,
+which keeps the suite fast.
+
+usage: python3 -m main.counters [--update] [<filename> ...]
+'''
+import glob
+import json
+import os
+import sys
+from typing import Optional
+from main.main import read_examples
+from main.search import Search, SearchStats
+
+GOLDEN = os.path.join(os.path.dirname(__file__), '..', 'tests', 'golden_counters.json')
+MAX_STATES = 3000
+TOLERANCE = 0.02
+COUNTERS = ('expanded', 'generated', 'evaluations', 'visits')
+
+def count(file: str, max_states: int = MAX_STATES) -> Optional[dict]:
+  '''
+  run a benchmark and collect its counters
+
+  Args:
+      file (str): examples file
+      max_states (int, optional): give up after expanding this many states. Defaults to MAX_STATES.
+
+  Returns:
+      Optional[dict]: expanded, generated, evaluations, visits and pattern, or None if it did not finish
+  '''
+  examples = read_examples(file, verbose=False)
+  stats = SearchStats()
+  s = Search(examples['P'], examples['N'], stats=stats)
+  # run, as search() does, rather than run_budgeted, which also counts the errors of closed states
+  pattern = s.run(max_steps=max_states)
+  if pattern is None:
+    return None
+  s.statistics()
+  return {'expanded': stats.expanded, 'generated': stats.generated, 'evaluations': stats.evaluations,
+          'visits': stats.visits, 'pattern': pattern}
+
+def load_golden(path: str = GOLDEN) -> dict:
+  '''
+  read the golden file
+
+  Args:
+      path (str, optional): the file. Defaults to GOLDEN.
+
+  Returns:
+      dict: tolerance, and counters by benchmark file name
+  '''
+  with open(path, 'r', encoding='utf-8') as f:
+    return json.load(f)
+
+def regressions(name: str, counters: Optional[dict], golden: dict) -> list[str]:
+  '''
+  compare a benchmark's counters with the golden ones
+
+  Args:
+      name (str): the benchmark file name
+      counters (Optional[dict]): see count
+      golden (dict): see load_golden
+
+  Returns:
+      list[str]: what regressed, or improved without the golden file being updated (empty if neither)
+  '''
+  expected = golden['benchmarks'][name]
+  if counters is None:
+    return [f'{name}: no longer finishes within {golden["max_states"]} states']
+  problems = []
+  if counters['pattern'] != expected['pattern']:
+    problems.append(f'{name}: pattern {counters["pattern"]!r}, expected {expected["pattern"]!r}')
+  for counter in COUNTERS:
+    if counters[counter] > expected[counter] * (1 + golden['tolerance']):
+      problems.append(f'{name}: {counter} grew from {expected[counter]} to {counters[counter]}')
+    elif counters[counter] < expected[counter] * (1 - golden['tolerance']):
+      problems.append(f'{name}: {counter} shrank from {expected[counter]} to {counters[counter]}; '
+                      'update the golden file (python3 -m main.counters --update)')
+  return problems
+
+if __name__ == '__main__': # pragma: no cover
+  FILES = [arg for arg in sys.argv[1:] if not arg.startswith('--')] or sorted(glob.glob('../benchmarks/no*'))
+  if '--update' in sys.argv:
+    BENCHMARKS = {}
+    for FILE in FILES:
+      COUNTERS_OF = count(FILE)
+      if COUNTERS_OF is not None:
+        BENCHMARKS[os.path.basename(FILE)] = COUNTERS_OF
+    with open(GOLDEN, 'w', encoding='utf-8') as f:
+      json.dump({'max_states': MAX_STATES, 'tolerance': TOLERANCE, 'benchmarks': BENCHMARKS}, f, indent=2)
+      f.write('\n')
+    print(f'recorded {len(BENCHMARKS)} benchmarks in {os.path.normpath(GOLDEN)}')
+  else:
+    GOLDEN_COUNTERS = load_golden()
+    for FILE in FILES:
+      NAME = os.path.basename(FILE)
+      if NAME in GOLDEN_COUNTERS['benchmarks']:
+        print('\n'.join(regressions(NAME, count(FILE), GOLDEN_COUNTERS)) or f'{NAME}: ok')
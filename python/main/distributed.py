@@ -0,0 +1,409 @@
+'''
+Distributed search
+
+One coordinator owns the frontier, partitioned by state fingerprint into one
+partition per node. Workers (on any machine) pull batches of states from their
+own partition over TCP, check and expand them, and push the children back;
+the coordinator routes each child to the partition that owns its fingerprint,
+so duplicate detection stays local to a partition. A worker whose partition is
+empty steals half of the largest partition. The cost of the best solution found
+so far is sent with every reply, and both sides discard states that cost as
+much or more (so of several equally cheap solutions, the first found is kept).
+
+A batch stays leased to the connection that took it until its results are
+put back. If a worker disconnects first (it crashed, or was killed), its
+batch returns to the partitions, so another worker processes it instead.
+
+The protocol is newline-delimited JSON; states travel in the prefix encoding
+of partial_regex.serialize. Workers on the coordinator's machine read the
+examples from a shared memory block instead of receiving their own copy.
+
+usage:
+  python3 -m main.distributed local [--workers N] <filename>
+  python3 -m main.distributed coordinator [--nodes N] [--host H] [--port P] <filename>
+  python3 -m main.distributed worker [--host H] [--port P]
+'''
+import heapq
+import json
+import multiprocessing
+import socket
+import socketserver
+import sys
+import threading
+import time
+import zlib
+from typing import Callable, Optional
+from main.abstraction import example_facts
+from main.partial_regex import Hole, opt, serialize, deserialize
+from main.helpers import ExampleSet, inflate_all
+from main.shared_examples import SharedExamples
+
+DEFAULT_PORT = 5821
+
+def fingerprint(encoding: str) -> int:
+  '''
+  a fingerprint of a state which is stable across processes and machines
+
+  Args:
+      encoding (str): the serialized state
+
+  Returns:
+      int: the fingerprint
+  '''
+  return zlib.crc32(encoding.encode('utf-8'))
+
+class Coordinator:
+  '''
+  owns the partitioned frontier and the global best-cost bound
+  '''
+  def __init__(self, P: set[str], N: set[str], alphabet: str = '01', nodes: int = 1, batch_size: int = 8,
+               shared: bool = False):
+    self.P = inflate_all(P, alphabet)
+    self.N = inflate_all(N, alphabet)
+    self.shared = SharedExamples.pack(self.P, self.N) if shared else None
+    self.alphabet = alphabet
+    self.nodes = nodes
+    self.batch_size = batch_size
+    self.partitions: list[list[tuple[int, int, str]]] = [[] for _ in range(nodes)]
+    self.v_pre: list[set[str]] = [set() for _ in range(nodes)]
+    self.in_flight = 0
+    # the partition entries handed out to each connection and not yet put back
+    self.leases: dict[object, list[tuple[int, int, str]]] = {}
+    self.sequence = 0
+    self.next_node = 0
+    self.best: Optional[tuple[int, str]] = None
+    self.lock = threading.Lock()
+    self.finished = threading.Event()
+    self.v_pre[self.owner(serialize(Hole()))].add(serialize(Hole()))
+    self.route([(serialize(state), state.cost()) for state in Hole().next_states(alphabet)])
+
+  def owner(self, encoding: str) -> int:
+    '''
+    the node whose partition owns a state
+
+    Args:
+        encoding (str): the serialized state
+
+    Returns:
+        int: the owning node
+    '''
+    return fingerprint(encoding) % self.nodes
+
+  def bound(self) -> Optional[int]:
+    '''
+    the cost of the best solution found so far
+
+    Returns:
+        Optional[int]: the cost, or None if no solution has been found
+    '''
+    return self.best[0] if self.best else None
+
+  def route(self, states: list[tuple[str, int]]) -> None:
+    '''
+    add new states to the partitions of their owners (caller holds the lock)
+
+    Args:
+        states (list[tuple[str, int]]): serialized states and their costs
+    '''
+    bound = self.bound()
+    for encoding, cost in states:
+      if bound is not None and cost >= bound:
+        continue
+      node = self.owner(encoding)
+      if encoding not in self.v_pre[node]:
+        self.v_pre[node].add(encoding)
+        heapq.heappush(self.partitions[node], (cost, self.sequence, encoding))
+        self.sequence += 1
+
+  def take(self, node: int, client: object = None) -> list[str]:
+    '''
+    hand out the cheapest states of a node's partition, stealing if it is empty
+
+    Args:
+        node (int): the requesting node
+        client (object, optional): the connection to lease the batch to (see release). Defaults to None.
+
+    Returns:
+        list[str]: serialized states to process
+    '''
+    with self.lock:
+      partition = self.partitions[node]
+      limit = self.batch_size
+      if not partition:
+        victim = max(self.partitions, key=len)
+        partition = victim
+        limit = min(limit, (len(victim) + 1) // 2)
+      bound = self.bound()
+      batch = []
+      while partition and len(batch) < limit:
+        entry = heapq.heappop(partition)
+        if bound is None or entry[0] < bound:
+          batch.append(entry)
+      self.in_flight += len(batch)
+      if client is not None and batch:
+        self.leases.setdefault(client, []).extend(batch)
+      self.check_finished()
+      return [encoding for _, _, encoding in batch]
+
+  def give(self, states: list[tuple[str, int]], solutions: list[tuple[int, str]], processed: int,
+           client: object = None) -> None:
+    '''
+    accept the results of processing a batch
+
+    Args:
+        states (list[tuple[str, int]]): new serialized states and their costs
+        solutions (list[tuple[int, str]]): solutions found as (cost, pattern)
+        processed (int): the number of states that were processed
+        client (object, optional): the connection the batch was leased to. Defaults to None.
+    '''
+    with self.lock:
+      if client is not None:
+        self.leases.pop(client, None)
+      for solution in solutions:
+        solution = tuple(solution)
+        if self.best is None or solution < self.best:
+          self.best = solution
+      self.route(states)
+      self.in_flight -= processed
+      self.check_finished()
+
+  def release(self, client: object) -> None:
+    '''
+    return the batch leased to a connection that closed without putting it back
+
+    Args:
+        client (object): the connection
+    '''
+    with self.lock:
+      for entry in self.leases.pop(client, []):
+        # still in v_pre, so it goes back directly rather than through route
+        heapq.heappush(self.partitions[self.owner(entry[2])], entry)
+        self.in_flight -= 1
+      self.check_finished()
+
+  def check_finished(self) -> None:
+    '''
+    the search is finished when no state is queued or being processed (caller holds the lock)
+    '''
+    if self.in_flight == 0 and not any(self.partitions):
+      self.finished.set()
+
+  def handle(self, request: dict, client: object = None) -> dict:
+    '''
+    answer one protocol message
+
+    Args:
+        request (dict): the message
+        client (object, optional): the connection it came on. Defaults to None.
+
+    Returns:
+        dict: the reply
+    '''
+    op = request.get('op')
+    if op == 'hello':
+      with self.lock:
+        node = self.next_node % self.nodes
+        self.next_node += 1
+      if self.shared:
+        return {'node': node, 'shared': self.shared.name, 'alphabet': self.alphabet}
+      return {'node': node, 'P': sorted(self.P), 'N': sorted(self.N), 'alphabet': self.alphabet}
+    if op == 'examples':
+      return {'P': sorted(self.P), 'N': sorted(self.N)}
+    if op == 'get':
+      states = [] if self.finished.is_set() else self.take(request['node'], client)
+      return {'states': states, 'bound': self.bound(), 'done': self.finished.is_set()}
+    if op == 'put':
+      self.give(request.get('states', []), request.get('solutions', []), request.get('processed', 0), client)
+      return {'bound': self.bound(), 'done': self.finished.is_set()}
+    return {'error': f'unknown op: {op}'}
+
+  def result(self) -> Optional[str]:
+    '''
+    the best solution, once the search has finished
+
+    Returns:
+        Optional[str]: the pattern, or None if the space was exhausted without a solution
+    '''
+    return self.best[1] if self.best else None
+
+  def close(self) -> None:
+    '''
+    release the shared examples block, if any
+    '''
+    if self.shared:
+      self.shared.close()
+      self.shared = None
+
+class _Handler(socketserver.StreamRequestHandler):
+  def handle(self) -> None:
+    coordinator: Coordinator = self.server.coordinator
+    try:
+      for line in self.rfile:
+        reply = coordinator.handle(json.loads(line), self)
+        self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+        self.wfile.flush()
+    except ConnectionError:
+      pass
+    finally:
+      coordinator.release(self)
+
+class _Server(socketserver.ThreadingTCPServer):
+  allow_reuse_address = True
+  daemon_threads = True
+
+def serve(coordinator: Coordinator, host: str = '127.0.0.1', port: int = DEFAULT_PORT) -> _Server:
+  '''
+  start serving a coordinator on a background thread
+
+  Args:
+      coordinator (Coordinator): the coordinator
+      host (str, optional): address to bind. Defaults to '127.0.0.1'.
+      port (int, optional): port to bind (0 picks a free one). Defaults to DEFAULT_PORT.
+
+  Returns:
+      _Server: the running server; server.server_address has the bound address
+  '''
+  server = _Server((host, port), _Handler)
+  server.coordinator = coordinator
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server
+
+def work(host: str = '127.0.0.1', port: int = DEFAULT_PORT, idle_wait: float = 0.01) -> int:
+  '''
+  run a worker node until the coordinator reports the search finished
+
+  Args:
+      host (str, optional): coordinator address. Defaults to '127.0.0.1'.
+      port (int, optional): coordinator port. Defaults to DEFAULT_PORT.
+      idle_wait (float, optional): seconds to wait when no work is available. Defaults to 0.01.
+
+  Returns:
+      int: the number of states this worker processed
+  '''
+  with socket.create_connection((host, port)) as sock, sock.makefile('rwb') as stream:
+    def call(request: dict) -> dict:
+      stream.write(json.dumps(request).encode('utf-8') + b'\n')
+      stream.flush()
+      return json.loads(stream.readline())
+
+    config = call({'op': 'hello'})
+    node, alphabet = config['node'], config['alphabet']
+    shared = None
+    if 'shared' in config:
+      try:
+        shared = SharedExamples.attach(config['shared'])
+        P, N = shared.P, shared.N
+      except FileNotFoundError:
+        config = call({'op': 'examples'})
+    if shared is None:
+      P, N = set(config['P']), set(config['N'])
+    try:
+      return _work_loop(call, node, alphabet, P, N, idle_wait)
+    finally:
+      if shared:
+        shared.close()
+
+def _work_loop(call: Callable[[dict], dict], node: int, alphabet: str, P: set[str] | ExampleSet,
+               N: set[str] | ExampleSet, idle_wait: float) -> int:
+  processed_total = 0
+  facts = (example_facts(P), example_facts(N))
+  while True:
+    reply = call({'op': 'get', 'node': node})
+    if reply['done']:
+      return processed_total
+    if not reply['states']:
+      time.sleep(idle_wait)
+      continue
+    bound = reply['bound']
+    children: list[tuple[str, int]] = []
+    solutions: list[tuple[int, str]] = []
+    for encoding in reply['states']:
+      state = deserialize(encoding)
+      if bound is not None and state.cost() >= bound:
+        continue
+      if state.is_solution(P, N, facts):
+        solutions.append((state.cost(), str(opt(state))))
+        bound = state.cost() if bound is None else min(bound, state.cost())
+      elif state.dead_reason(P, N, facts=facts) is None:
+        for next_state in state.next_states(alphabet):
+          if bound is None or next_state.cost() < bound:
+            children.append((serialize(next_state), next_state.cost()))
+    processed_total += len(reply['states'])
+    reply = call({'op': 'put', 'node': node, 'states': children, 'solutions': solutions,
+                  'processed': len(reply['states'])})
+    if reply['done']:
+      return processed_total
+
+def distributed_search(P: set[str], N: set[str], alphabet: str = '01', workers: int = 2,
+                       timeout: Optional[float] = None, poll: float = 0.1) -> Optional[str]:
+  '''
+  search with several local worker processes standing in for nodes. a worker that
+  dies hands its batch back (see Coordinator.release), so the others finish the search
+
+  Args:
+      P (set[str]): positive examples
+      N (set[str]): negative examples
+      alphabet (str, optional): the input alphabet. Defaults to '01'.
+      workers (int, optional): the number of worker processes. Defaults to 2.
+      timeout (Optional[float], optional): seconds to wait for the search. Defaults to None (no limit).
+      poll (float, optional): seconds between checks that a worker is still alive. Defaults to 0.1.
+
+  Raises:
+      TimeoutError: if the search has not finished within timeout seconds
+      RuntimeError: if every worker exited before the search finished
+
+  Returns:
+      Optional[str]: the cheapest solution found
+  '''
+  coordinator = Coordinator(P, N, alphabet, nodes=workers, shared=True)
+  server = serve(coordinator, port=0)
+  host, port = server.server_address[:2]
+  processes = [multiprocessing.Process(target=work, args=(host, port), daemon=True) for _ in range(workers)]
+  try:
+    for process in processes:
+      process.start()
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    while not coordinator.finished.wait(poll):
+      if deadline is not None and time.monotonic() >= deadline:
+        raise TimeoutError(f'distributed search did not finish within {timeout} s')
+      if not any(process.is_alive() for process in processes) and not coordinator.finished.is_set():
+        raise RuntimeError('every worker exited before the search finished')
+    for process in processes:
+      process.join(timeout=1)
+  finally:
+    for process in processes:
+      if process.is_alive():
+        process.terminate()
+    server.shutdown()
+    server.server_close()
+    coordinator.close()
+  return coordinator.result()
+
+def _option(name: str, default: str) -> str:
+  if name in sys.argv:
+    return sys.argv[sys.argv.index(name) + 1]
+  return default
+
+if __name__ == '__main__': # pragma: no cover
+  from main.main import read_examples
+  if len(sys.argv) < 2 or sys.argv[1] not in ('local', 'coordinator', 'worker'):
+    print('usage: python3 -m main.distributed local|coordinator|worker [options] [<filename>]')
+    sys.exit(1)
+  MODE = sys.argv[1]
+  HOST = _option('--host', '127.0.0.1')
+  PORT = int(_option('--port', str(DEFAULT_PORT)))
+  if MODE == 'worker':
+    work(HOST, PORT)
+  else:
+    EXAMPLES = read_examples(sys.argv[-1])
+    t1 = time.time()
+    if MODE == 'local':
+      PATTERN = distributed_search(EXAMPLES['P'], EXAMPLES['N'], workers=int(_option('--workers', '2')))
+    else:
+      COORDINATOR = Coordinator(EXAMPLES['P'], EXAMPLES['N'], nodes=int(_option('--nodes', '2')), shared=True)
+      SERVER = serve(COORDINATOR, HOST, PORT)
+      COORDINATOR.finished.wait()
+      SERVER.shutdown()
+      COORDINATOR.close()
+      PATTERN = COORDINATOR.result()
+    print(f'{PATTERN} | {time.time() - t1:0.2f} s')
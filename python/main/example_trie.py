@@ -0,0 +1,181 @@
+'''
+Example trie
+
+Examples stored as a trie, matched by walking main.automaton's lazily built
+DFA down it: the DFA state reached at a trie node is shared by every example
+below that node, so a prefix common to many examples (as inflate_all makes
+them) is read once per pattern instead of once per example. A dead DFA
+state decides the whole subtree below it at once: matches_all fails as soon
+as it meets one, and matches_any skips it.
+
+The walk reads every symbol through a dict lookup in Python, while a list
+of examples is mostly decided by main.glob_match's str methods, so the trie
+only pays off when examples share much of their length. example_set picks
+the trie when it has at most MAX_SHARING nodes per symbol of the examples.
+'''
+from typing import Iterator, Optional, Self
+from main.automaton import Automaton, automaton
+from main.helpers import ExampleSet, OrderedExamples, PatternCache
+
+MAX_SHARING = 0.4
+
+class _Node:
+  '''
+  a trie node: its children by symbol, and whether an example ends here
+  '''
+  __slots__ = ('children', 'terminal')
+
+  def __init__(self):
+    self.children: dict[str, '_Node'] = {}
+    self.terminal = False
+
+class TrieExamples(ExampleSet):
+  '''
+  examples in a trie, checked by one DFA walk per pattern. visits counts the
+  trie nodes walked, each of which stands for one step of every example
+  below it. automata are built through patterns, if given
+  '''
+  def __init__(self, examples: set[str], patterns: Optional[PatternCache] = None):
+    self.root = _Node()
+    self.size = 0
+    self.nodes = 1
+    self.visits = 0
+    self.patterns = patterns
+    # in order, so walks (and their visits) do not depend on string hashing
+    for example in sorted(examples):
+      self.add(example)
+
+  def add(self, example: str) -> bool:
+    '''
+    add an example
+
+    Args:
+        example (str): the example
+
+    Returns:
+        bool: True if it was not already in the trie
+    '''
+    node = self.root
+    for symbol in example:
+      child = node.children.get(symbol)
+      if child is None:
+        child = node.children[symbol] = _Node()
+        self.nodes += 1
+      node = child
+    if node.terminal:
+      return False
+    node.terminal = True
+    self.size += 1
+    return True
+
+  def __ior__(self, examples: set[str]) -> Self:
+    for example in sorted(examples):
+      self.add(example)
+    return self
+
+  def __len__(self) -> int:
+    return self.size
+
+  def __iter__(self) -> Iterator[str]:
+    stack = [(self.root, '')]
+    while stack:
+      node, prefix = stack.pop()
+      if node.terminal:
+        yield prefix
+      for symbol, child in node.children.items():
+        stack.append((child, prefix + symbol))
+
+  def __repr__(self) -> str:
+    return '{' + ', '.join(map(repr, sorted(self, key=lambda example: (len(example), example)))) + '}'
+
+  def compile(self, pattern: str) -> Automaton:
+    '''
+    the automaton of a (simplified) pattern
+
+    Args:
+        pattern (str): the pattern
+
+    Returns:
+        Automaton: the automaton
+    '''
+    return self.patterns.automaton(pattern) if self.patterns is not None else automaton(pattern)
+
+  def matches_all(self, pattern: str) -> bool:
+    compiled = self.compile(pattern)
+    step = compiled.step
+    stack = [(self.root, compiled.start)]
+    visited = 0
+    while stack:
+      node, state = stack.pop()
+      visited += 1
+      if node.terminal and not state.accepting:
+        self.visits += visited
+        return False
+      transitions = state.next
+      for symbol, child in node.children.items():
+        following = transitions.get(symbol)
+        if following is None:
+          following = step(state, symbol)
+        if following.dead:
+          # every subtree holds an example, which cannot match
+          self.visits += visited
+          return False
+        stack.append((child, following))
+    self.visits += visited
+    return True
+
+  def matches_any(self, pattern: str) -> bool:
+    compiled = self.compile(pattern)
+    step = compiled.step
+    stack = [(self.root, compiled.start)]
+    visited = 0
+    while stack:
+      node, state = stack.pop()
+      visited += 1
+      if node.terminal and state.accepting:
+        self.visits += visited
+        return True
+      transitions = state.next
+      for symbol, child in node.children.items():
+        following = transitions.get(symbol)
+        if following is None:
+          following = step(state, symbol)
+        if not following.dead:
+          stack.append((child, following))
+    self.visits += visited
+    return False
+
+  def count_matches(self, pattern: str) -> int:
+    compiled = self.compile(pattern)
+    step = compiled.step
+    stack = [(self.root, compiled.start)]
+    count = 0
+    while stack:
+      node, state = stack.pop()
+      self.visits += 1
+      if node.terminal and state.accepting:
+        count += 1
+      transitions = state.next
+      for symbol, child in node.children.items():
+        following = transitions.get(symbol)
+        if following is None:
+          following = step(state, symbol)
+        if not following.dead:
+          stack.append((child, following))
+    return count
+
+def example_set(examples: set[str], patterns: Optional[PatternCache] = None) -> TrieExamples | OrderedExamples:
+  '''
+  hold examples in a trie if they share enough prefixes, else in a list
+
+  Args:
+      examples (set[str]): the (inflated) examples
+      patterns (Optional[PatternCache], optional): compile patterns through this cache. Defaults to None.
+
+  Returns:
+      TrieExamples | OrderedExamples: the example set
+  '''
+  trie = TrieExamples(examples, patterns)
+  if trie.nodes <= MAX_SHARING * (1 + sum(len(example) for example in examples)):
+    return trie
+  return OrderedExamples(examples, patterns)
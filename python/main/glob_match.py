@@ -0,0 +1,222 @@
+'''
+Glob match
+
+Fast paths in front of main.automaton. Many approximation patterns are globs:
+literals and '.' separated by '.*' (0.*, .*01, ..0.*). A glob is decided by
+checking its first segment at the start of the example, its last at the
+end, and finding the others in order with str.find, leftmost first, with no
+automaton at all. For any other pattern, the literal factors that every
+match must contain (01 in (0|1)*011*, say) are checked with `in` first, and
+the automaton only runs on examples that contain them all. Both fast paths
+read str examples; a bytes-like example (a memoryview of
+main.shared_examples) goes straight to the automaton, which reads it in
+place rather than decoding a copy.
+
+While counting is set (SearchStats sets it), PATHS counts the checks each
+path decided: 'glob', 'prefilter' (rejected for a missing factor) and
+'automaton'. It is off by default, so a check pays one global lookup for it.
+'''
+from functools import lru_cache
+from typing import Optional
+from main.automaton import Automaton, automaton
+
+PATHS = {'glob': 0, 'prefilter': 0, 'automaton': 0}
+counting = False
+
+def path_fractions(counts: Optional[dict[str, int]] = None) -> dict[str, float]:
+  '''
+  the fraction of checks decided by each path
+
+  Args:
+      counts (Optional[dict[str, int]], optional): checks per path. Defaults to PATHS.
+
+  Returns:
+      dict[str, float]: fraction per path (all 0 before any check)
+  '''
+  counts = PATHS if counts is None else counts
+  total = sum(counts.values())
+  return {path: count / total if total else 0.0 for path, count in counts.items()}
+
+def glob_segments(pattern: str) -> Optional[list[str]]:
+  '''
+  split a glob-shaped pattern at its '.*'s
+
+  Args:
+      pattern (str): the pattern
+
+  Returns:
+      Optional[list[str]]: the segments (of literals and '.'), or None if the pattern is not a glob
+  '''
+  segments = ['']
+  i = 0
+  while i < len(pattern):
+    symbol = pattern[i]
+    if symbol in '()|*?+\\':
+      return None
+    if symbol == '.' and pattern[i + 1:i + 2] == '*':
+      segments.append('')
+      i += 2
+    else:
+      segments[-1] += symbol
+      i += 1
+  return segments
+
+def required_factors(pattern: str) -> list[str]:
+  '''
+  literal strings that every match of a pattern contains, from the literals
+  outside any group, '|' or quantifier that removes them
+
+  Args:
+      pattern (str): the pattern
+
+  Returns:
+      list[str]: the factors, longest first (empty when none are found)
+  '''
+  if '\\' in pattern:
+    return []
+  factors = []
+  run = ''
+  i = 0
+  while i < len(pattern):
+    symbol = pattern[i]
+    following = pattern[i + 1:i + 2]
+    if symbol == '|':
+      # a top-level alternative need not contain anything the others do
+      return []
+    if symbol == '(':
+      depth = 0
+      while True:
+        # skip to the matching ')': whatever the group holds (a '|' included) is not required
+        depth += {'(': 1, ')': -1}.get(pattern[i], 0)
+        if depth == 0:
+          break
+        i += 1
+      following = pattern[i + 1:i + 2]
+      symbol = None
+    if symbol is None or symbol == '.' or following in ('*', '?'):
+      if run:
+        factors.append(run)
+      run = ''
+    else:
+      run += symbol
+      if following == '+':
+        factors.append(run)
+        run = ''
+    i += 2 if following in ('*', '?', '+') else 1
+  if run:
+    factors.append(run)
+  return sorted(set(factors), key=lambda factor: (-len(factor), factor))
+
+class Glob:
+  '''
+  a glob-shaped pattern: segments of literals and '.', with '.*' between them
+  '''
+  def __init__(self, pattern: str, segments: list[str]):
+    self.pattern = pattern
+    self.segments = segments
+    self.wild = [('.' in segment) for segment in segments]
+    self.min_length = sum(len(segment) for segment in segments)
+
+  def at(self, example: str, position: int, k: int) -> bool:
+    '''
+    whether segment k matches the example at a position
+    '''
+    segment = self.segments[k]
+    if not self.wild[k]:
+      return example.startswith(segment, position)
+    if position + len(segment) > len(example):
+      return False
+    return all(symbol in ('.', example[position + j]) for j, symbol in enumerate(segment))
+
+  def find(self, example: str, k: int, start: int, end: int) -> int:
+    '''
+    the leftmost position where segment k matches within example[start:end], or -1
+    '''
+    segment = self.segments[k]
+    if not self.wild[k]:
+      return example.find(segment, start, end)
+    for position in range(start, end - len(segment) + 1):
+      if self.at(example, position, k):
+        return position
+    return -1
+
+  def fullmatch(self, example) -> bool:
+    '''
+    whether the pattern matches the whole example
+
+    Args:
+        example (str | bytes-like): the example
+
+    Returns:
+        bool: True iff it matches
+    '''
+    if not isinstance(example, str) or '\n' in example:
+      # bytes are not copied into a str, and '.' does not match a newline; leave both to the automaton
+      if counting:
+        PATHS['automaton'] += 1
+      return automaton(self.pattern).fullmatch(example)
+    if counting:
+      PATHS['glob'] += 1
+    segments = self.segments
+    last = len(segments) - 1
+    if last == 0:
+      return len(example) == self.min_length and self.at(example, 0, 0)
+    if len(example) < self.min_length or not self.at(example, 0, 0):
+      return False
+    end = len(example) - len(segments[last])
+    if not self.at(example, end, last):
+      return False
+    position = len(segments[0])
+    for k in range(1, last):
+      position = self.find(example, k, position, end)
+      if position < 0:
+        return False
+      position += len(segments[k])
+    return True
+
+class Prefiltered:
+  '''
+  an automaton behind a check for the literal factors every match contains
+  '''
+  def __init__(self, compiled: Automaton, factors: list[str]):
+    self.compiled = compiled
+    self.factors = factors
+
+  def fullmatch(self, example) -> bool:
+    '''
+    whether the pattern matches the whole example
+
+    Args:
+        example (str | bytes-like): the example
+
+    Returns:
+        bool: True iff it matches
+    '''
+    if self.factors and isinstance(example, str):
+      for factor in self.factors:
+        if factor not in example:
+          if counting:
+            PATHS['prefilter'] += 1
+          return False
+    if counting:
+      PATHS['automaton'] += 1
+    return self.compiled.fullmatch(example)
+
+@lru_cache(maxsize=4096)
+def matcher(pattern: str) -> Glob | Prefiltered:
+  '''
+  compile a pattern to its fastest matcher, or reuse a recent compilation
+
+  Args:
+      pattern (str): the pattern
+
+  Raises:
+      ValueError: if the pattern is malformed
+
+  Returns:
+      Glob | Prefiltered: an object whose fullmatch(example) decides a match
+  '''
+  segments = glob_segments(pattern)
+  if segments is not None:
+    return Glob(pattern, segments)
+  return Prefiltered(automaton(pattern), required_factors(pattern))
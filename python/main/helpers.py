@@ -1,7 +1,11 @@
 '''
 helpers
 '''
-import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, Optional, Self
+from main.automaton import Automaton, automaton
+from main.glob_match import Glob, Prefiltered, matcher
 
 def simplify(pattern: str) -> str:
   e2 = pattern.replace('**', '*').replace('??', '?').replace('*?', '*').replace('?*', '*')
@@ -10,41 +14,363 @@ def simplify(pattern: str) -> str:
     e2 = pattern.replace('**', '*').replace('??', '?').replace('*?', '*').replace('?*', '*')
   return pattern
 
-def matches_all(pattern: str, examples: set[str]) -> bool:
+class ExampleSet(ABC):
+  '''
+  a collection of examples that does its own matching
+  (matches_all and matches_any delegate to it). the work it does is counted
+  in evaluations (a pattern matched against one example) or, for examples
+  held in a trie, visits (a trie node walked, see main.example_trie)
+  '''
+  evaluations = 0
+  visits = 0
+
+  @abstractmethod
+  def matches_all(self, pattern: str) -> bool:
+    '''
+    checks whether the pattern matches ALL examples
+
+    Args:
+        pattern (str): simplified pattern to test
+
+    Returns:
+        bool: True iff the pattern matches ALL examples
+    '''
+
+  @abstractmethod
+  def matches_any(self, pattern: str) -> bool:
+    '''
+    checks whether the pattern matches any example
+
+    Args:
+        pattern (str): simplified pattern to test
+
+    Returns:
+        bool: True iff the pattern matches SOME example
+    '''
+
+  @abstractmethod
+  def count_matches(self, pattern: str) -> int:
+    '''
+    counts the examples the pattern matches
+
+    Args:
+        pattern (str): simplified pattern to test
+
+    Returns:
+        int: the number of examples matched
+    '''
+
+MAX_CACHE_ENTRIES = 100_000
+
+class LRUDict(OrderedDict):
+  '''
+  a dict that keeps its max_entries most recently used entries: get, setdefault
+  and assignment mark an entry used, and an insertion beyond the limit evicts
+  the least recently used one
+  '''
+  def __init__(self, max_entries: int = MAX_CACHE_ENTRIES):
+    super().__init__()
+    self.max_entries = max_entries
+    self.evictions = 0
+
+  def get(self, key: Any, default: Any = None) -> Any:
+    if key not in self:
+      return default
+    self.move_to_end(key)
+    return super().__getitem__(key)
+
+  def setdefault(self, key: Any, default: Any = None) -> Any:
+    if key not in self:
+      self[key] = default
+      return default
+    self.move_to_end(key)
+    return super().__getitem__(key)
+
+  def __setitem__(self, key: Any, value: Any) -> None:
+    super().__setitem__(key, value)
+    self.move_to_end(key)
+    if len(self) > self.max_entries:
+      self.popitem(last=False)
+      self.evictions += 1
+
+class PatternCache:
+  '''
+  compiled patterns, which may be shared by many example sets: matchers for
+  example lists and automata for example tries. the least recently used of
+  each are evicted beyond max_entries
+  '''
+  def __init__(self, max_entries: int = MAX_CACHE_ENTRIES):
+    self.patterns: LRUDict = LRUDict(max_entries)
+    self.automata: LRUDict = LRUDict(max_entries)
+    self.hits = 0
+    self.misses = 0
+
+  def _reuse(self, compiled_patterns: LRUDict, pattern: str, compile_pattern: Callable[[str], Any]) -> Any:
+    # compile a pattern, or reuse its earlier compilation
+    compiled = compiled_patterns.get(pattern)
+    if compiled is None:
+      self.misses += 1
+      compiled = compiled_patterns[pattern] = compile_pattern(pattern)
+    else:
+      self.hits += 1
+    return compiled
+
+  def compile(self, pattern: str) -> Glob | Prefiltered:
+    '''
+    compile a (simplified) pattern, or reuse its earlier compilation
+
+    Args:
+        pattern (str): the pattern
+
+    Returns:
+        Glob | Prefiltered: the compiled pattern
+    '''
+    return self._reuse(self.patterns, pattern, matcher)
+
+  def automaton(self, pattern: str) -> Automaton:
+    '''
+    the automaton of a (simplified) pattern, or its earlier one
+
+    Args:
+        pattern (str): the pattern
+
+    Returns:
+        Automaton: the automaton
+    '''
+    return self._reuse(self.automata, pattern, automaton)
+
+  @property
+  def evictions(self) -> int:
+    '''
+    compiled patterns evicted so far
+    '''
+    return self.patterns.evictions + self.automata.evictions
+
+def move_to_front(order: list, i: int) -> None:
+  '''
+  move the i-th item of a list to its front, keeping the others in order
+
+  Args:
+      order (list): the list
+      i (int): the position of the item
+  '''
+  if i:
+    order.insert(0, order.pop(i))
+
+class OrderedExamples(ExampleSet):
+  '''
+  examples checked in an order that adapts to the patterns checked against them.
+  they start shortest first; matches_all and matches_any each keep their own
+  order and move the example that decided a check (the one missed, or the one
+  matched) to its front, so the examples that kill the most states are tried
+  first. every evaluation of a pattern against an example is counted.
+  patterns are compiled through patterns, if given
+  '''
+  def __init__(self, examples: set[str], patterns: Optional[PatternCache] = None):
+    self.examples = sorted(examples, key=lambda example: (len(example), example))
+    self.all_order = list(self.examples)
+    self.any_order = list(self.examples)
+    self.evaluations = 0
+    self.patterns = patterns
+
+  def __iter__(self):
+    return iter(self.examples)
+
+  def __len__(self) -> int:
+    return len(self.examples)
+
+  def __repr__(self) -> str:
+    return '{' + ', '.join(map(repr, self.examples)) + '}'
+
+  def __ior__(self, examples: set[str]) -> Self:
+    added = sorted(set(examples) - set(self.examples), key=lambda example: (len(example), example))
+    if added:
+      self.examples = sorted(self.examples + added, key=lambda example: (len(example), example))
+      # new examples are usually counterexamples to the patterns seen so far
+      self.all_order[:0] = added
+      self.any_order[:0] = added
+    return self
+
+  def compile(self, pattern: str) -> Glob | Prefiltered:
+    '''
+    compile a (simplified) pattern
+
+    Args:
+        pattern (str): the pattern
+
+    Returns:
+        Glob | Prefiltered: the compiled pattern
+    '''
+    return self.patterns.compile(pattern) if self.patterns is not None else matcher(pattern)
+
+  def matches_all(self, pattern: str) -> bool:
+    fullmatch = self.compile(pattern).fullmatch
+    order = self.all_order
+    for i, example in enumerate(order):
+      if not fullmatch(example):
+        self.evaluations += i + 1
+        move_to_front(order, i)
+        return False
+    self.evaluations += len(order)
+    return True
+
+  def matches_any(self, pattern: str) -> bool:
+    fullmatch = self.compile(pattern).fullmatch
+    order = self.any_order
+    for i, example in enumerate(order):
+      if fullmatch(example):
+        self.evaluations += i + 1
+        move_to_front(order, i)
+        return True
+    self.evaluations += len(order)
+    return False
+
+  def count_matches(self, pattern: str) -> int:
+    fullmatch = self.compile(pattern).fullmatch
+    self.evaluations += len(self.examples)
+    return sum(1 for example in self.examples if fullmatch(example))
+
+class CountingExamples(ExampleSet):
+  '''
+  an example set (ordered examples, a trie, or symbolic examples) whose
+  patterns are compiled through a PatternCache, which counts its reuses and
+  may be shared by many example sets. evaluations and visits are the wrapped set's
+  '''
+  def __init__(self, examples: set[str] | ExampleSet, patterns: Optional[PatternCache] = None):
+    if not isinstance(examples, ExampleSet):
+      examples = OrderedExamples(examples)
+    self.examples = examples
+    self.patterns = patterns if patterns is not None else PatternCache()
+    examples.patterns = self.patterns
+
+  @property
+  def evaluations(self) -> int:
+    '''
+    the evaluations counted by the wrapped set
+    '''
+    return self.examples.evaluations
+
+  @property
+  def visits(self) -> int:
+    '''
+    the trie nodes visited by the wrapped set
+    '''
+    return self.examples.visits
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(self.examples)
+
+  def __len__(self) -> int:
+    return len(self.examples)
+
+  def __repr__(self) -> str:
+    return repr(self.examples)
+
+  def __ior__(self, examples: set[str]) -> Self:
+    self.examples |= examples
+    return self
+
+  def matches_all(self, pattern: str) -> bool:
+    return self.examples.matches_all(pattern)
+
+  def matches_any(self, pattern: str) -> bool:
+    return self.examples.matches_any(pattern)
+
+  def count_matches(self, pattern: str) -> int:
+    return self.examples.count_matches(pattern)
+
+class CachedExamples(CountingExamples):
+  '''
+  an example set that remembers the verdict of every pattern checked against it
+  '''
+  def __init__(self, examples: set[str] | ExampleSet, patterns: Optional[PatternCache] = None):
+    super().__init__(examples, patterns)
+    self.all_verdicts: dict[str, bool] = {}
+    self.any_verdicts: dict[str, bool] = {}
+    self.hits = 0
+
+  def matches_all(self, pattern: str) -> bool:
+    verdict = self.all_verdicts.get(pattern)
+    if verdict is not None:
+      self.hits += 1
+      return verdict
+    verdict = self.all_verdicts[pattern] = self.examples.matches_all(pattern)
+    return verdict
+
+  def matches_any(self, pattern: str) -> bool:
+    verdict = self.any_verdicts.get(pattern)
+    if verdict is not None:
+      self.hits += 1
+      return verdict
+    verdict = self.any_verdicts[pattern] = self.examples.matches_any(pattern)
+    return verdict
+
+  def __ior__(self, examples: set[str]) -> Self:
+    size = len(self)
+    super().__ior__(examples)
+    if len(self) > size:
+      # more examples can only make a pattern miss one, or match one
+      self.all_verdicts = {pattern: verdict for pattern, verdict in self.all_verdicts.items() if not verdict}
+      self.any_verdicts = {pattern: verdict for pattern, verdict in self.any_verdicts.items() if verdict}
+    return self
+
+def matches_all(pattern: str, examples: set[str] | ExampleSet) -> bool:
   '''
   checks whether the pattern matches ALL examples
 
   Args:
       pattern (str): pattern to test
-      examples (set[str]): examples to test against
+      examples (set[str] | ExampleSet): examples to test against
 
   Returns:
       bool: True iff the pattern matches ALL examples
   '''
   pattern = simplify(pattern)
+  if isinstance(examples, ExampleSet):
+    return examples.matches_all(pattern)
+  fullmatch = matcher(pattern).fullmatch
   for example in examples:
-    if not re.fullmatch(pattern, example):
-      # print(f"{pattern} does not match {example}")
+    if not fullmatch(example):
       return False
   return True
 
-def matches_any(pattern: str, examples: set[str]) -> bool:
+def matches_any(pattern: str, examples: set[str] | ExampleSet) -> bool:
   '''
   checks whether the pattern matches any example
 
   Args:
       pattern (str): the pattern to test
-      examples (set[str]): the examples to test against
+      examples (set[str] | ExampleSet): the examples to test against
 
   Returns:
       bool: True iff the pattern matches SOME example
   '''
   pattern = simplify(pattern)
+  if isinstance(examples, ExampleSet):
+    return examples.matches_any(pattern)
+  fullmatch = matcher(pattern).fullmatch
   for example in examples:
-    if re.fullmatch(pattern, example):
+    if fullmatch(example):
       return True
   return False
 
+def count_matches(pattern: str, examples: set[str] | ExampleSet) -> int:
+  '''
+  counts the examples the pattern matches
+
+  Args:
+      pattern (str): the pattern to test
+      examples (set[str] | ExampleSet): the examples to test against
+
+  Returns:
+      int: the number of examples matched
+  '''
+  pattern = simplify(pattern)
+  if isinstance(examples, ExampleSet):
+    return examples.count_matches(pattern)
+  fullmatch = matcher(pattern).fullmatch
+  return sum(1 for example in examples if fullmatch(example))
+
 def inflate(example: str, alphabet: str) -> list[str]:
   '''
   replace each X with a in alphabet
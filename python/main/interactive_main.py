@@ -1,95 +1,75 @@
 '''
 Interactive Main
 '''
-import heapq
-from main.partial_regex import PartialRegexNode, Hole
-from main.helpers import matches_all, matches_any, inflate_all
+from typing import Optional
+from main.partial_regex import PartialRegexNode, Hole, DEAD_OVER, DEAD_UNDER, DEAD_SPLIT
+from main.search import Search, SearchObserver
 
-def interactive_search(P: set[str], N: set[str], alphabet: str = '01', **kwargs) -> str:
-  pause = kwargs['pause'] if 'pause' in kwargs else True
-  verbose = kwargs['verbose'] if 'verbose' in kwargs else True
-  initial = kwargs['initial'] if 'initial' in kwargs else Hole()
-  N = inflate_all(N, alphabet)
-  print(f'{N=}')
-  q: list[PartialRegexNode] = []
-  heapq.heappush(q, initial)
-  v_pre: set[PartialRegexNode] = set()
-  v_post: set[PartialRegexNode] = set()
-  steps: int = 0
-  while True:
-    if pause:
+VERDICTS = {
+  DEAD_OVER: 'over-approximation does not match all positive examples',
+  DEAD_UNDER: 'under-approximation matches some negative example',
+  DEAD_SPLIT: 'some unrolled split does not match any positive example',
+}
+
+class Tracer(SearchObserver):
+  '''
+  prints each step of a search, optionally waiting for enter before each one
+  '''
+  def __init__(self, pause: bool = True, verbose: bool = True):
+    self.pause = pause
+    self.verbose = verbose
+    self.search: Optional[Search] = None
+    self.steps = 0
+
+  def on_pop(self, state: PartialRegexNode) -> None:
+    if self.pause:
       input('Press enter to continue...')
-    steps += 1
-    print(f'{steps=}')
-    print(f'|q|= {len(q)}')
-    state = heapq.heappop(q)
-    if state in v_post:
-      continue
-    v_post.add(state)
+    self.steps += 1
+    print(f'steps={self.steps}')
+    print(f'|q|= {len(self.search.q) + 1}')
     print(f'state={state}, {state.cost()}')
-    if state.holes() == 0:
-      # check for solution
-      pattern = str(state)
-      if verbose:
-        print(f'  checking /{pattern}/')
-      if matches_all(pattern, P) and not matches_any(pattern, N):
-        if verbose:
-          print('  PASS')
-        return pattern
-      if verbose:
-        print('  FAIL')
-    else:
-      # check for deadness
-      overapproximation = str(state.overapproximation())
-      if verbose:
-        print(f'  over={overapproximation}', end='')
-      if not matches_all(overapproximation, P):
-        # dead
-        if verbose:
-          print(' is DEAD: does not match all positive examples')
-        continue
-      if verbose:
-        print(' is ALIVE: matches all positive examples')
-      underapproximation = str(state.underapproximation())
-      if verbose:
-        print(f'  under={underapproximation}', end='')
-      if matches_any(underapproximation, N):
-        # dead
-        if verbose:
-          print(' is DEAD: matches some negative example')
-        continue
-      if verbose:
-        print(' is ALIVE: does not match any negative example')
-      # redundant states
-      A = state.unroll().split()
-      dead = False
-      for e in A:
-        overapproximation = e.overapproximation()
-        if verbose:
-          print(f'  e^={overapproximation}', end='')
-        if not matches_any(str(overapproximation), P):
-          # dead
-          if verbose:
-            print(' is DEAD: does not match any positive example')
-          dead = True
-          break
-        if verbose:
-          print(' is ALIVE: matches some positive example')
-      if dead:
-        continue
-      # if not dead, expand and add to queue
-      if verbose:
-        print('  next states:')
-      for next_state in state.next_states(alphabet):
-        if verbose:
-          print(f'  {next_state}, {next_state.cost()}', end='')
-        if next_state not in v_pre:
-          heapq.heappush(q, next_state)
-          v_pre.add(next_state)
-          if verbose:
-            print(' (new)')
-        elif verbose:
-          print()
+    if self.verbose:
+      if state.holes() == 0:
+        print(f'  checking /{state}/')
+      else:
+        # the patterns the dead checks match (when the summaries do not decide them first)
+        print(f'  over={state.overapproximation()}')
+        print(f'  under={state.underapproximation()}')
+
+  def on_prune(self, state: PartialRegexNode, reason: str) -> None:
+    if self.verbose:
+      print(f'  is DEAD: {VERDICTS[reason]}')
+
+  def on_push(self, state: PartialRegexNode) -> None:
+    # the initial states are pushed before the search is attached
+    if self.verbose and self.search is not None:
+      print(f'  next state {state}, {state.cost()} (new)')
+
+  def on_solution(self, state: PartialRegexNode, pattern: str) -> None:
+    if self.verbose:
+      print(f'  /{state}/ PASS')
+
+def interactive_search(P: set[str], N: set[str], alphabet: str = '01', **kwargs) -> str:
+  '''
+  search, printing each step
+
+  Args:
+      P (set[str]): positive examples
+      N (set[str]): negative examples
+      alphabet (str, optional): the input alphabet. Defaults to '01'.
+      pause (bool, optional): wait for enter before each step. Defaults to True.
+      verbose (bool, optional): print verdicts and new states, not just the states popped. Defaults to True.
+      initial (PartialRegexNode, optional): the state to start from. Defaults to Hole().
+
+  Returns:
+      str: a regex which matches all positive but no negative examples
+  '''
+  tracer = Tracer(kwargs.get('pause', True), kwargs.get('verbose', True))
+  initial = kwargs.get('initial', Hole())
+  s = Search(P, N, alphabet, observer=tracer, initial=None if initial == Hole() else initial)
+  print(f'N={sorted(s.N)}')
+  tracer.search = s
+  return s.run()
 
 if __name__ == '__main__':
   P = {'XXX', 'XXXXXX'} # not OK to have only Xs in P because we need to know how to inflate N
@@ -1,18 +1,25 @@
 '''
 main
 '''
+import json
 import sys
+from contextlib import nullcontext
 from cProfile import Profile
 from pstats import SortKey, Stats
 from time import time
-from main.search import search
+from typing import Optional
+from dataclasses import asdict
+from main.search import SearchStats, search
+from main.cache import ResultCache
+from main.batch import read_tasks, run_batch
 
-def read_examples(examples_file: str) -> dict[str, set[str]]:
+def read_examples(examples_file: str, verbose: bool = True) -> dict[str, set[str]]:
   '''
   read examples
 
   Args:
       examples_file (str): path to examples file
+      verbose (bool, optional): print the description. Defaults to True.
 
   Returns:
       dict[str, set[str]]: P: positive examples, N: negative examples
@@ -22,7 +29,8 @@ def read_examples(examples_file: str) -> dict[str, set[str]]:
   examples['N'] = set()
   with open(examples_file, 'r', encoding="utf-8") as f:
     description = f.readline().strip()
-    print(f'{description} | ', end='', flush=True)
+    if verbose:
+      print(f'{description} | ', end='', flush=True)
     active_set = examples['P']
     for line in f:
       line = line.strip()
@@ -34,7 +42,7 @@ def read_examples(examples_file: str) -> dict[str, set[str]]:
         active_set.add(line)
   return examples
 
-def main(examples: dict[str, set[str]]) -> None:
+def main(examples: dict[str, set[str]], cache: Optional[ResultCache] = None, stats: bool = False) -> None:
   '''
   the entry point of the program
 
@@ -43,9 +51,12 @@ def main(examples: dict[str, set[str]]) -> None:
                       first line is description of language.
                       "++" on a line begins positive exmaples.
                       "--" on a line begins negatvie examples.
+      cache (Optional[ResultCache], optional): result cache to consult before searching. Defaults to None.
+      stats (bool, optional): print search statistics as JSON afterwards. Defaults to False.
   '''
+  search_stats = SearchStats() if stats else None
   t1 = time()
-  pattern = search(examples['P'], examples['N'])
+  pattern = search(examples['P'], examples['N'], cache=cache, stats=search_stats)
   t2 = time()
   dt = t2 - t1
   units = 's'
@@ -53,17 +64,50 @@ def main(examples: dict[str, set[str]]) -> None:
     dt *= 1000
     units = 'ms'
   print(f'{pattern} | {dt:0.2f} {units}')
+  if search_stats is not None:
+    print(json.dumps(asdict(search_stats)))
+
+def main_batch(tasks_file: str, jobs: Optional[int] = None, time_limit: Optional[float] = None,
+               memory_limit: Optional[float] = None, cache_path: Optional[str] = None) -> None:
+  '''
+  solve a JSON lines file of tasks (see main.batch), printing each result as a JSON line as it finishes
+
+  Args:
+      tasks_file (str): path to the tasks, or '-' for stdin
+      jobs (Optional[int], optional): tasks to run at once. Defaults to the number of CPUs.
+      time_limit (Optional[float], optional): default seconds per task. Defaults to None (unlimited).
+      memory_limit (Optional[float], optional): default MiB per task. Defaults to None (unlimited).
+      cache_path (Optional[str], optional): a ResultCache file to consult and fill. Defaults to None.
+  '''
+  # stdin is read, but left open
+  with (nullcontext(sys.stdin) if tasks_file == '-' else open(tasks_file, 'r', encoding='utf-8')) as f:
+    for result in run_batch(read_tasks(f), jobs, time_limit, memory_limit, cache_path):
+      print(json.dumps(result), flush=True)
+
+def _option(name: str) -> Optional[str]:
+  return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else None
 
 if __name__ == '__main__': # pragma: no cover
-  # [--profile] <filename>
+  # [--profile] [--stats] [--cache <path>] <filename>
+  # --batch [--jobs N] [--time-limit S] [--memory-limit MiB] [--cache <path>] [<tasks.jsonl> | -]
+  if '--batch' in sys.argv:
+    VALUED = ('--jobs', '--time-limit', '--memory-limit', '--cache')
+    TASKS = '-' if sys.argv[-1] == '--batch' or sys.argv[-2] in VALUED else sys.argv[-1]
+    main_batch(TASKS,
+               int(_option('--jobs')) if _option('--jobs') else None,
+               float(_option('--time-limit')) if _option('--time-limit') else None,
+               float(_option('--memory-limit')) if _option('--memory-limit') else None,
+               _option('--cache'))
+    sys.exit(0)
   if len(sys.argv) == 1:
     print('error: missing required examples filename')
     sys.exit(1)
+  CACHE = ResultCache(_option('--cache')) if '--cache' in sys.argv else None
   EXAMPLES = read_examples(sys.argv[-1])
   # print(f'{examples=}')
   if '--profile' in sys.argv:
     with Profile() as profile:
-      main(EXAMPLES)
+      main(EXAMPLES, CACHE, '--stats' in sys.argv)
       (
         Stats(profile)
         .strip_dirs()
@@ -71,4 +115,4 @@ if __name__ == '__main__': # pragma: no cover
         .print_stats()
       )
   else:
-    main(EXAMPLES)
\ No newline at end of file
+    main(EXAMPLES, CACHE, '--stats' in sys.argv)
\ No newline at end of file
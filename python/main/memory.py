@@ -0,0 +1,204 @@
+'''
+Memory
+
+Measure how memory grows as a search expands states. Every `interval`
+expansions a sample records the bytes traced by tracemalloc, the process's
+current RSS, and an attribution of bytes to the search's structures:
+
+  frontier      the heap, its entries and the trees of the states in it
+  v_pre         the seen set and the trees of states no longer in the frontier
+  node_caches   the cached strings, costs, hole counts, heights and summaries of every
+                node (_str, _cost, _holes, _depth, _summaries)
+  match_caches  the compiled patterns alive in the process (with their DFAs),
+                the examples' move-to-front orders and, with --shared (which
+                uses SharedCaches), match verdicts, approximation patterns and
+                expansions
+
+Attribution walks every object, so a sample costs time proportional to the
+states seen; the counts are sys.getsizeof sizes, which leave out allocator
+overhead, so they add up to less than tracemalloc's figure.
+
+usage: python3 -m main.memory [--interval N] [--states N] [--shared] [--output samples.json] [<filename> ...]
+'''
+import gc
+import glob
+import json
+import os
+import sys
+import tracemalloc
+from typing import Optional
+from main.automaton import Automaton
+from main.glob_match import Glob, Prefiltered
+from main.helpers import CachedExamples, CountingExamples, OrderedExamples
+from main.main import read_examples
+from main.partial_regex import PartialRegexNode
+from main.search import Search, SharedCaches, current_rss_kb
+
+STRUCTURES = ('frontier', 'v_pre', 'node_caches', 'match_caches')
+
+def _tree_size(root: PartialRegexNode, seen: set[int]) -> tuple[int, int]:
+  # bytes of the nodes of a tree, and of their cached strings and costs, skipping nodes already seen
+  nodes = caches = 0
+  stack = [root]
+  while stack:
+    node = stack.pop()
+    if node is None or id(node) in seen:
+      continue
+    seen.add(id(node))
+    nodes += sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+    if node._str: # pylint: disable=protected-access
+      caches += sys.getsizeof(node._str) # pylint: disable=protected-access
+    caches += sys.getsizeof(node._cost) # pylint: disable=protected-access
+    caches += sys.getsizeof(node._holes) + sys.getsizeof(node._depth) # pylint: disable=protected-access
+    if node._summaries is not None: # pylint: disable=protected-access
+      caches += sum(sys.getsizeof(summary) for summary in node._summaries) # pylint: disable=protected-access
+    stack.append(node.left)
+    stack.append(node.right)
+  return nodes, caches
+
+def _compiled_size(compiled, seen: set[int]) -> int:
+  # bytes of a compiled pattern, with the NFA and the DFA states built for it so far, unless already counted
+  if id(compiled) in seen:
+    return 0
+  seen.add(id(compiled))
+  size = sys.getsizeof(compiled) + sys.getsizeof(compiled.__dict__)
+  if isinstance(compiled, Automaton):
+    nfa = compiled.nfa
+    size += sys.getsizeof(nfa) + sys.getsizeof(nfa.__dict__) + sys.getsizeof(nfa.labels) + \
+      sys.getsizeof(nfa.targets) + sys.getsizeof(nfa.epsilon) + sum(sys.getsizeof(moves) for moves in nfa.epsilon)
+    size += sys.getsizeof(compiled.states) + sum(
+      sys.getsizeof(state) + sys.getsizeof(state.nodes) + sys.getsizeof(state.next) for state in compiled.states.values())
+  elif isinstance(compiled, Prefiltered):
+    size += sys.getsizeof(compiled.factors) + _compiled_size(compiled.compiled, seen)
+  else:
+    size += sys.getsizeof(compiled.segments) + sys.getsizeof(compiled.wild)
+  return size
+
+def _examples_size(examples, seen: set[int]) -> int:
+  # bytes of the match caches held by an example set, less the compiled patterns themselves
+  size = 0
+  if isinstance(examples, CountingExamples):
+    if id(examples.patterns) not in seen:
+      # P and N share their PatternCache
+      seen.add(id(examples.patterns))
+      for compiled_patterns in (examples.patterns.patterns, examples.patterns.automata):
+        size += sys.getsizeof(compiled_patterns) + sum(sys.getsizeof(pattern) for pattern in compiled_patterns)
+    if isinstance(examples, CachedExamples):
+      size += sys.getsizeof(examples.all_verdicts) + sys.getsizeof(examples.any_verdicts)
+    examples = examples.examples
+  if isinstance(examples, OrderedExamples):
+    size += sys.getsizeof(examples.all_order) + sys.getsizeof(examples.any_order)
+  return size
+
+def attribute(s: Search) -> dict[str, int]:
+  '''
+  attribute bytes to the structures of a search
+
+  Args:
+      s (Search): the search
+
+  Returns:
+      dict[str, int]: bytes by structure (see STRUCTURES)
+  '''
+  sizes = dict.fromkeys(STRUCTURES, 0)
+  seen: set[int] = set()
+  sizes['frontier'] = sys.getsizeof(s.q)
+  for priority, _, state in s.q:
+    nodes, caches = _tree_size(state, seen)
+    sizes['frontier'] += sys.getsizeof((priority, 0, state)) + sys.getsizeof(priority) + nodes
+    sizes['node_caches'] += caches
+  sizes['v_pre'] = sys.getsizeof(s.v_pre)
+  for state in s.v_pre:
+    nodes, caches = _tree_size(state, seen)
+    sizes['v_pre'] += nodes
+    sizes['node_caches'] += caches
+  sizes['match_caches'] = _examples_size(s.P, seen) + _examples_size(s.N, seen)
+  # main.glob_match.matcher and main.automaton.automaton keep compiled patterns for the whole process in
+  # lru_caches, which cannot be listed, so every compiled pattern alive is counted (each once)
+  for compiled in gc.get_objects():
+    if isinstance(compiled, (Automaton, Glob, Prefiltered)):
+      sizes['match_caches'] += _compiled_size(compiled, seen)
+  if s.caches is not None:
+    library = s.caches.library
+    sizes['match_caches'] += sys.getsizeof(library) + sum(
+      sys.getsizeof(key) + sys.getsizeof(entry) + sum(sys.getsizeof(v) for v in entry.values())
+      for key, entry in library.items())
+    sizes['match_caches'] += sys.getsizeof(s.caches.expansions)
+    for expansion in s.caches.expansions.values():
+      sizes['match_caches'] += sys.getsizeof(expansion)
+      for state in expansion:
+        nodes, caches = _tree_size(state, seen)
+        sizes['match_caches'] += nodes + caches
+  return sizes
+
+def sample(file: str, interval: int = 500, max_states: int = 20_000, shared: bool = False) -> list[dict]:
+  '''
+  run a benchmark, sampling memory every interval expansions
+
+  Args:
+      file (str): examples file
+      interval (int, optional): expansions between samples. Defaults to 500.
+      max_states (int, optional): stop after this many expansions. Defaults to 20_000.
+      shared (bool, optional): use SharedCaches, so the match caches are measured. Defaults to False.
+
+  Returns:
+      list[dict]: samples of expanded, states (|v_pre|), traced_bytes, rss_kb, bytes_per_state and
+          bytes by structure; the last is taken when the search stops
+  '''
+  examples = read_examples(file, verbose=False)
+  gc.collect()
+  rss_before = current_rss_kb()
+  tracemalloc.start()
+  try:
+    s = Search(examples['P'], examples['N'], caches=SharedCaches() if shared else None)
+    samples = []
+    while True:
+      # step rather than run, which would pop from an empty frontier
+      target = min(s.expanded + interval, max_states)
+      while s.solution is None and s.q and s.expanded < target:
+        s.step()
+      stopped = s.solution is not None or not s.q or s.expanded >= max_states
+      traced, _ = tracemalloc.get_traced_memory()
+      sizes = attribute(s)
+      samples.append({'expanded': s.expanded, 'states': len(s.v_pre), 'traced_bytes': traced,
+                      'rss_kb': current_rss_kb() - rss_before, 'bytes_per_state': traced / len(s.v_pre), **sizes})
+      if stopped:
+        return samples
+  finally:
+    tracemalloc.stop()
+
+def plot(samples: list[dict], width: int = 60) -> str:
+  '''
+  a text plot of bytes per state against states expanded
+
+  Args:
+      samples (list[dict]): see sample
+      width (int, optional): columns for the largest value. Defaults to 60.
+
+  Returns:
+      str: one line per sample
+  '''
+  largest = max(row['bytes_per_state'] for row in samples)
+  return '\n'.join(f'{row["expanded"]:>8} | {"#" * round(row["bytes_per_state"] / largest * width):{width}} '
+                   f'{row["bytes_per_state"]:8.0f} B/state' for row in samples)
+
+if __name__ == '__main__': # pragma: no cover
+  VALUED = ('--interval', '--states', '--output')
+  def _option(name: str) -> Optional[str]:
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else None
+  FILES = [arg for i, arg in enumerate(sys.argv[1:], 1) if not arg.startswith('--') and sys.argv[i - 1] not in VALUED]
+  FILES = FILES or sorted(glob.glob('../benchmarks/no*'))
+  INTERVAL = int(_option('--interval')) if _option('--interval') else 500
+  STATES = int(_option('--states')) if _option('--states') else 20_000
+  RESULTS = {}
+  for FILE in FILES:
+    NAME = os.path.basename(FILE)
+    SAMPLES = RESULTS[NAME] = sample(FILE, INTERVAL, STATES, '--shared' in sys.argv)
+    LAST = SAMPLES[-1]
+    print(f'{NAME}: {LAST["expanded"]} expanded, {LAST["states"]} states, '
+          f'{LAST["traced_bytes"] / 2**20:.1f} MiB traced, {LAST["rss_kb"] / 1024:.1f} MiB RSS growth; '
+          + ', '.join(f'{structure} {LAST[structure] / 2**20:.1f} MiB' for structure in STRUCTURES))
+    print(plot(SAMPLES))
+  if _option('--output'):
+    with open(_option('--output'), 'w', encoding='utf-8') as f:
+      json.dump(RESULTS, f, indent=2)
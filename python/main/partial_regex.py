@@ -5,7 +5,9 @@ partial regex
 from enum import StrEnum
 from functools import total_ordering
 from typing import Self, Optional
+from main.abstraction import ExampleFacts, Summary, example_facts, misses_all, misses_some
 from main.helpers import matches_all, matches_any
+from main import abstraction, profiler
 
 class PartialRegexNodeType(StrEnum):
   '''
@@ -21,6 +23,21 @@ class PartialRegexNodeType(StrEnum):
   OPTIONAL = '?'
   HOLE = '□'
 
+# complexity cost of each kind of node (see PartialRegexNode.get_cost)
+COST_MODEL: dict[str, int] = {
+  'literal': 1,
+  'concatenation': 1,
+  'star': 20,
+  'optional': 20,
+  'union': 30,
+  'hole': 100,
+}
+
+# reasons a state is dead (see PartialRegexNode.dead_reason)
+DEAD_OVER = 'over'    # over-approximation misses some positive example
+DEAD_UNDER = 'under'  # under-approximation matches some negative example
+DEAD_SPLIT = 'split'  # some unrolled split part matches no positive example (redundant)
+
 @total_ordering
 class PartialRegexNode:
   '''
@@ -38,7 +55,10 @@ class PartialRegexNode:
         raise ValueError('length of literal must be exactly 1')
       self.literal = literal
     self._cost: int = -1
+    self._holes: int = -1
+    self._depth: int = -1
     self._str: str = ''
+    self._summaries: Optional[tuple[Summary, Summary]] = None
 
   def __eq__(self, other: Self) -> bool:
     return str(self) == str(other)
@@ -145,12 +165,12 @@ class PartialRegexNode:
     Returns:
         int: the cost
     '''
-    c_literal = 1
-    c_concatenation = 1
-    c_star = 20
-    c_optional = 20
-    c_union = 30
-    c_hole = 100
+    c_literal = COST_MODEL['literal']
+    c_concatenation = COST_MODEL['concatenation']
+    c_star = COST_MODEL['star']
+    c_optional = COST_MODEL['optional']
+    c_union = COST_MODEL['union']
+    c_hole = COST_MODEL['hole']
     match self.type:
       case PartialRegexNodeType.HOLE:
         return c_hole
@@ -164,6 +184,17 @@ class PartialRegexNode:
         return self.left.cost() + self.right.cost() + c_union
     return c_literal
 
+  def depth(self) -> int:
+    '''
+    the height of the node, computed once (see get_depth)
+
+    Returns:
+        int: the height
+    '''
+    if self._depth < 0:
+      self._depth = self.get_depth()
+    return self._depth
+
   def get_depth(self) -> int:
     '''
     compute the height of the node
@@ -175,9 +206,9 @@ class PartialRegexNode:
       case PartialRegexNodeType.HOLE:
         return 1
       case PartialRegexNodeType.STAR | PartialRegexNodeType.OPTIONAL:
-        return self.left.get_depth() + 1
+        return self.left.depth() + 1
       case PartialRegexNodeType.CONCATENATION | PartialRegexNodeType.UNION:
-        return max(self.left.get_depth(), self.right.get_depth()) + 1
+        return max(self.left.depth(), self.right.depth()) + 1
     return 1
 
   def cost(self) -> int:
@@ -199,31 +230,113 @@ class PartialRegexNode:
         Self: the copy
     '''
     s = PartialRegexNode(self.type, self.literal)
+    if self._summaries is not None and self._summaries[0] is self._summaries[1]:
+      # an expression without holes keeps its summaries, however it is later filled in around
+      s._summaries = self._summaries
+    if self._holes == 0:
+      # nor do its hole count and height change
+      s._holes, s._depth = 0, self._depth
     if self.left:
       s.left = self.left.copy()
     if self.right:
       s.right = self.right.copy()
     return s
 
+  def summaries(self) -> tuple[Summary, Summary]:
+    '''
+    summaries of the over- and under-approximation of this expression (see main.abstraction)
+
+    Returns:
+        tuple[Summary, Summary]: the summary with holes filled with .*, and with ∅
+    '''
+    if self._summaries is None:
+      self._summaries = self.get_summaries()
+    return self._summaries
+
+  def get_summaries(self) -> tuple[Summary, Summary]:
+    '''
+    compute the summaries of the approximations from those of the children
+
+    Raises:
+        ValueError: if type of node is unknown
+
+    Returns:
+        tuple[Summary, Summary]: the summary with holes filled with .*, and with ∅
+    '''
+    node_type = self.type
+    if node_type == PartialRegexNodeType.LITERAL:
+      s = abstraction.symbol(self.literal)
+      return s, s
+    if node_type == PartialRegexNodeType.HOLE:
+      return abstraction.ANY_STRING, abstraction.NOTHING
+    if node_type == PartialRegexNodeType.EMPTY_STRING:
+      return abstraction.EPSILON, abstraction.EPSILON
+    if node_type == PartialRegexNodeType.EMPTY_LANGUAGE:
+      return abstraction.NOTHING, abstraction.NOTHING
+    if node_type == PartialRegexNodeType.STAR:
+      combine = abstraction.star
+    elif node_type == PartialRegexNodeType.OPTIONAL:
+      combine = abstraction.optional
+    elif node_type == PartialRegexNodeType.CONCATENATION:
+      combine = abstraction.concatenation
+    elif node_type == PartialRegexNodeType.UNION:
+      combine = self.union_summary
+    else:
+      raise ValueError(f'unknown type: {self.type}')
+    if self.right is None:
+      over, under = self.left.summaries()
+      s = combine(over)
+      # without holes, both approximations are the expression itself
+      return (s, s) if over is under else (s, combine(under))
+    (left_over, left_under), (right_over, right_under) = self.left.summaries(), self.right.summaries()
+    s = combine(left_over, right_over)
+    if left_over is left_under and right_over is right_under:
+      return s, s
+    if node_type == PartialRegexNodeType.UNION:
+      return s, self.union_summary(left_under, right_under, False)
+    return s, combine(left_under, right_under)
+
+  def union_summary(self, left: Summary, right: Summary, over: bool = True) -> Summary:
+    '''
+    the summary of this union's approximation, from those of its sides
+
+    Args:
+        left (Summary): the summary of the left side's approximation
+        right (Summary): the summary of the right side's
+        over (bool, optional): the over-approximation (holes filled with .*) rather than the
+          under-approximation (∅). Defaults to True.
+
+    Returns:
+        Summary: the summary
+    '''
+    if PartialRegexNodeType.EMPTY_STRING in (self.left.type, self.right.type):
+      other = self.right if self.left.type == PartialRegexNodeType.EMPTY_STRING else self.left
+      # to_str prints this as x? around the other side's string, which lacks parentheses if
+      # that is a union with an ε or ∅ side (a hole in the under-approximation)
+      forwarding = (PartialRegexNodeType.EMPTY_STRING, PartialRegexNodeType.EMPTY_LANGUAGE) if over else \
+        (PartialRegexNodeType.EMPTY_STRING, PartialRegexNodeType.EMPTY_LANGUAGE, PartialRegexNodeType.HOLE)
+      if other.type == PartialRegexNodeType.UNION and (other.left.type in forwarding or other.right.type in forwarding):
+        return abstraction.ANYTHING
+    return abstraction.union(left, right)
+
   def holes(self) -> int:
     '''
-    the number of Holes in this node's expression
+    the number of Holes in this node's expression, computed once
 
     Returns:
         int: the number of holes
     '''
-    cnt = 0
-    q = [self]
-    while len(q) > 0:
-      node = q.pop()
-      if node.type == PartialRegexNodeType.HOLE:
-        cnt += 1
-      else:
-        if node.right:
-          q.append(node.right)
-        if node.left:
-          q.append(node.left)
-    return cnt
+    if self._holes < 0:
+      match self.type:
+        case PartialRegexNodeType.HOLE:
+          self._holes = 1
+        case PartialRegexNodeType.STAR | PartialRegexNodeType.OPTIONAL:
+          self._holes = self.left.holes()
+        case PartialRegexNodeType.CONCATENATION | PartialRegexNodeType.UNION:
+          self._holes = self.left.holes() + self.right.holes()
+        case _:
+          self._holes = 0
+    return self._holes
 
   def next_states(self, literals: str) -> list[Self]:
     states = []
@@ -404,53 +517,109 @@ class PartialRegexNode:
     Returns:
         bool: True iff this state is dead (cannot lead to a solution)
     '''
+    return self.dead_reason(P, N) is not None
+
+  def dead_reason(self, P: set[str], N: set[str], library: Optional[dict[str, dict]] = None,
+                  facts: Optional[tuple[Optional[ExampleFacts], Optional[ExampleFacts]]] = None) -> Optional[str]:
+    '''
+    determine why this state is dead, if it is. each check first compares the
+    approximation's summary with the examples' facts, and only matches when
+    that does not decide it
+
+    Args:
+        P (set[str]): positive examples
+        N (set[str]): negatvie examples
+        library (Optional[dict[str, dict]], optional): approximation patterns of previously
+          checked states, keyed by str(state); looked up and filled in. Defaults to None.
+        facts (Optional[tuple[Optional[ExampleFacts], Optional[ExampleFacts]]], optional): example_facts
+          of P and N, if already collected. Defaults to None.
+
+    Returns:
+        Optional[str]: DEAD_OVER, DEAD_UNDER or DEAD_SPLIT, or None if the state is alive
+    '''
+    profile = profiler.enabled
+    entry = {} if library is None else library.setdefault(str(self), {})
+    P_facts, N_facts = facts if facts is not None else (example_facts(P), example_facts(N))
+    over, under = self.summaries()
     # check for deadness
-    o = self.overapproximation()
-    s = o  # opt(o)
-    overapproximation = str(s)
-    # print(f"{overapproximation=}")
-    # if overapproximation == '..*??':
-    #   print(f'[DEBUG] state={repr(o)}')
-    #   raise ValueError('WTF!?')
-    if not matches_all(overapproximation, P):
+    if profile:
+      profiler.start_event('Dead.over')
+    if P_facts is not None and misses_some(over, P_facts):
+      dead = True
+    else:
+      if 'over' not in entry:
+        o = self.overapproximation()
+        s = o  # opt(o)
+        entry['over'] = str(s)
+      overapproximation = entry['over']
+      dead = not matches_all(overapproximation, P)
+    if profile:
+      profiler.finish_event('Dead.over')
+    if dead:
       # dead because does not match some positive examples
-      return True
-
-    u = self.underapproximation()
-    s = u  # opt(u)
-    underapproximation = str(s)
-    # print(f"{underapproximation=}")
-    if matches_any(underapproximation, N):
+      return DEAD_OVER
+
+    if profile:
+      profiler.start_event('Dead.under')
+    if N_facts is not None and misses_all(under, N_facts):
+      dead = False
+    else:
+      if 'under' not in entry:
+        u = self.underapproximation()
+        s = u  # opt(u)
+        entry['under'] = str(s)
+      underapproximation = entry['under']
+      dead = matches_any(underapproximation, N)
+    if profile:
+      profiler.finish_event('Dead.under')
+    if dead:
       # dead because matches some negative example
-      return True
+      return DEAD_UNDER
 
     # redundant states
-    A = self.unroll().split()
-    for e in A:
-      o = e.overapproximation()
-      overapproximation = o  # opt(o)
-      # print(f"{overapproximation=}")
-      pattern = str(overapproximation)
-      if not matches_any(pattern, P):
-        # dead because does not match any positive example
-        return True
-    return False
-
-  def is_solution(self, P: set[str], N: set[str]) -> bool:
+    if profile:
+      profiler.start_event('Dead.split')
+    if 'split' in entry:
+      parts = zip(entry['split'], entry['split_summaries'])
+    else:
+      A = self.unroll().split()
+      # o = opt(e.overapproximation())
+      parts = ((str(e.overapproximation()), e.summaries()[0]) for e in A)
+      if library is not None:
+        parts = list(parts)
+        entry['split'] = [pattern for pattern, _ in parts]
+        entry['split_summaries'] = [summary for _, summary in parts]
+    # dead if some split does not match any positive example
+    dead = any((P_facts is not None and misses_all(summary, P_facts)) or not matches_any(pattern, P)
+               for pattern, summary in parts)
+    if profile:
+      profiler.finish_event('Dead.split')
+    return DEAD_SPLIT if dead else None
+
+  def is_solution(self, P: set[str], N: set[str],
+                  facts: Optional[tuple[Optional[ExampleFacts], Optional[ExampleFacts]]] = None) -> bool:
     '''
     determines whether this state is a solution (matches all positive and no negetvie examples)
 
     Args:
         P (set[str]): positive examples
         N (set[str]): negative examples
+        facts (Optional[tuple[Optional[ExampleFacts], Optional[ExampleFacts]]], optional): example_facts
+          of P and N, if already collected. Defaults to None.
 
     Returns:
         bool: True iff the regex this state represents matches all positive and no negative examples
     '''
     if self.holes() > 0:
       return False
+    P_facts, N_facts = facts if facts is not None else (example_facts(P), example_facts(N))
+    summary = self.summaries()[0]
+    if P_facts is not None and misses_some(summary, P_facts):
+      return False
     pattern = str(self)  # str(opt((self)))
-    return matches_all(pattern, P) and not matches_any(pattern, N)
+    if not matches_all(pattern, P):
+      return False
+    return (N_facts is not None and misses_all(summary, N_facts)) or not matches_any(pattern, N)
 
 def Literal(symbol: str) -> PartialRegexNode:
   '''
@@ -550,6 +719,60 @@ def ZeroOrOne(s: PartialRegexNode = Hole()) -> PartialRegexNode:
   s1.left = s.copy()
   return s1
 
+def serialize(s: PartialRegexNode) -> str:
+  '''
+  encode a regex (tree) as an unambiguous prefix string, e.g. ·a0□ for 0□
+
+  Args:
+    s (PartialRegexNode): regex to encode
+
+  Returns:
+    str: the prefix encoding
+  '''
+  if s.type == PartialRegexNodeType.LITERAL:
+    return f'{s.type}{s.literal}'
+  encoding = str(s.type)
+  if s.left:
+    encoding += serialize(s.left)
+  if s.right:
+    encoding += serialize(s.right)
+  return encoding
+
+def deserialize(encoding: str) -> PartialRegexNode:
+  '''
+  decode a prefix string produced by serialize
+
+  Args:
+    encoding (str): the prefix encoding
+
+  Raises:
+    ValueError: if the encoding is malformed
+
+  Returns:
+    PartialRegexNode: the decoded regex
+  '''
+  def parse(i: int) -> tuple[PartialRegexNode, int]:
+    if i >= len(encoding):
+      raise ValueError(f'truncated encoding: {encoding}')
+    node_type = PartialRegexNodeType(encoding[i])
+    if node_type == PartialRegexNodeType.LITERAL:
+      if i + 1 >= len(encoding):
+        raise ValueError(f'truncated encoding: {encoding}')
+      return Literal(encoding[i + 1]), i + 2
+    node = PartialRegexNode(node_type)
+    i += 1
+    if node_type in (PartialRegexNodeType.STAR, PartialRegexNodeType.PLUS, PartialRegexNodeType.OPTIONAL,
+                     PartialRegexNodeType.CONCATENATION, PartialRegexNodeType.UNION):
+      node.left, i = parse(i)
+    if node_type in (PartialRegexNodeType.CONCATENATION, PartialRegexNodeType.UNION):
+      node.right, i = parse(i)
+    return node, i
+
+  node, end = parse(0)
+  if end != len(encoding):
+    raise ValueError(f'trailing characters in encoding: {encoding}')
+  return node
+
 def opt(s: PartialRegexNode) -> PartialRegexNode:
   '''
   simplify a regex
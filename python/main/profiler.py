@@ -0,0 +1,156 @@
+'''
+Profiler
+
+A named-event profiler, after ocaml/profiler.ml. Hot spots are wrapped in
+start_event/finish_event; while the profiler is enabled, the time of the
+outermost occurrence of each event is added to its total (a nested
+occurrence of the same event is not counted twice). Each occurrence can also
+be recorded for a Chrome trace-event file (chrome://tracing or Perfetto).
+
+Call sites check `profiler.enabled` before calling in, so that a disabled
+profiler costs one attribute lookup per event.
+
+events recorded by the search:
+  Worklist.choose      pop the cheapest state
+  Solution             check whether it is a solution
+  Dead.over            over-approximation misses a positive example
+  Dead.under           under-approximation matches a negative example
+  Dead.split           unroll/split redundancy
+  Expand               fill the first hole
+  Worklist.explored    v_pre membership test
+  Worklist.add.insert  push onto the frontier
+
+usage: python3 -m main.profiler [--trace <trace.json>] <filename>
+'''
+import json
+import os
+import sys
+import threading
+from time import perf_counter
+from typing import Optional, TextIO
+
+enabled = False
+tracing = False
+
+_totals: dict[str, float] = {}
+_counts: dict[str, int] = {}
+_depth: dict[str, int] = {}
+_started: dict[str, float] = {}
+_trace: list[tuple[str, float, float]] = []
+_log_start = perf_counter()
+
+def enable(trace: bool = False) -> None:
+  '''
+  start profiling, from a clean log
+
+  Args:
+      trace (bool, optional): also record every occurrence for write_trace. Defaults to False.
+  '''
+  global enabled, tracing # pylint: disable=global-statement
+  reset()
+  enabled = True
+  tracing = trace
+
+def disable() -> None:
+  '''
+  stop profiling; the log is kept for report and write_trace
+  '''
+  global enabled, tracing # pylint: disable=global-statement
+  enabled = False
+  tracing = False
+
+def reset() -> None:
+  '''
+  forget everything recorded so far
+  '''
+  global _log_start # pylint: disable=global-statement
+  _totals.clear()
+  _counts.clear()
+  _depth.clear()
+  _started.clear()
+  _trace.clear()
+  _log_start = perf_counter()
+
+def start_event(name: str) -> None:
+  '''
+  an event begins
+
+  Args:
+      name (str): the event
+  '''
+  depth = _depth.get(name, 0) + 1
+  _depth[name] = depth
+  if depth == 1:
+    _started[name] = perf_counter()
+
+def finish_event(name: str) -> None:
+  '''
+  an event ends; it must have been started
+
+  Args:
+      name (str): the event
+  '''
+  t = perf_counter()
+  depth = _depth[name] - 1
+  _depth[name] = depth
+  _counts[name] = _counts.get(name, 0) + 1
+  if depth == 0:
+    t0 = _started.pop(name)
+    _totals[name] = _totals.get(name, 0.0) + t - t0
+    if tracing:
+      _trace.append((name, t0, t - t0))
+
+def totals() -> dict[str, tuple[int, float]]:
+  '''
+  the aggregate log
+
+  Returns:
+      dict[str, tuple[int, float]]: occurrences and total seconds of each event
+  '''
+  return {name: (_counts[name], seconds) for name, seconds in _totals.items()}
+
+def report(stream: TextIO = sys.stdout) -> None:
+  '''
+  print the aggregate table: total seconds, share of the time since profiling began, calls and mean time
+
+  Args:
+      stream (TextIO, optional): where to print. Defaults to sys.stdout.
+  '''
+  total = perf_counter() - _log_start
+  print(f' - Total time  {total:.2f}s', file=stream)
+  print(f'   {"event":<20} {"seconds":>9} {"share":>7} {"calls":>10} {"mean us":>9}', file=stream)
+  for name, (count, seconds) in sorted(totals().items(), key=lambda item: -item[1][1]):
+    print(f'   {name:<20} {seconds:9.3f} {seconds / total * 100:6.2f}% {count:10} {seconds / count * 1e6:9.2f}',
+          file=stream)
+
+def write_trace(path: str) -> None:
+  '''
+  write the recorded occurrences as a Chrome trace-event JSON file
+
+  Args:
+      path (str): the file to write
+  '''
+  pid = os.getpid()
+  tid = threading.get_ident()
+  events = [{'name': name, 'ph': 'X', 'ts': (t0 - _log_start) * 1e6, 'dur': duration * 1e6, 'pid': pid, 'tid': tid}
+            for name, t0, duration in _trace]
+  with open(path, 'w', encoding='utf-8') as f:
+    json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+if __name__ == '__main__': # pragma: no cover
+  # [--trace <trace.json>] <filename>
+  # the search records into main.profiler, which is not this __main__ module
+  from main import profiler
+  from main.main import read_examples
+  from main.search import search
+  if len(sys.argv) == 1:
+    print('error: missing required examples filename')
+    sys.exit(1)
+  TRACE: Optional[str] = sys.argv[sys.argv.index('--trace') + 1] if '--trace' in sys.argv else None
+  EXAMPLES = read_examples(sys.argv[-1])
+  profiler.enable(trace=TRACE is not None)
+  print(search(EXAMPLES['P'], EXAMPLES['N']))
+  profiler.disable()
+  profiler.report()
+  if TRACE:
+    profiler.write_trace(TRACE)
@@ -2,11 +2,543 @@
 Search
 '''
 
+import asyncio
 import heapq
-from main.partial_regex import PartialRegexNode, Hole, opt, Star, Union, Literal, Concatenation
-from main.helpers import inflate_all
+import inspect
+import itertools
+import os
+import resource
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass, field
+from time import monotonic, perf_counter, time
+from typing import Callable, Iterable, Iterator, Optional
+from main.abstraction import example_facts
+from main.example_trie import example_set
+from main.partial_regex import PartialRegexNode, Hole, opt, DEAD_OVER, DEAD_UNDER, DEAD_SPLIT
+from main.helpers import (MAX_CACHE_ENTRIES, CachedExamples, CountingExamples, LRUDict, PatternCache, count_matches,
+                          inflate_all)
+from main.cache import ResultCache, task_key
+from main.glob_match import PATHS
+from main.symbolic_examples import MAX_INFLATED_SYMBOLS, SymbolicExamples, inflated_symbols
+from main import glob_match, profiler
 
-def search(P: set[str], N: set[str], alphabet: str = '01') -> str:
+@dataclass
+class SearchProgress:
+  '''
+  a snapshot of a running search
+  '''
+  expanded: int   # states popped from the frontier so far
+  frontier: int   # states waiting in the frontier
+  cost: int       # cost of the most recently popped state
+
+@dataclass
+class SearchStats:
+  '''
+  counters and timings collected by a search that is given one
+  '''
+  expanded: int = 0         # states popped from the frontier
+  generated: int = 0        # next states produced by expansion
+  duplicates: int = 0       # next states rejected because they were already in v_pre
+  pruned: dict[str, int] = field(default_factory=lambda: {DEAD_OVER: 0, DEAD_UNDER: 0, DEAD_SPLIT: 0})
+  evaluations: int = 0      # regex matches against a single example
+  visits: int = 0           # trie nodes walked instead (see main.example_trie)
+  cache_hits: int = 0       # compiled pattern, verdict and expansion reuses
+  peak_frontier: int = 0
+  paths: dict[str, int] = field(default_factory=lambda: dict.fromkeys(PATHS, 0))  # checks decided per glob_match path
+  seconds: dict[str, float] = field(default_factory=lambda: {'solution': 0.0, 'dead': 0.0, 'expand': 0.0})
+
+class SearchObserver:
+  '''
+  hooks called by a search as it runs; override the ones of interest.
+  a search without an observer does not call any
+  '''
+  def on_pop(self, state: PartialRegexNode) -> None:
+    '''
+    a state was taken from the frontier
+    '''
+
+  def on_prune(self, state: PartialRegexNode, reason: str) -> None:
+    '''
+    a state was found dead, for reason DEAD_OVER, DEAD_UNDER or DEAD_SPLIT
+    '''
+
+  def on_push(self, state: PartialRegexNode) -> None:
+    '''
+    a new state was added to the frontier
+    '''
+
+  def on_solution(self, state: PartialRegexNode, pattern: str) -> None:
+    '''
+    a state was accepted as a solution; pattern is its simplified regex
+    '''
+
+@dataclass
+class Budget:
+  '''
+  limits on a search; None means unlimited
+  '''
+  seconds: Optional[float] = None    # wall-clock time
+  states: Optional[int] = None       # states expanded
+  memory_mb: Optional[float] = None  # growth of the process's resident set size during the search
+
+@dataclass
+class SearchResult:
+  '''
+  the outcome of a budgeted search
+  '''
+  status: str                         # SOLVED, EXHAUSTED, or the budget that ran out: TIME, STATES, MEMORY
+  pattern: Optional[str]              # the solution, if SOLVED
+  best_partial: Optional[str]         # the lowest-cost state still in the frontier
+  best_closed: Optional[str]          # the closed regex seen that misclassifies the fewest examples
+  best_closed_errors: Optional[int]   # how many examples best_closed misclassifies
+  expanded: int
+  frontier: int
+  seconds: float
+  peak_rss_kb: int
+
+SOLVED = 'solved'
+EXHAUSTED = 'exhausted'
+TIME = 'time'
+STATES = 'states'
+MEMORY = 'memory'
+
+def peak_rss_kb() -> int:
+  '''
+  the peak resident set size of this process
+
+  Returns:
+      int: kilobytes
+  '''
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def current_rss_kb() -> int:
+  '''
+  the resident set size of this process now (the peak, where /proc is not available)
+
+  Returns:
+      int: kilobytes
+  '''
+  try:
+    with open('/proc/self/statm', 'r', encoding='utf-8') as f:
+      return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+  except OSError:
+    return peak_rss_kb()
+
+def priority_cost(state: PartialRegexNode) -> tuple:
+  '''
+  order the frontier by cost alone (ties: insertion order)
+  '''
+  return (state.cost(),)
+
+def priority_holes(state: PartialRegexNode) -> tuple:
+  '''
+  order the frontier by cost, then fewest holes (ties: insertion order)
+  '''
+  return (state.cost(), state.holes())
+
+def priority_holes_depth(state: PartialRegexNode) -> tuple:
+  '''
+  order the frontier by cost, then fewest holes, then shallowest (ties: insertion order)
+  '''
+  return (state.cost(), state.holes(), state.depth())
+
+# frontier priorities by name; every one ends with the insertion sequence, so
+# the order is total and runs are reproducible
+TIE_BREAKS: dict[str, Callable[[PartialRegexNode], tuple]] = {
+  'insertion': priority_cost,
+  'holes': priority_holes,
+  'holes-depth': priority_holes_depth,
+}
+# holes-depth expands fewer states on no02, no03 and no09 but more on no04, no06,
+# no08, no11, no12, no18, no29 and no30; python3 -m main.tie_breaks compares the policies.
+# Ordering ties by insertion, rather than by the old heap's comparison of the
+# trees, changes the solutions of six benchmarks (states expanded in brackets):
+#   no12  0.*00(11)* (5363)     -> 0000*(11)* (4969)       cost 51 both
+#   no13  1*.(1*01*)? (10801)   -> 1*.(.|(..1)*) (10616)   cost 100 -> 80
+#   no16  .(.*(0|11))* (14223)  -> .((0|11*.))* (12547)    cost 78 both
+#   no17  (0|0*.(.|00*)) (9696) -> (0|0*.(1|00*)) (9741)   cost 109 both
+#   no18  .((1|110))* (2738)    -> .(1(10)?)* (2967)       cost 58 both
+#   no19  0*((1|10))* (9018)    -> 0*(10?)* (8163)         cost 76 both
+DEFAULT_TIE_BREAK = 'insertion'
+
+class SharedCaches:
+  '''
+  structures that depend only on the alphabet, so searches over the same
+  alphabet can share them: compiled patterns, the approximation patterns of
+  every state checked so far, and the expansion of every state expanded so
+  far (whose nodes carry their cached encoding and cost). Each keeps its
+  max_entries most recently used entries, so a long-lived process sharing
+  them across many tasks stays within a fixed size
+  '''
+  def __init__(self, alphabet: str = '01', max_entries: int = MAX_CACHE_ENTRIES):
+    self.alphabet = alphabet
+    self.patterns = PatternCache(max_entries)
+    self.library: LRUDict = LRUDict(max_entries)
+    self.expansions: LRUDict = LRUDict(max_entries)
+    self.expansion_hits = 0
+
+  def next_states(self, state: PartialRegexNode) -> list[PartialRegexNode]:
+    '''
+    the next states of a state, computed once per alphabet
+
+    Args:
+        state (PartialRegexNode): the state
+
+    Returns:
+        list[PartialRegexNode]: its next states (shared; do not modify)
+    '''
+    key = str(state)
+    next_states = self.expansions.get(key)
+    if next_states is None:
+      next_states = self.expansions[key] = state.next_states(self.alphabet)
+    else:
+      self.expansion_hits += 1
+    return next_states
+
+  def report(self) -> dict[str, int]:
+    '''
+    how much work the caches have saved
+
+    Returns:
+        dict[str, int]: hit counts and sizes
+    '''
+    return {
+      'pattern_compiles_avoided': self.patterns.hits,
+      'patterns_compiled': self.patterns.misses,
+      'expansions_avoided': self.expansion_hits,
+      'expansions': len(self.expansions),
+      'library_states': len(self.library),
+      'evictions': self.patterns.evictions + self.library.evictions + self.expansions.evictions,
+    }
+
+class Search:
+  '''
+  a resumable best-first search; search() runs one to completion
+  '''
+  def __init__(self, P: set[str], N: set[str], alphabet: str = '01', caches: Optional[SharedCaches] = None,
+               tie_break: str = DEFAULT_TIE_BREAK, stats: Optional[SearchStats] = None,
+               observer: Optional[SearchObserver] = None, initial: Optional[PartialRegexNode] = None):
+    self.alphabet = alphabet
+    self.caches = caches
+    if caches is not None and caches.alphabet != alphabet:
+      raise ValueError(f'caches are for alphabet {caches.alphabet}, not {alphabet}')
+    # match X symbolically rather than inflate it, once inflating costs too much
+    self.symbolic = inflated_symbols(itertools.chain(P, N), alphabet) > MAX_INFLATED_SYMBOLS
+    if self.symbolic:
+      self.P = SymbolicExamples(P, alphabet)
+      self.N = SymbolicExamples(N, alphabet)
+    else:
+      self.P = example_set(inflate_all(P, alphabet))
+      self.N = example_set(inflate_all(N, alphabet))
+    if caches is not None:
+      # verdicts depend on the examples, so they stay with this search
+      self.P = CachedExamples(self.P, caches.patterns)
+      self.N = CachedExamples(self.N, caches.patterns)
+    elif stats is not None:
+      patterns = PatternCache()
+      self.P = CountingExamples(self.P, patterns)
+      self.N = CountingExamples(self.N, patterns)
+    self.stats = stats
+    # shared counters already hold earlier searches' hits
+    self.hits_before = self.P.patterns.hits + caches.expansion_hits if caches is not None else 0
+    if stats is not None:
+      # from now on, for the whole process
+      glob_match.counting = True
+    self.paths_before = dict(PATHS)
+    self.refresh_facts()
+    self.observer = observer
+    if tie_break not in TIE_BREAKS:
+      raise ValueError(f'unknown tie break: {tie_break}')
+    self.priority = TIE_BREAKS[tie_break]
+    self.sequence = 0
+    self.q: list[tuple[tuple, int, PartialRegexNode]] = []
+    if initial is not None:
+      self.v_pre: set[PartialRegexNode] = set()
+      self.push(initial)
+    else:
+      self.v_pre = {Hole()}
+      # preload queue with next states after Hole (which is never a solution)
+      for next_state in Hole().next_states(alphabet):
+        self.push(next_state)
+    self.expanded = 0
+    # states pruned as redundant, which more positive examples can revive (see add_examples)
+    self.split_pruned: list[PartialRegexNode] = []
+    self.cost = 0
+    self.solution: Optional[str] = None
+    self.solution_state: Optional[PartialRegexNode] = None
+    # (errors, cost, pattern) of the best closed regex, tracked by run_budgeted
+    self.track_best = False
+    self.best_closed: Optional[tuple[int, int, str]] = None
+
+  def push(self, state: PartialRegexNode) -> None:
+    '''
+    add a new state to the frontier
+
+    Args:
+        state (PartialRegexNode): a state not yet in v_pre
+    '''
+    heapq.heappush(self.q, (self.priority(state), self.sequence, state))
+    self.sequence += 1
+    self.v_pre.add(state)
+    if self.stats is not None and len(self.q) > self.stats.peak_frontier:
+      self.stats.peak_frontier = len(self.q)
+    if self.observer is not None:
+      self.observer.on_push(state)
+
+  def peek(self) -> Optional[PartialRegexNode]:
+    '''
+    the state the frontier will pop next
+
+    Returns:
+        Optional[PartialRegexNode]: the state, or None if the frontier is empty
+    '''
+    return self.q[0][2] if self.q else None
+
+  def progress(self) -> SearchProgress:
+    '''
+    report how far the search has come
+
+    Returns:
+        SearchProgress: the current progress
+    '''
+    return SearchProgress(self.expanded, len(self.q), self.cost)
+
+  def step(self) -> Optional[str]:
+    '''
+    pop one state, and either accept it as a solution or expand it
+
+    Returns:
+        Optional[str]: the solution, if this state was one
+    '''
+    stats = self.stats
+    observer = self.observer
+    profile = profiler.enabled
+    if stats is not None:
+      t0 = perf_counter()
+    if profile:
+      profiler.start_event('Worklist.choose')
+    _, _, state = heapq.heappop(self.q)
+    if profile:
+      profiler.finish_event('Worklist.choose')
+      profiler.start_event('Solution')
+    self.expanded += 1
+    self.cost = state.cost()
+    if observer is not None:
+      observer.on_pop(state)
+    solved = state.is_solution(self.P, self.N, self.facts)
+    if self.track_best and state.holes() == 0:
+      self.misclassified(state, solved)
+    if profile:
+      profiler.finish_event('Solution')
+    if stats is not None:
+      t1 = perf_counter()
+      stats.seconds['solution'] += t1 - t0
+    if solved:
+      self.solution = str(opt(state))
+      self.solution_state = state
+      if observer is not None:
+        observer.on_solution(state, self.solution)
+      return self.solution
+    reason = state.dead_reason(self.P, self.N, self.caches.library if self.caches is not None else None, self.facts)
+    if stats is not None:
+      t2 = perf_counter()
+      stats.seconds['dead'] += t2 - t1
+    if reason is not None:
+      if reason == DEAD_SPLIT:
+        self.split_pruned.append(state)
+      if stats is not None:
+        stats.pruned[reason] += 1
+      if observer is not None:
+        observer.on_prune(state, reason)
+    else:
+      # expand and add to queue
+      if profile:
+        profiler.start_event('Expand')
+      next_states = state.next_states(self.alphabet) if self.caches is None else self.caches.next_states(state)
+      if profile:
+        profiler.finish_event('Expand')
+      if stats is not None:
+        stats.generated += len(next_states)
+        duplicates = len(self.v_pre)
+      for next_state in next_states:
+        if profile:
+          profiler.start_event('Worklist.explored')
+          explored = next_state in self.v_pre
+          profiler.finish_event('Worklist.explored')
+          if not explored:
+            profiler.start_event('Worklist.add.insert')
+            self.push(next_state)
+            profiler.finish_event('Worklist.add.insert')
+        elif next_state not in self.v_pre:
+          self.push(next_state)
+      if stats is not None:
+        stats.duplicates += len(next_states) - (len(self.v_pre) - duplicates)
+        stats.seconds['expand'] += perf_counter() - t2
+    return None
+
+  def add_examples(self, P: Iterable[str] = (), N: Iterable[str] = ()) -> None:
+    '''
+    add examples to the search, keeping its frontier. more examples only make a state dead
+    sooner, except for a redundant state (DEAD_SPLIT), which a new positive example may
+    show is needed: those are checked again and returned to the frontier if they are now
+    alive. X is inflated unless this search keeps it symbolic (as decided when it was created)
+
+    Args:
+        P (Iterable[str], optional): positive examples (X matches any symbol). Defaults to ().
+        N (Iterable[str], optional): negative examples (X matches any symbol). Defaults to ().
+    '''
+    P, N = set(P), set(N)
+    if not self.symbolic:
+      P, N = inflate_all(P, self.alphabet), inflate_all(N, self.alphabet)
+    self.P |= P
+    self.N |= N
+    self.refresh_facts()
+    if P and self.split_pruned:
+      library = self.caches.library if self.caches is not None else None
+      pruned, self.split_pruned = self.split_pruned, []
+      for state in pruned:
+        if state.dead_reason(self.P, self.N, library, self.facts) is None:
+          self.push(state)
+        else:
+          self.split_pruned.append(state)
+
+  def refresh_facts(self) -> None:
+    '''
+    collect the facts about P and N that decide checks without matching (see main.abstraction);
+    call again after changing P or N in place
+    '''
+    self.facts = (example_facts(self.P, self.alphabet), example_facts(self.N, self.alphabet))
+
+  def statistics(self) -> Optional[SearchStats]:
+    '''
+    bring the counters kept outside the loop into the stats, if collecting them
+
+    Returns:
+        Optional[SearchStats]: the stats given to this search, or None
+    '''
+    stats = self.stats
+    if stats is None:
+      return None
+    stats.expanded = self.expanded
+    stats.evaluations = self.P.evaluations + self.N.evaluations
+    stats.visits = self.P.visits + self.N.visits
+    stats.cache_hits = self.P.patterns.hits - self.hits_before
+    if self.caches is not None:
+      stats.cache_hits += self.P.hits + self.N.hits + self.caches.expansion_hits
+    # PATHS counts for the whole process, so a search run interleaved with another shares its checks
+    stats.paths = {path: count - self.paths_before[path] for path, count in PATHS.items()}
+    return stats
+
+  def misclassified(self, state: PartialRegexNode, solved: bool = False) -> int:
+    '''
+    count the examples a closed state gets wrong, and remember the best closed state so far
+
+    Args:
+        state (PartialRegexNode): a state without holes
+        solved (bool, optional): the state is already known to be a solution, which gets none wrong.
+            Defaults to False.
+
+    Returns:
+        int: positive examples it rejects plus negative examples it accepts
+    '''
+    if solved:
+      errors = 0
+    else:
+      pattern = str(state)
+      errors = len(self.P) - count_matches(pattern, self.P) + count_matches(pattern, self.N)
+    candidate = (errors, state.cost(), str(opt(state)))
+    if self.best_closed is None or candidate < self.best_closed:
+      self.best_closed = candidate
+    return errors
+
+  def run_budgeted(self, budget: Budget, memory_check_interval: int = 64) -> SearchResult:
+    '''
+    step until a solution is found or the budget runs out, tracking the best closed regex on the way
+
+    Args:
+        budget (Budget): the limits
+        memory_check_interval (int, optional): steps between memory checks. Defaults to 64.
+
+    Returns:
+        SearchResult: the outcome, with the best results so far if no solution was found
+    '''
+    self.track_best = True
+    start = monotonic()
+    deadline = start + budget.seconds if budget.seconds is not None else None
+    memory_kb = budget.memory_mb * 1024 if budget.memory_mb is not None else None
+    # the growth since now, not the process's lifetime peak, which an earlier search may have set
+    baseline_kb = current_rss_kb() if memory_kb is not None else 0
+    status = SOLVED
+    steps = 0
+    while self.solution is None:
+      if not self.q:
+        status = EXHAUSTED
+        break
+      if budget.states is not None and self.expanded >= budget.states:
+        status = STATES
+        break
+      if deadline is not None and monotonic() >= deadline:
+        status = TIME
+        break
+      if memory_kb is not None and steps % memory_check_interval == 0 and \
+          current_rss_kb() - baseline_kb > memory_kb:
+        status = MEMORY
+        break
+      self.step()
+      steps += 1
+    best_closed = self.best_closed or (None, None, None)
+    return SearchResult(status, self.solution, str(self.peek()) if self.q else None, best_closed[2], best_closed[0],
+                        self.expanded, len(self.q), monotonic() - start, peak_rss_kb())
+
+  def solutions(self) -> Iterator[str]:
+    '''
+    enumerate distinct solutions lazily, resuming the same frontier for each next one.
+    Like search(), a solution is released once nothing cheaper is waiting in the
+    frontier, so solutions come out cheapest first; the first is search()'s.
+
+    Returns:
+        Iterator[str]: the solutions; ends if the frontier is exhausted
+    '''
+    found: list[tuple[int, int, str]] = []  # (cost, sequence, pattern) not yet released
+    released: set[str] = set()
+    sequence = 0
+    while True:
+      if self.solution is not None:
+        heapq.heappush(found, (self.solution_state.cost(), sequence, self.solution))
+        sequence += 1
+        self.solution = None
+      while found and (not self.q or found[0][0] <= self.peek().cost()):
+        _, _, pattern = heapq.heappop(found)
+        if pattern not in released:
+          released.add(pattern)
+          yield pattern
+      if not self.q:
+        return
+      self.step()
+
+  def run(self, max_steps: Optional[int] = None, deadline: Optional[float] = None) -> Optional[str]:
+    '''
+    step until a solution is found, or until a limit is reached
+
+    Args:
+        max_steps (Optional[int], optional): stop after this many steps (at least one is taken). Defaults to None.
+        deadline (Optional[float], optional): stop once time.monotonic() passes this. Defaults to None.
+
+    Returns:
+        Optional[str]: the solution, or None if a limit was reached first
+    '''
+    steps = 0
+    while self.solution is None:
+      self.step()
+      steps += 1
+      if max_steps is not None and steps >= max_steps:
+        break
+      if deadline is not None and monotonic() >= deadline:
+        break
+    return self.solution
+
+def search(P: set[str], N: set[str], alphabet: str = '01', cache: Optional[ResultCache] = None,
+           stats: Optional[SearchStats] = None) -> str:
   '''
   The search algorithm.
   Finds a regex that matches all positive and no negative examples.
@@ -15,45 +547,124 @@ def search(P: set[str], N: set[str], alphabet: str = '01') -> str:
       P (set[str]): positive examples
       N (set[str]): negative examples
       alphabet (str, optional): the input alphabet. Defaults to '01'.
+      cache (Optional[ResultCache], optional): consult (and fill) this result cache. Defaults to None.
+      stats (Optional[SearchStats], optional): fill these in while searching. Defaults to None (not collected).
+          a result cache hit leaves them untouched.
 
   Returns:
       str: a regex which matches all positive but no negative examples
   '''
-  P = inflate_all(P, alphabet)
-  N = inflate_all(N, alphabet)
-  # print(f"{P=}")
-  # print(f"{N=}")
-  q: list[PartialRegexNode] = []
-  v_pre: set[PartialRegexNode] = {Hole()}
-  # preload queue with next states after Hole (which is never a solution)
-  for next_state in Hole().next_states(alphabet):
-    heapq.heappush(q, next_state)
-    v_pre.add(next_state)
-  # solution_cost_limit = None
-  # target_state = Star(Union(Literal('0'), Concatenation(Literal('1'), Hole())))
+  if cache is None:
+    s = Search(P, N, alphabet, stats=stats)
+    pattern = s.run()
+    s.statistics()
+    return pattern
+  key = task_key(P, N, alphabet)
+  hit = cache.get(key)
+  if hit is not None:
+    return hit['pattern']
+  t1 = time()
+  s = Search(P, N, alphabet, stats=stats)
+  pattern = s.run()
+  summary = {'expanded': s.expanded, 'frontier': len(s.q), 'seconds': time() - t1}
+  if stats is not None:
+    summary.update(asdict(s.statistics()))
+  cache.put(key, pattern, s.solution_state.cost(), summary)
+  return pattern
+
+def search_with_budget(P: set[str], N: set[str], alphabet: str = '01', budget: Optional[Budget] = None,
+                       **limits) -> SearchResult:
+  '''
+  search() that stops cleanly when a budget runs out, returning the best it has so far
+
+  Args:
+      P (set[str]): positive examples
+      N (set[str]): negative examples
+      alphabet (str, optional): the input alphabet. Defaults to '01'.
+      budget (Optional[Budget], optional): the limits; alternatively pass Budget's fields as keywords.
+        Defaults to None.
+
+  Returns:
+      SearchResult: the outcome
+  '''
+  return Search(P, N, alphabet).run_budgeted(budget or Budget(**limits))
+
+def iter_solutions(P: set[str], N: set[str], alphabet: str = '01') -> Iterator[str]:
+  '''
+  lazily enumerate regexes that match all positive and no negative examples, cheapest first
+
+  Args:
+      P (set[str]): positive examples
+      N (set[str]): negative examples
+      alphabet (str, optional): the input alphabet. Defaults to '01'.
+
+  Returns:
+      Iterator[str]: distinct solutions; the first is the one search() returns
+  '''
+  return Search(P, N, alphabet).solutions()
+
+def search_many(tasks: Iterable[tuple[set[str], set[str]]], alphabet: str = '01',
+                caches: Optional[SharedCaches] = None) -> tuple[list[str], dict[str, int]]:
+  '''
+  search for each of several tasks over the same alphabet, sharing the
+  alphabet-level caches between them
+
+  Args:
+      tasks (Iterable[tuple[set[str], set[str]]]): (P, N) pairs
+      alphabet (str, optional): the input alphabet. Defaults to '01'.
+      caches (Optional[SharedCaches], optional): caches to share, e.g. with an earlier call. Defaults to None.
+
+  Returns:
+      tuple[list[str], dict[str, int]]: a solution per task, and a report of the work the caches avoided
+  '''
+  caches = caches if caches is not None else SharedCaches(alphabet)
+  patterns = []
+  verdict_hits = 0
+  for P, N in tasks:
+    s = Search(P, N, alphabet, caches)
+    patterns.append(s.run())
+    verdict_hits += s.P.hits + s.N.hits
+  report = caches.report()
+  report['verdicts_reused'] = verdict_hits
+  return patterns, report
+
+async def search_async(P: set[str], N: set[str], alphabet: str = '01',
+                       on_progress: Optional[Callable[[SearchProgress], None]] = None,
+                       slice_seconds: float = 0.005, progress_interval: float = 0.1,
+                       executor: Optional[Executor] = None) -> str:
+  '''
+  search() for asyncio: runs the search in short slices and yields to the event
+  loop between them, so it can be cancelled (e.g. by asyncio.wait_for) and
+  does not starve other tasks.
+
+  Args:
+      P (set[str]): positive examples
+      N (set[str]): negative examples
+      alphabet (str, optional): the input alphabet. Defaults to '01'.
+      on_progress (Optional[Callable[[SearchProgress], None]], optional): called (or awaited,
+        if it is a coroutine function) with the progress every progress_interval seconds. Defaults to None.
+      slice_seconds (float, optional): how long each slice may run. Defaults to 0.005.
+      progress_interval (float, optional): seconds between progress events. Defaults to 0.1.
+      executor (Optional[Executor], optional): run the slices off the event loop in this executor.
+        Defaults to None (run them on the loop).
+
+  Returns:
+      str: a regex which matches all positive but no negative examples
+  '''
+  loop = asyncio.get_running_loop()
+  s = Search(P, N, alphabet)
+  next_progress = monotonic() + progress_interval
   while True:
-    state = heapq.heappop(q)
-    # if state == target_state:
-    #   print()
-    #   print(f'[DEBUG] {state=} {state} {state.cost()}')
-    # print(state.cost())
-    if state.is_solution(P, N):  # and solution_cost_limit and state.cost() <= solution_cost_limit:
-      return str(opt(state))
-    if not state.is_dead(P, N):
-      # expand and add to queue
-      for next_state in state.next_states(alphabet):
-        # if state == target_state:
-        #   print(f'        {next_state=} {next_state}', end='')
-        # if next_state.cost() > cost_limit:
-        #   if state == target_state:
-        #     print(f"{next_state} is too expensive: {next_state.cost()}")
-        #   continue
-        if next_state not in v_pre:
-          heapq.heappush(q, next_state)
-          v_pre.add(next_state)
-    #     print(' added')
-      # else:
-      #   print(' NOT added')
-    # else:
-    #   if state == target_state:
-    #     print('        dead')
+    deadline = monotonic() + slice_seconds
+    if executor is None:
+      pattern = s.run(deadline=deadline)
+    else:
+      pattern = await loop.run_in_executor(executor, s.run, None, deadline)
+    if on_progress and (pattern is not None or monotonic() >= next_progress):
+      next_progress = monotonic() + progress_interval
+      event = on_progress(s.progress())
+      if inspect.isawaitable(event):
+        await event
+    if pattern is not None:
+      return pattern
+    await asyncio.sleep(0)
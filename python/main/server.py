@@ -0,0 +1,374 @@
+'''
+Server
+
+A long-running synthesis service on localhost HTTP. Jobs are queued by
+priority (lower runs first) and run on a fixed pool of worker processes that
+stay up between jobs, so interpreter start-up, the caches of compiled
+matchers (main.glob_match, main.automaton) and each worker's SharedCaches
+(compiled patterns, approximation verdicts and expansions, see
+main.search) are paid for once per worker rather than once per job. A
+worker process that dies (out of memory, say) fails its job and is
+replaced.
+
+  POST   /jobs       {"P": [...], "N": [...], "alphabet": "01", "budget": 10, "priority": 0} -> job
+  GET    /jobs       -> [job, ...]
+  GET    /jobs/<id>  -> job
+  DELETE /jobs/<id>  -> job (cancels it if queued or running)
+
+usage: python3 -m main.server [--port P] [--workers N]
+'''
+import heapq
+import itertools
+import json
+import multiprocessing
+import sys
+import threading
+from dataclasses import dataclass, field, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, time
+from typing import Optional
+from main.search import Search, SharedCaches
+
+DEFAULT_PORT = 5822
+
+@dataclass
+class Job:
+  '''
+  a synthesis job and its status
+  '''
+  id: int
+  P: list[str]
+  N: list[str]
+  alphabet: str = '01'
+  budget: Optional[float] = None   # seconds of search time
+  priority: int = 0
+  status: str = 'queued'           # queued, running, done, timeout, cancelled, failed
+  pattern: Optional[str] = None
+  error: Optional[str] = None
+  expanded: int = 0
+  submitted: float = field(default_factory=time)
+  started: Optional[float] = None
+  finished: Optional[float] = None
+
+  def report(self) -> dict:
+    '''
+    the job as JSON-ready data, with its latencies
+
+    Returns:
+        dict: the report
+    '''
+    report = asdict(self)
+    del report['P'], report['N']
+    report['queued_seconds'] = (self.started or self.finished or time()) - self.submitted
+    report['run_seconds'] = (self.finished or time()) - self.started if self.started else None
+    report['latency'] = self.finished - self.submitted if self.finished else None
+    return report
+
+def _worker_main(conn, cancel, slice_seconds: float) -> None:
+  '''
+  a warm worker process: runs jobs sent over conn until it receives None
+  '''
+  # kept across jobs, one per alphabet
+  caches: dict[str, SharedCaches] = {}
+  while True:
+    job = conn.recv()
+    if job is None:
+      return
+    try:
+      if job['alphabet'] not in caches:
+        caches[job['alphabet']] = SharedCaches(job['alphabet'])
+      s = Search(set(job['P']), set(job['N']), job['alphabet'], caches[job['alphabet']])
+      deadline = monotonic() + job['budget'] if job['budget'] is not None else None
+      status = 'done'
+      while s.run(deadline=monotonic() + slice_seconds) is None:
+        if cancel.is_set():
+          status = 'cancelled'
+          break
+        if deadline is not None and monotonic() >= deadline:
+          status = 'timeout'
+          break
+      conn.send({'status': status, 'pattern': s.solution, 'expanded': s.expanded})
+    except Exception as e: # pylint: disable=broad-exception-caught
+      conn.send({'status': 'failed', 'error': repr(e)})
+
+class _Worker:
+  '''
+  a dispatcher thread and the warm process it feeds
+  '''
+  def __init__(self, service: 'SynthesisService', slice_seconds: float):
+    self.service = service
+    self.slice_seconds = slice_seconds
+    self.cancel = multiprocessing.Event()
+    self.start()
+    self.job: Optional[Job] = None
+    self.thread = threading.Thread(target=self.dispatch, daemon=True)
+    self.thread.start()
+
+  def start(self) -> None:
+    '''
+    start a warm process
+    '''
+    self.conn, child_conn = multiprocessing.Pipe()
+    self.process = multiprocessing.Process(target=_worker_main, args=(child_conn, self.cancel, self.slice_seconds),
+                                           daemon=True)
+    self.process.start()
+    # only the process holds its end, so recv sees EOF if it dies
+    child_conn.close()
+
+  def restart(self) -> None:
+    '''
+    replace a process that died
+    '''
+    self.conn.close()
+    self.process.join(timeout=1)
+    if self.process.is_alive():
+      self.process.kill()
+      self.process.join()
+    self.start()
+
+  def dispatch(self) -> None:
+    '''
+    take jobs from the queue and run them, until the service closes
+    '''
+    while True:
+      # cleared before the next job is taken: once it is running, a cancel may arrive at any time
+      self.cancel.clear()
+      job = self.service.next_job(self)
+      if job is None:
+        try:
+          self.conn.send(None)
+        except OSError:
+          pass
+        return
+      try:
+        self.conn.send({'P': job.P, 'N': job.N, 'alphabet': job.alphabet, 'budget': job.budget})
+        result = self.conn.recv()
+      except (EOFError, OSError):
+        self.process.join(timeout=1)
+        result = {'status': 'failed', 'error': f'worker process exited with code {self.process.exitcode}'}
+        self.restart()
+      self.service.finish(self, job, result)
+
+class SynthesisService:
+  '''
+  a priority job queue served by a bounded pool of warm worker processes
+  '''
+  def __init__(self, workers: int = 2, slice_seconds: float = 0.05):
+    self.jobs: dict[int, Job] = {}
+    self.queue: list[tuple[int, int, int]] = []
+    self.ids = itertools.count(1)
+    self.condition = threading.Condition()
+    self.closed = False
+    self.workers = [_Worker(self, slice_seconds) for _ in range(workers)]
+
+  def submit(self, P: list[str], N: list[str], alphabet: str = '01', budget: Optional[float] = None,
+             priority: int = 0) -> Job:
+    '''
+    queue a job
+
+    Args:
+        P (list[str]): positive examples
+        N (list[str]): negative examples
+        alphabet (str, optional): the input alphabet. Defaults to '01'.
+        budget (Optional[float], optional): seconds of search time allowed. Defaults to None (unlimited).
+        priority (int, optional): lower runs first. Defaults to 0.
+
+    Raises:
+        TypeError: if an argument has the wrong type
+        ValueError: if the budget is negative
+
+    Returns:
+        Job: the queued job
+    '''
+    for name, examples in (('P', P), ('N', N)):
+      if not isinstance(examples, (list, tuple, set, frozenset)) or \
+          not all(isinstance(example, str) for example in examples):
+        raise TypeError(f'{name} must be a list of strings')
+    if not isinstance(alphabet, str):
+      raise TypeError('alphabet must be a string')
+    if budget is not None and (isinstance(budget, bool) or not isinstance(budget, (int, float))):
+      raise TypeError('budget must be a number of seconds')
+    if budget is not None and budget < 0:
+      raise ValueError('budget must not be negative')
+    if isinstance(priority, bool) or not isinstance(priority, int):
+      raise TypeError('priority must be an integer')
+    with self.condition:
+      job = Job(next(self.ids), list(P), list(N), alphabet, budget, priority)
+      self.jobs[job.id] = job
+      heapq.heappush(self.queue, (priority, job.id, job.id))
+      self.condition.notify()
+      return job
+
+  def next_job(self, worker: _Worker) -> Optional[Job]:
+    '''
+    block until a job is available (called by dispatcher threads)
+
+    Args:
+        worker (_Worker): the worker asking
+
+    Returns:
+        Optional[Job]: the job to run, or None once the service is closed
+    '''
+    with self.condition:
+      while True:
+        if self.closed:
+          return None
+        while self.queue:
+          _, _, job_id = heapq.heappop(self.queue)
+          job = self.jobs[job_id]
+          if job.status == 'queued':
+            job.status = 'running'
+            job.started = time()
+            worker.job = job
+            return job
+        self.condition.wait()
+
+  def finish(self, worker: _Worker, job: Job, result: dict) -> None:
+    '''
+    record the result of a job (called by dispatcher threads)
+
+    Args:
+        worker (_Worker): the worker that ran it
+        job (Job): the job
+        result (dict): what the worker process reported
+    '''
+    with self.condition:
+      worker.job = None
+      job.status = result['status']
+      job.pattern = result.get('pattern')
+      job.error = result.get('error')
+      job.expanded = result.get('expanded', 0)
+      job.finished = time()
+      self.condition.notify_all()
+
+  def cancel(self, job_id: int) -> Optional[Job]:
+    '''
+    cancel a queued or running job
+
+    Args:
+        job_id (int): the job
+
+    Returns:
+        Optional[Job]: the job, or None if there is no such job
+    '''
+    with self.condition:
+      job = self.jobs.get(job_id)
+      if job is None:
+        return None
+      if job.status == 'queued':
+        job.status = 'cancelled'
+        job.finished = time()
+      elif job.status == 'running':
+        for worker in self.workers:
+          if worker.job is job:
+            worker.cancel.set()
+      return job
+
+  def wait(self, job_id: int, timeout: Optional[float] = None) -> Job:
+    '''
+    block until a job has finished
+
+    Args:
+        job_id (int): the job
+        timeout (Optional[float], optional): seconds to wait. Defaults to None.
+
+    Returns:
+        Job: the job
+    '''
+    with self.condition:
+      self.condition.wait_for(lambda: self.jobs[job_id].finished is not None, timeout)
+      return self.jobs[job_id]
+
+  def close(self) -> None:
+    '''
+    stop the workers once their current jobs finish; queued jobs are dropped
+    '''
+    with self.condition:
+      self.closed = True
+      for worker in self.workers:
+        if worker.job:
+          worker.cancel.set()
+      self.condition.notify_all()
+    for worker in self.workers:
+      worker.thread.join()
+      worker.process.join()
+
+class _Handler(BaseHTTPRequestHandler):
+  def reply(self, code: int, body) -> None:
+    data = json.dumps(body).encode('utf-8')
+    self.send_response(code)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(data)))
+    self.end_headers()
+    self.wfile.write(data)
+
+  def job_id(self) -> Optional[int]:
+    parts = self.path.strip('/').split('/')
+    if len(parts) == 2 and parts[0] == 'jobs' and parts[1].isdigit():
+      return int(parts[1])
+    return None
+
+  def do_POST(self) -> None: # pylint: disable=invalid-name
+    if self.path.rstrip('/') != '/jobs':
+      self.reply(404, {'error': 'not found'})
+      return
+    try:
+      request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+      job = self.server.service.submit(request['P'], request['N'], request.get('alphabet', '01'),
+                                       request.get('budget'), request.get('priority', 0))
+    except (ValueError, KeyError, TypeError) as e:
+      self.reply(400, {'error': repr(e)})
+      return
+    self.reply(201, job.report())
+
+  def do_GET(self) -> None: # pylint: disable=invalid-name
+    service: SynthesisService = self.server.service
+    with service.condition:
+      if self.path.rstrip('/') == '/jobs':
+        body = [job.report() for job in service.jobs.values()]
+      else:
+        job = service.jobs.get(self.job_id())
+        body = job.report() if job is not None else None
+    if body is None:
+      self.reply(404, {'error': 'not found'})
+      return
+    self.reply(200, body)
+
+  def do_DELETE(self) -> None: # pylint: disable=invalid-name
+    job = self.server.service.cancel(self.job_id())
+    if job is None:
+      self.reply(404, {'error': 'not found'})
+      return
+    self.reply(200, job.report())
+
+  def log_message(self, format, *args) -> None: # pylint: disable=redefined-builtin
+    pass
+
+def serve(service: SynthesisService, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+  '''
+  start serving a service on localhost on a background thread
+
+  Args:
+      service (SynthesisService): the service
+      port (int, optional): port to bind (0 picks a free one). Defaults to DEFAULT_PORT.
+
+  Returns:
+      ThreadingHTTPServer: the running server; server.server_address has the bound address
+  '''
+  server = ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+  server.service = service
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server
+
+if __name__ == '__main__': # pragma: no cover
+  # [--port P] [--workers N]
+  PORT = int(sys.argv[sys.argv.index('--port') + 1]) if '--port' in sys.argv else DEFAULT_PORT
+  WORKERS = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else 2
+  SERVICE = SynthesisService(WORKERS)
+  SERVER = serve(SERVICE, PORT)
+  print(f'serving on http://127.0.0.1:{PORT}/jobs with {WORKERS} workers')
+  try:
+    threading.Event().wait()
+  except KeyboardInterrupt:
+    SERVER.shutdown()
+    SERVICE.close()
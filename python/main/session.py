@@ -0,0 +1,89 @@
+'''
+Session
+
+An incremental synthesis session. Adding examples only makes a task
+stricter, so every state the search has already found dead stays dead (but
+for states pruned as redundant, which Search.add_examples re-checks) and the
+frontier it has built is still a complete frontier: after new examples
+arrive the session re-checks its last solution and then simply resumes the
+same search, instead of starting over from a hole.
+
+Examples are kept as given, X and all: the search decides whether to
+inflate them (see main.symbolic_examples).
+'''
+from typing import Iterable, Optional
+from main.search import Search
+from main.symbolic_examples import WILDCARD
+
+def _overlap(a: str, b: str) -> bool:
+  # whether two examples have a concretization in common
+  return len(a) == len(b) and all(x == y or WILDCARD in (x, y) for x, y in zip(a, b))
+
+class SynthesisSession:
+  '''
+  a search that keeps its frontier and dead verdicts as examples are added
+  '''
+  def __init__(self, P: Iterable[str] = (), N: Iterable[str] = (), alphabet: str = '01'):
+    self.alphabet = alphabet
+    self.P: set[str] = set()
+    self.N: set[str] = set()
+    self.search: Optional[Search] = None
+    self.add_positive(*P)
+    self.add_negative(*N)
+
+  def _add(self, examples: Iterable[str], into: set[str], other: set[str]) -> None:
+    added = set(examples) - into
+    conflicts = {example for example in added if any(_overlap(example, o) for o in other)}
+    if conflicts:
+      raise ValueError(f'examples are both positive and negative: {sorted(conflicts)}')
+    into |= added
+    if self.search is not None:
+      # the search holds the same examples it was created with, plus these
+      if into is self.P:
+        self.search.add_examples(P=added)
+      else:
+        self.search.add_examples(N=added)
+
+  def add_positive(self, *examples: str) -> None:
+    '''
+    add positive examples
+
+    Args:
+        examples (str): the examples (X matches any symbol)
+
+    Raises:
+        ValueError: if an example is already negative
+    '''
+    self._add(examples, self.P, self.N)
+
+  def add_negative(self, *examples: str) -> None:
+    '''
+    add negative examples
+
+    Args:
+        examples (str): the examples (X matches any symbol)
+
+    Raises:
+        ValueError: if an example is already positive
+    '''
+    self._add(examples, self.N, self.P)
+
+  def solve(self, max_steps: Optional[int] = None, deadline: Optional[float] = None) -> Optional[str]:
+    '''
+    find a regex for the examples so far, resuming the previous search
+
+    Args:
+        max_steps (Optional[int], optional): give up after this many steps. Defaults to None.
+        deadline (Optional[float], optional): give up once time.monotonic() passes this. Defaults to None.
+
+    Returns:
+        Optional[str]: the solution, or None if a limit was reached first
+    '''
+    if self.search is None:
+      self.search = Search(self.P, self.N, self.alphabet)
+    s = self.search
+    if s.solution_state is not None and not s.solution_state.is_solution(s.P, s.N):
+      # the last solution is refuted; every other candidate is still in the frontier
+      s.solution = None
+      s.solution_state = None
+    return s.run(max_steps, deadline)
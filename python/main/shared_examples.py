@@ -0,0 +1,173 @@
+'''
+Shared examples
+
+Inflated examples packed once into a multiprocessing.shared_memory block so
+that every worker process matches against the same bytes instead of keeping
+its own inflated copy.
+
+block layout (little endian uint32s, then latin-1 bytes):
+  |P| |N| offset[0] ... offset[|P|+|N|] data
+example i occupies data[offset[i]:offset[i+1]]; P comes first, then N.
+'''
+import multiprocessing
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterator, Self
+from main.glob_match import matcher
+from main.helpers import ExampleSet, inflate_all
+
+_HEADER = struct.Struct('<II')
+_OFFSET = struct.Struct('<I')
+
+class SharedExampleView(ExampleSet):
+  '''
+  one side (P or N) of a shared block; iterating yields zero-copy memoryviews
+  '''
+  def __init__(self, block: 'SharedExamples', start: int, stop: int):
+    self.block = block
+    self.start = start
+    self.stop = stop
+
+  def __len__(self) -> int:
+    return self.stop - self.start
+
+  def __iter__(self) -> Iterator[memoryview]:
+    buf = self.block.buf
+    data = self.block.data_start
+    offsets = self.block.offsets
+    for i in range(self.start, self.stop):
+      yield buf[data + offsets[i]:data + offsets[i + 1]]
+
+  def matches_all(self, pattern: str) -> bool:
+    compiled = matcher(pattern)
+    for example in self:
+      if not compiled.fullmatch(example):
+        return False
+    return True
+
+  def matches_any(self, pattern: str) -> bool:
+    compiled = matcher(pattern)
+    for example in self:
+      if compiled.fullmatch(example):
+        return True
+    return False
+
+  def count_matches(self, pattern: str) -> int:
+    compiled = matcher(pattern)
+    return sum(1 for example in self if compiled.fullmatch(example))
+
+  def strings(self) -> set[str]:
+    '''
+    copy the examples out of shared memory
+
+    Returns:
+        set[str]: the examples
+    '''
+    return {bytes(example).decode('latin-1') for example in self}
+
+class SharedExamples:
+  '''
+  positive and negative examples in a shared memory block
+  '''
+  def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+    self.shm = shm
+    self.owner = owner
+    self.buf = shm.buf
+    n_p, n_n = _HEADER.unpack_from(self.buf, 0)
+    count = n_p + n_n
+    self.offsets = self.buf[_HEADER.size:_HEADER.size + _OFFSET.size * (count + 1)].cast('I')
+    self.data_start = _HEADER.size + _OFFSET.size * (count + 1)
+    self.P = SharedExampleView(self, 0, n_p)
+    self.N = SharedExampleView(self, n_p, count)
+
+  @property
+  def name(self) -> str:
+    '''
+    the name other processes attach by
+
+    Returns:
+        str: the shared memory name
+    '''
+    return self.shm.name
+
+  @classmethod
+  def create(cls, P: set[str], N: set[str], alphabet: str = '01') -> Self:
+    '''
+    inflate the examples and pack them into a new shared memory block
+
+    Args:
+        P (set[str]): positive examples
+        N (set[str]): negative examples
+        alphabet (str, optional): the input alphabet. Defaults to '01'.
+
+    Raises:
+        ValueError: if an example is not representable in latin-1
+
+    Returns:
+        Self: the owning handle; call close() (which unlinks) when done
+    '''
+    return cls.pack(inflate_all(P, alphabet), inflate_all(N, alphabet))
+
+  @classmethod
+  def pack(cls, P: set[str], N: set[str]) -> Self:
+    '''
+    pack examples that are already inflated into a new shared memory block
+
+    Args:
+        P (set[str]): inflated positive examples
+        N (set[str]): inflated negative examples
+
+    Raises:
+        ValueError: if an example is not representable in latin-1
+
+    Returns:
+        Self: the owning handle; call close() (which unlinks) when done
+    '''
+    positives = sorted(P)
+    negatives = sorted(N)
+    examples = positives + negatives
+    n_p = len(positives)
+    encoded = [example.encode('latin-1') for example in examples]
+    offsets = [0]
+    for example in encoded:
+      offsets.append(offsets[-1] + len(example))
+    data_start = _HEADER.size + _OFFSET.size * len(offsets)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, data_start + offsets[-1]))
+    _HEADER.pack_into(shm.buf, 0, n_p, len(negatives))
+    struct.pack_into(f'<{len(offsets)}I', shm.buf, _HEADER.size, *offsets)
+    shm.buf[data_start:data_start + offsets[-1]] = b''.join(encoded)
+    return cls(shm, owner=True)
+
+  @classmethod
+  def attach(cls, name: str) -> Self:
+    '''
+    attach to a block created by another process
+
+    Args:
+        name (str): the block's name
+
+    Returns:
+        Self: a handle; call close() when done
+    '''
+    shm = shared_memory.SharedMemory(name=name)
+    if multiprocessing.parent_process() is None:
+      # an unrelated process has its own resource tracker, which would
+      # otherwise unlink the block when this process exits
+      resource_tracker.unregister(shm._name, 'shared_memory') # pylint: disable=protected-access
+    return cls(shm, owner=False)
+
+  def close(self) -> None:
+    '''
+    detach from the block (and unlink it, if this handle created it)
+    '''
+    self.offsets.release()
+    self.buf = None
+    self.shm.close()
+    if self.owner:
+      self.shm.unlink()
+
+  def __enter__(self) -> Self:
+    return self
+
+  def __exit__(self, *_) -> None:
+    self.close()
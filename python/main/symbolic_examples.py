@@ -0,0 +1,130 @@
+'''
+Symbolic examples
+
+Examples whose X stands for any symbol of the alphabet, matched without
+inflating them. An example with k Xs inflates to |alphabet|^k strings;
+here it is one path of an example trie (see main.example_trie), walked with
+the set of DFA states its concretizations can be in: a literal moves each
+state on that symbol, an X on every symbol of the alphabet. Every
+concretization matches if every state reached at the end accepts, and some
+concretization matches if any does. The DFA has at most as many states as
+the pattern makes, so a set never grows with k.
+
+len and count_matches count concretizations, as the inflated set would,
+except that two examples whose concretizations overlap (0X and 00) count
+their common ones twice.
+
+A set of states costs more to move than one state, so a few Xs are still
+better inflated: Search keeps X symbolic once inflating would add more than
+MAX_INFLATED_SYMBOLS symbols to the examples.
+'''
+from typing import Iterable, Optional
+from main.example_trie import TrieExamples
+from main.helpers import PatternCache
+
+WILDCARD = 'X'
+MAX_INFLATED_SYMBOLS = 16384
+
+def inflated_symbols(examples: Iterable[str], alphabet: str) -> int:
+  '''
+  the symbols that inflating some examples would add to them, without inflating them
+
+  Args:
+      examples (Iterable[str]): the examples
+      alphabet (str): the symbols an X stands for
+
+  Returns:
+      int: the total length of the inflated examples (counting overlaps between examples twice), less that
+        of the examples
+  '''
+  return sum(len(example) * (len(alphabet) ** example.count(WILDCARD) - 1) for example in examples)
+
+class SymbolicExamples(TrieExamples):
+  '''
+  examples with X kept symbolic, in a trie walked with sets of DFA states
+  '''
+  def __init__(self, examples: set[str], alphabet: str = '01', patterns: Optional[PatternCache] = None):
+    self.alphabet = alphabet
+    self.concretizations = 0
+    super().__init__(examples, patterns)
+
+  def add(self, example: str) -> bool:
+    added = super().add(example)
+    if added:
+      self.concretizations += len(self.alphabet) ** example.count(WILDCARD)
+    return added
+
+  def __len__(self) -> int:
+    return self.concretizations
+
+  def _moves(self, compiled, states, symbol: str) -> set:
+    # the states reached from some states on a symbol, or on every symbol for an X
+    step = compiled.step
+    reached = set()
+    for state in states:
+      transitions = state.next
+      for a in (self.alphabet if symbol == WILDCARD else symbol):
+        following = transitions.get(a)
+        reached.add(following if following is not None else step(state, a))
+    return reached
+
+  def matches_all(self, pattern: str) -> bool:
+    compiled = self.compile(pattern)
+    moves = self._moves
+    stack = [(self.root, (compiled.start,))]
+    visited = 0
+    while stack:
+      node, states = stack.pop()
+      visited += 1
+      if node.terminal and not all(state.accepting for state in states):
+        self.visits += visited
+        return False
+      for symbol, child in node.children.items():
+        following = moves(compiled, states, symbol)
+        if any(state.dead for state in following):
+          # some concretization of an example below cannot match
+          self.visits += visited
+          return False
+        stack.append((child, following))
+    self.visits += visited
+    return True
+
+  def matches_any(self, pattern: str) -> bool:
+    compiled = self.compile(pattern)
+    moves = self._moves
+    stack = [(self.root, (compiled.start,))]
+    visited = 0
+    while stack:
+      node, states = stack.pop()
+      visited += 1
+      if node.terminal and any(state.accepting for state in states):
+        self.visits += visited
+        return True
+      for symbol, child in node.children.items():
+        following = {state for state in moves(compiled, states, symbol) if not state.dead}
+        if following:
+          stack.append((child, following))
+    self.visits += visited
+    return False
+
+  def count_matches(self, pattern: str) -> int:
+    compiled = self.compile(pattern)
+    step = compiled.step
+    # the states reached, each with the number of concretizations of the prefix that reach it
+    stack = [(self.root, {compiled.start: 1})]
+    count = 0
+    while stack:
+      node, states = stack.pop()
+      self.visits += 1
+      if node.terminal:
+        count += sum(n for state, n in states.items() if state.accepting)
+      for symbol, child in node.children.items():
+        following: dict = {}
+        for state, n in states.items():
+          for a in (self.alphabet if symbol == WILDCARD else symbol):
+            reached = state.next.get(a) or step(state, a)
+            if not reached.dead:
+              following[reached] = following.get(reached, 0) + n
+        if following:
+          stack.append((child, following))
+    return count
@@ -0,0 +1,49 @@
+'''
+Tie breaks
+
+Measure how each frontier tie-break policy (search.TIE_BREAKS) affects the
+number of states expanded on the benchmarks.
+
+usage: python3 -m main.tie_breaks [--states N] [--seconds S] [<filename> ...]
+'''
+import glob
+import sys
+from time import monotonic
+from main.main import read_examples
+from main.search import STATES, TIME, Budget, Search, TIE_BREAKS
+
+def measure(files: list[str], budget: Budget) -> dict[str, dict[str, tuple[int, str]]]:
+  '''
+  run every benchmark under every policy
+
+  Args:
+      files (list[str]): examples files
+      budget (Budget): the budget for each run
+
+  Returns:
+      dict[str, dict[str, tuple[int, str]]]: file -> policy -> (states expanded, pattern or status)
+  '''
+  results: dict[str, dict[str, tuple[int, str]]] = {}
+  for file in files:
+    examples = read_examples(file, verbose=False)
+    results[file] = {}
+    for policy in TIE_BREAKS:
+      # run, as search() does, rather than run_budgeted, which also counts the errors of closed states
+      s = Search(examples['P'], examples['N'], tie_break=policy)
+      deadline = monotonic() + budget.seconds if budget.seconds is not None else None
+      pattern = s.run(max_steps=budget.states, deadline=deadline)
+      if pattern is None:
+        pattern = STATES.upper() if budget.states is not None and s.expanded >= budget.states else TIME.upper()
+      results[file][policy] = (s.expanded, pattern)
+  return results
+
+if __name__ == '__main__': # pragma: no cover
+  STATES = int(sys.argv[sys.argv.index('--states') + 1]) if '--states' in sys.argv else 20_000
+  SECONDS = float(sys.argv[sys.argv.index('--seconds') + 1]) if '--seconds' in sys.argv else 10
+  FILES = [arg for i, arg in enumerate(sys.argv[1:], 1) if not arg.startswith('--') and not sys.argv[i - 1].startswith('--')]
+  FILES = FILES or sorted(glob.glob('../benchmarks/no*'))
+  RESULTS = measure(FILES, Budget(seconds=SECONDS, states=STATES))
+  print(f"{'benchmark':40}" + ''.join(f' | {policy:>24}' for policy in TIE_BREAKS))
+  for FILE, BY_POLICY in RESULTS.items():
+    print(f'{FILE.split("/")[-1][:40]:40}'
+          + ''.join(f' | {f"{n} {pattern}"[:24]:>24}' for n, pattern in BY_POLICY.values()))
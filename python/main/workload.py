@@ -0,0 +1,184 @@
+'''
+Workload
+
+Synthetic tasks for scaling studies. Given a target regex, sample positive
+and negative examples at a chosen count, length range, alphabet and density
+of X wildcards, and write them in the format main.read_examples reads
+(the search must then be given the same alphabet). The sweep varies one of
+those axes and charts how the search scales along it.
+
+Examples are drawn uniformly at random and sorted by the target, so a
+target that accepts (or rejects) almost every string of the given lengths
+cannot supply many examples of the other kind. An X stands for every symbol,
+so one is only kept where every inflation of the example stays on the same
+side of the target; checking that is exponential in the number of Xs, so at
+most max_wildcards of them are placed in any example.
+
+usage: python3 -m main.workload generate [--target RE] [--positive N] [--negative N] [--min-length N]
+                                         [--max-length N] [--alphabet S] [--x-density D] [--seed N] <filename>
+       python3 -m main.workload sweep --axis count|length|alphabet|density --values V,V,... [--target RE]
+                                      [--seconds S] [--states N]
+'''
+import itertools
+import random
+import re
+import sys
+from dataclasses import dataclass, replace
+from time import perf_counter
+from typing import Optional
+from main.search import Budget, Search
+
+@dataclass
+class Workload:
+  '''
+  what to generate
+  '''
+  target: str = '.*01'
+  positive: int = 20
+  negative: int = 20
+  min_length: int = 0
+  max_length: int = 16
+  alphabet: str = '01'
+  x_density: float = 0.0      # chance that a symbol becomes an X
+  max_wildcards: int = 6      # most Xs in one example
+  seed: int = 0
+
+def _wildcards(rng: random.Random, example: str, accepted: bool, target: re.Pattern, w: Workload) -> str:
+  # replace symbols by X with probability x_density, keeping only Xs under which the example's class holds
+  symbols = list(example)
+  positions = [i for i in range(len(symbols)) if rng.random() < w.x_density]
+  rng.shuffle(positions)
+  placed: list[int] = []
+  for position in positions[:w.max_wildcards]:
+    candidate = placed + [position]
+    if all(bool(target.fullmatch(''.join(_fill(symbols, candidate, fill)))) == accepted
+           for fill in itertools.product(w.alphabet, repeat=len(candidate))):
+      placed = candidate
+  for position in placed:
+    symbols[position] = 'X'
+  return ''.join(symbols)
+
+def _fill(symbols: list[str], positions: list[int], fill: tuple[str, ...]) -> list[str]:
+  filled = list(symbols)
+  for position, symbol in zip(positions, fill):
+    filled[position] = symbol
+  return filled
+
+def generate(w: Workload, max_attempts: int = 1_000_000) -> tuple[set[str], set[str]]:
+  '''
+  sample examples of a target regex
+
+  Args:
+      w (Workload): what to generate
+      max_attempts (int, optional): strings to draw before giving up. Defaults to 1_000_000.
+
+  Raises:
+      ValueError: if too few positive or negative examples turn up in max_attempts draws
+
+  Returns:
+      tuple[set[str], set[str]]: positive and negative examples
+  '''
+  rng = random.Random(w.seed)
+  target = re.compile(w.target)
+  P: set[str] = set()
+  N: set[str] = set()
+  for _ in range(max_attempts):
+    if len(P) >= w.positive and len(N) >= w.negative:
+      break
+    example = ''.join(rng.choices(w.alphabet, k=rng.randint(w.min_length, w.max_length)))
+    accepted = target.fullmatch(example) is not None
+    examples, wanted = (P, w.positive) if accepted else (N, w.negative)
+    if len(examples) < wanted:
+      if w.x_density > 0:
+        example = _wildcards(rng, example, accepted, target, w)
+      examples.add(example)
+  if len(P) < w.positive or len(N) < w.negative:
+    raise ValueError(f'found {len(P)} of {w.positive} positive and {len(N)} of {w.negative} negative examples '
+                     f'of {w.target} in {max_attempts} draws')
+  return P, N
+
+def write_examples(path: str, description: str, P: set[str], N: set[str]) -> None:
+  '''
+  write examples in the format main.read_examples reads
+
+  Args:
+      path (str): the file
+      description (str): the first line
+      P (set[str]): positive examples
+      N (set[str]): negative examples
+  '''
+  with open(path, 'w', encoding='utf-8') as f:
+    f.write(f'{description}\n++\n')
+    f.writelines(f'{example}\n' for example in sorted(P))
+    f.write('--\n')
+    f.writelines(f'{example}\n' for example in sorted(N))
+
+# how each sweep axis sets its value on a workload
+AXES = {
+  'count': lambda w, value: replace(w, positive=int(value), negative=int(value)),
+  'length': lambda w, value: replace(w, min_length=int(value) // 2, max_length=int(value)),
+  'alphabet': lambda w, value: replace(w, alphabet='0123456789abcdefghijklmnopqrstuvwxyz'[:int(value)]),
+  'density': lambda w, value: replace(w, x_density=float(value)),
+}
+
+def sweep(axis: str, values: list, base: Workload, budget: Budget) -> list[dict]:
+  '''
+  generate a workload for each value of one axis and search it
+
+  Args:
+      axis (str): one of AXES
+      values (list): the values of the axis
+      base (Workload): the other settings
+      budget (Budget): the budget for each search
+
+  Returns:
+      list[dict]: per value: value, status, pattern, expanded and seconds
+  '''
+  rows = []
+  for value in values:
+    w = AXES[axis](base, value)
+    P, N = generate(w)
+    t0 = perf_counter()
+    result = Search(P, N, w.alphabet).run_budgeted(budget)
+    rows.append({'value': value, 'status': result.status, 'pattern': result.pattern, 'expanded': result.expanded,
+                 'seconds': perf_counter() - t0})
+  return rows
+
+def chart(rows: list[dict], width: int = 50) -> str:
+  '''
+  a text chart of seconds per value of a sweep
+
+  Args:
+      rows (list[dict]): see sweep
+      width (int, optional): columns for the largest time. Defaults to 50.
+
+  Returns:
+      str: one line per value
+  '''
+  largest = max(row['seconds'] for row in rows) or 1
+  return '\n'.join(f'{row["value"]!s:>8} | {"#" * round(row["seconds"] / largest * width):{width}} '
+                   f'{row["seconds"]:8.3f}s {row["expanded"]:>7} expanded  {row["pattern"] or row["status"]}'
+                   for row in rows)
+
+if __name__ == '__main__': # pragma: no cover
+  def _option(name: str) -> Optional[str]:
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else None
+  BASE = Workload(
+    target=_option('--target') or Workload.target,
+    positive=int(_option('--positive') or Workload.positive),
+    negative=int(_option('--negative') or Workload.negative),
+    min_length=int(_option('--min-length') or Workload.min_length),
+    max_length=int(_option('--max-length') or Workload.max_length),
+    alphabet=_option('--alphabet') or Workload.alphabet,
+    x_density=float(_option('--x-density') or Workload.x_density),
+    seed=int(_option('--seed') or Workload.seed),
+  )
+  if sys.argv[1:2] == ['generate']:
+    P_, N_ = generate(BASE)
+    write_examples(sys.argv[-1], f'generated from {BASE.target} over {BASE.alphabet}', P_, N_)
+  elif sys.argv[1:2] == ['sweep'] and _option('--axis') in AXES and _option('--values'):
+    BUDGET = Budget(seconds=float(_option('--seconds') or 10), states=int(_option('--states') or 20_000))
+    print(chart(sweep(_option('--axis'), _option('--values').split(','), BASE, BUDGET)))
+  else:
+    print(__doc__[__doc__.index('usage'):])
+    sys.exit(1)
@@ -0,0 +1,77 @@
+'''
+tests for abstraction.py
+'''
+import itertools
+import re
+import pytest
+from main.abstraction import ANYTHING, EPSILON, NOTHING, example_facts, misses_all, misses_some
+from main.partial_regex import (Concatenation, EmptyLanguage, EmptyString, Hole, Literal, Star, Union, ZeroOrOne,
+                                PartialRegexNode)
+
+EXAMPLES = [''.join(symbols) for length in range(7) for symbols in itertools.product('01', repeat=length)]
+
+TREES = [
+  Literal('0'),
+  Concatenation(Literal('0'), Hole()),
+  Concatenation(Hole(), Concatenation(Literal('0'), Literal('1'))),
+  Star(Concatenation(Literal('0'), Literal('0'))),
+  Star(Concatenation(Literal('0'), Hole())),
+  Union(Literal('1'), Concatenation(Literal('0'), Star(Literal('.')))),
+  ZeroOrOne(Concatenation(Literal('1'), Hole())),
+  Concatenation(Star(Union(Literal('0'), Concatenation(Literal('1'), Literal('1')))), Literal('1')),
+  Union(EmptyString(), Union(EmptyLanguage(), Concatenation(Literal('0'), Literal('1')))),
+  Union(EmptyString(), Union(Hole(), Concatenation(Literal('0'), Literal('1')))),
+  Concatenation(EmptyLanguage(), Hole()),
+]
+
+@pytest.mark.parametrize('tree', TREES, ids=str)
+def test_summaries_cover_matches(tree: PartialRegexNode):
+  for summary, approximation in zip(tree.summaries(), (tree.overapproximation(), tree.underapproximation())):
+    pattern = str(approximation)
+    matched = [example for example in EXAMPLES if re.fullmatch(pattern, example)]
+    # neither check may claim a rejection that matching contradicts
+    for example in matched:
+      facts = example_facts([example])
+      assert not misses_some(summary, facts), (pattern, example)
+      assert not misses_all(summary, facts), (pattern, example)
+    if matched:
+      assert not misses_some(summary, example_facts(matched))
+
+def test_precedence_quirk():
+  # (∅|01)? prints as 01?, which matches 0: the union's summary must not rule it out
+  tree = Union(EmptyString(), Union(EmptyLanguage(), Concatenation(Literal('0'), Literal('1'))))
+  assert re.fullmatch(str(tree), '0')
+  assert tree.summaries() == (ANYTHING, ANYTHING)
+
+def test_decides_by_length_and_symbols():
+  ends_01 = Concatenation(Hole(), Concatenation(Literal('0'), Literal('1'))).summaries()[0]
+  assert misses_some(ends_01, example_facts(['001', '0']))
+  assert misses_some(ends_01, example_facts(['10']))
+  assert not misses_some(ends_01, example_facts(['01', '1101']))
+  assert misses_all(ends_01, example_facts(['', '0', '10']))
+  assert not misses_all(ends_01, example_facts(['10', '001']))
+  pairs = Star(Concatenation(Literal('0'), Literal('0'))).summaries()[0]
+  assert misses_all(pairs, example_facts(['000', '0']))
+  assert not misses_all(pairs, example_facts(['0000']))
+
+def test_constants():
+  facts = example_facts(['', '01'])
+  assert misses_all(NOTHING, facts) and misses_some(NOTHING, facts)
+  assert misses_some(EPSILON, facts) and not misses_all(EPSILON, facts)
+  assert not misses_some(ANYTHING, facts) and not misses_all(ANYTHING, facts)
+
+def test_example_facts():
+  facts = example_facts(['', '01', memoryview(b'110')])
+  assert facts.has_empty
+  assert facts.lengths == {2, 3}
+  assert (facts.min_length, facts.max_length) == (2, 3)
+  assert example_facts(['0', 'ε']) is None
+  assert example_facts(['∅']) is None
+  assert not example_facts([]).lengths
+
+def test_wildcard_facts():
+  ends_01 = Concatenation(Hole(), Concatenation(Literal('0'), Literal('1'))).summaries()[0]
+  # an X at the end may be 0, which 01 cannot end with
+  assert misses_some(ends_01, example_facts(['0X'], '01'))
+  assert not misses_all(ends_01, example_facts(['0X'], '01'))
+  assert misses_all(ends_01, example_facts(['0X'], '0'))
@@ -0,0 +1,15 @@
+'''
+tests for adversarial.py
+'''
+from main.adversarial import adversarial_task, run
+
+def test_adversarial_task():
+  P, N = adversarial_task(12)
+  assert '1' * 12 in P and '0' + '1' * 12 in N
+
+def test_run():
+  result = run(length=12, time_limit=2)
+  assert result['pattern'] == '1*(01*01*)*'
+  assert result['automaton']['finished'] and result['automaton']['done'] == result['patterns']
+  # a run of 12 1s already stalls re's backtracking on some of the patterns
+  assert not result['re']['finished'] or result['re']['seconds'] > 2 * result['automaton']['seconds']
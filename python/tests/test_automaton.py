@@ -0,0 +1,48 @@
+'''
+tests for automaton.py
+'''
+import itertools
+import re
+from time import perf_counter
+import pytest
+from main import automaton as automaton_module
+from main.automaton import Automaton, automaton, fullmatch
+
+PATTERNS = ['', '0', '.', '0.*', '.*01', '(0|1)*', '(01|1)*0?', '1*(01*01*)*', '((1|1*))*', '(.*0*1)*', 'ε', '∅*',
+            '(0|ε)', '0+1', '(0?)*', '((0)?|1)', '..0.*', '(.*0.*)*', '0*?', '\\.']
+EXAMPLES = [''.join(symbols) for length in range(6) for symbols in itertools.product('01', repeat=length)] + \
+           ['ε', '∅', '.', '\n', '0\n', 'a']
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_agrees_with_re(pattern):
+  compiled = Automaton(pattern)
+  for example in EXAMPLES:
+    assert compiled.fullmatch(example) == bool(re.fullmatch(pattern, example)), example
+
+def test_bytes_like_examples():
+  compiled = automaton('.*01')
+  assert compiled.fullmatch(b'1101')
+  assert compiled.fullmatch(memoryview(b'xx01')[1:])
+  assert not compiled.fullmatch(bytearray(b'10'))
+  assert not automaton('ε').fullmatch('ε'.encode('utf-8'))
+
+@pytest.mark.parametrize('pattern', ['(', '0)', '*', '(|*)', '\\'])
+def test_malformed(pattern):
+  with pytest.raises(ValueError):
+    Automaton(pattern)
+
+def test_linear_time():
+  # re backtracks exponentially on these; 30 symbols already take it minutes
+  t0 = perf_counter()
+  assert not fullmatch('(.*0.*)*1', '0' * 5000)
+  assert not fullmatch('(.*0*1)*', '1' * 5000 + '0')
+  assert fullmatch('((1|1*))*', '1' * 5000)
+  assert perf_counter() - t0 < 2
+
+def test_dfa_cache_is_bounded(monkeypatch):
+  monkeypatch.setattr(automaton_module, 'MAX_DFA_STATES', 4)
+  compiled = Automaton('.*1.....')
+  for symbols in itertools.product('01', repeat=9):
+    example = ''.join(symbols)
+    assert compiled.fullmatch(example) == bool(re.fullmatch('.*1.....', example))
+  assert len(compiled.states) <= 4
@@ -0,0 +1,63 @@
+'''
+tests for batch.py
+'''
+import io
+import json
+import sys
+from main.batch import read_tasks, run_batch
+from main.main import main_batch
+
+STARTS_WITH_0 = {'P': ['0', '00', '01', '000', '001', '010', '011'], 'N': ['', '1', '10', '11', '100', '101', '110', '111']}
+ENDS_WITH_01 = {'P': ['01', '001', '101', '0001', '0101', '1001', '1101'],
+                'N': ['', '0', '1', '00', '10', '11', '100', '110', '111']}
+# not yet observed to terminate, see tests/test_search.py
+CONTAINS_0101 = {'P': ['0101', '00101', '01010', '10101', '01011'],
+                 'N': ['0000', '0001', '0010', '0011', '0100', '0110', '0111', '1000', '1001', '1010', '1011', '1100',
+                       '1101', '1110', '1111']}
+
+def test_read_tasks_numbers_tasks_without_id():
+  stream = io.StringIO(json.dumps(STARTS_WITH_0) + '\n\n' + json.dumps({'id': 'x', **ENDS_WITH_01}) + '\n')
+  assert [task['id'] for task in read_tasks(stream)] == [1, 'x']
+
+def test_malformed_line_fails_alone(tmp_path, capsys):
+  tasks = tmp_path / 'tasks.jsonl'
+  tasks.write_text(json.dumps(STARTS_WITH_0) + '\n{"P": [\n[1, 2]\n' + json.dumps(ENDS_WITH_01) + '\n',
+                   encoding='utf-8')
+  main_batch(str(tasks), jobs=2, time_limit=30)
+  results = {result['id']: result for result in map(json.loads, capsys.readouterr().out.splitlines())}
+  assert results[1]['pattern'] == '0.*' and results[4]['pattern'] == '.*01'
+  assert results[2]['status'] == 'error' and results[2]['error'].startswith('line 2:')
+  assert results[3] == {'id': 3, 'status': 'error', 'error': 'line 3: not a JSON object', 'seconds': 0.0}
+
+def test_run_batch_leaves_tasks_unchanged():
+  task = {'id': 'a', **STARTS_WITH_0}
+  before = dict(task)
+  assert [result['pattern'] for result in run_batch([task], jobs=1, time_limit=30)] == ['0.*']
+  assert task == before
+
+def test_run_batch_streams_results_in_completion_order():
+  tasks = [{'id': 'slow', 'time_limit': 1, **CONTAINS_0101}, {'id': 'a', **STARTS_WITH_0}, {'id': 'b', **ENDS_WITH_01}]
+  results = list(run_batch(tasks, jobs=3))
+  assert [result['id'] for result in results][-1] == 'slow'
+  by_id = {result['id']: result for result in results}
+  assert by_id['a']['status'] == 'ok' and by_id['a']['pattern'] == '0.*'
+  assert by_id['b']['pattern'] == '.*01'
+  assert by_id['a']['expanded'] > 0
+  assert by_id['slow']['status'] == 'timeout'
+
+def test_run_batch_memory_limit():
+  results = list(run_batch([{'id': 'tiny', **CONTAINS_0101}], memory_limit=1))
+  assert results[0]['status'] == 'memory'
+
+def test_main_batch(tmp_path, capsys):
+  tasks = tmp_path / 'tasks.jsonl'
+  tasks.write_text(json.dumps(STARTS_WITH_0) + '\n' + json.dumps(ENDS_WITH_01) + '\n', encoding='utf-8')
+  main_batch(str(tasks), jobs=2, time_limit=30)
+  results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+  assert sorted(result['pattern'] for result in results) == ['.*01', '0.*']
+
+def test_main_batch_leaves_stdin_open(monkeypatch, capsys):
+  monkeypatch.setattr(sys, 'stdin', io.StringIO(json.dumps(STARTS_WITH_0) + '\n'))
+  main_batch('-', jobs=1, time_limit=30)
+  assert not sys.stdin.closed
+  assert json.loads(capsys.readouterr().out)['pattern'] == '0.*'
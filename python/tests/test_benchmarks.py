@@ -0,0 +1,50 @@
+'''
+tests for benchmarks.py
+'''
+import copy
+import pytest
+from main.benchmarks import run_suite, compare, print_report, FASTER, SLOWER, SAME, SOLVED_NOW, UNSOLVED_NOW, \
+  CHANGED
+
+FILES = ['../benchmarks/no01_start_with_0', '../benchmarks/no07_zeros_divisible_by_3']
+
+def test_run_suite(capsys):
+  report = run_suite(FILES, jobs=2, time_limit=1, repeat=2)
+  starts_with_0 = report['tasks']['no01_start_with_0']
+  assert starts_with_0['status'] == 'ok' and starts_with_0['pattern'] == '0.*'
+  assert starts_with_0['expanded'] > 0
+  assert len(starts_with_0['runs_seconds']) == len(starts_with_0['runs_cpu_seconds']) == 2
+  assert starts_with_0['peak_rss_kb'] > 0
+  assert report['tasks']['no07_zeros_divisible_by_3']['status'] == 'timeout'
+  print_report(report, compare(report, report))
+  assert 'no01_start_with_0' in capsys.readouterr().out
+
+def _task(cpu_seconds, runs=None, status='ok', expanded=100, pattern='0.*'):
+  return {'status': status, 'pattern': pattern, 'expanded': expanded, 'seconds': cpu_seconds,
+          'cpu_seconds': cpu_seconds, 'runs_seconds': runs or [cpu_seconds], 'runs_cpu_seconds': runs or [cpu_seconds]}
+
+def test_compare():
+  baseline = {'tasks': {
+    'fast': _task(1.0), 'slow': _task(1.0), 'noisy': _task(1.0, [0.6, 1.0, 1.4]), 'tiny': _task(0.01),
+    'lost': _task(1.0), 'found': _task(None, [], 'timeout'), 'other': _task(1.0), 'gone': _task(1.0),
+  }}
+  report = copy.deepcopy(baseline)
+  del report['tasks']['gone']
+  report['tasks']['fast'] = _task(0.5)
+  report['tasks']['slow'] = _task(1.5)
+  report['tasks']['noisy'] = _task(1.3, [1.2, 1.3, 1.4])
+  report['tasks']['tiny'] = _task(0.03)
+  report['tasks']['lost'] = _task(None, [], 'timeout')
+  report['tasks']['found'] = _task(2.0)
+  report['tasks']['other'] = _task(1.0, expanded=99)
+  comparison = compare(report, baseline)
+  assert 'gone' not in comparison
+  assert comparison['fast']['verdict'] == FASTER and comparison['fast']['speedup'] == 2.0
+  assert comparison['slow']['verdict'] == SLOWER
+  # within the spread of the baseline's repeats
+  assert comparison['noisy']['verdict'] == SAME and comparison['noisy']['threshold'] == pytest.approx(0.8)
+  # below min_seconds
+  assert comparison['tiny']['verdict'] == SAME
+  assert comparison['lost']['verdict'] == UNSOLVED_NOW
+  assert comparison['found']['verdict'] == SOLVED_NOW
+  assert comparison['other']['verdict'] == CHANGED
@@ -0,0 +1,62 @@
+'''
+tests for cache.py
+'''
+import multiprocessing
+from main.cache import ResultCache, task_key
+from main.search import search
+from main.main import main, read_examples
+
+def _put_many(path: str, start: int) -> None:
+  cache = ResultCache(path)
+  for i in range(start, start + 20):
+    cache.put(str(i), '0.*', i)
+  cache.close()
+
+def test_task_key_is_canonical():
+  assert task_key({'0X', '1'}, {''}) == task_key({'1', '01', '00'}, {''})
+  # examples a search keeps symbolic are not inflated to key it either
+  assert task_key({'X' * 64}, set()) == task_key(['X' * 64], set())
+  assert task_key({'X' * 64}, set()) != task_key({'X' * 63}, set())
+  assert task_key({'0'}, {'1'}) != task_key({'1'}, {'0'})
+  assert task_key({'0'}, {'1'}) != task_key({'0'}, {'1'}, '012')
+
+def test_search_fills_and_consults_cache(tmp_path):
+  cache = ResultCache(str(tmp_path / 'results.db'))
+  P = {'0', '00', '01', '000', '001', '010', '011'}
+  N = {'', '1', '10', '11', '100', '101', '110', '111'}
+  assert search(P, N, cache=cache) == '0.*'
+  hit = cache.get(task_key(P, N))
+  assert hit['pattern'] == '0.*'
+  assert hit['stats']['expanded'] > 0
+  cache.put(task_key(P, N), 'cached', 0)
+  assert search(set(reversed(sorted(P))), N, cache=cache) == 'cached'
+
+def test_main_consults_cache(tmp_path, capsys):
+  cache = ResultCache(str(tmp_path / 'results.db'))
+  examples = read_examples('../benchmarks/no01_start_with_0')
+  cache.put(task_key(examples['P'], examples['N']), 'cached', 0)
+  main(examples, cache)
+  assert 'cached' in capsys.readouterr().out
+
+def test_eviction_keeps_most_recently_used(tmp_path):
+  cache = ResultCache(str(tmp_path / 'results.db'), max_entries=2)
+  cache.put('a', '0', 1)
+  cache.put('b', '1', 1)
+  cache.get('a')
+  cache.put('c', '.', 1)
+  assert len(cache) == 2
+  assert cache.get('b') is None
+  assert cache.get('a') is not None
+  plan = cache.db.execute('EXPLAIN QUERY PLAN SELECT key FROM results ORDER BY last_used LIMIT 1').fetchall()
+  assert any('results_last_used' in row[-1] for row in plan)
+
+def test_concurrent_writers(tmp_path):
+  path = str(tmp_path / 'results.db')
+  ResultCache(path).close()
+  processes = [multiprocessing.Process(target=_put_many, args=(path, 20 * i)) for i in range(4)]
+  for process in processes:
+    process.start()
+  for process in processes:
+    process.join()
+  assert all(process.exitcode == 0 for process in processes)
+  assert len(ResultCache(path)) == 80
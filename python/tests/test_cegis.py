@@ -0,0 +1,32 @@
+'''
+tests for cegis.py
+'''
+from main.cegis import cegis_search, counterexamples
+from main.glob_match import matcher
+from main.search import search
+from main.workload import Workload, generate
+
+def test_counterexamples():
+  fullmatch = matcher('0.*').fullmatch
+  assert counterexamples(fullmatch, ['0', '1', '10', '11'], True, 10) == ['1', '10', '11']
+  assert counterexamples(fullmatch, ['0', '1', '10', '11'], True, 2) == ['1', '10']
+  assert counterexamples(fullmatch, ['0', '1', '01'], False, 10) == ['0', '01']
+
+def test_refines_a_small_subset_until_the_solution_holds():
+  P, N = generate(Workload(target='1(0|1)*0', positive=200, negative=200, max_length=12))
+  result = cegis_search(P, N, subset=2, batch=2)
+  assert result.pattern == search(P, N)
+  assert result.rounds == 3
+  # each refuted candidate added at least one counterexample
+  assert 4 < result.positive + result.negative <= 4 + 2 * 2 * (result.rounds - 1)
+  fullmatch = matcher(result.pattern).fullmatch
+  assert all(fullmatch(example) for example in P) and not any(fullmatch(example) for example in N)
+
+def test_small_task_is_searched_whole():
+  result = cegis_search({'0', '00', '01'}, {'', '1', '10'}, subset=8)
+  assert (result.pattern, result.rounds, result.positive, result.negative) == ('0.*', 1, 3, 3)
+
+def test_max_steps():
+  P, N = generate(Workload(target='.*0101.*', positive=50, negative=50))
+  result = cegis_search(P, N, max_steps=5)
+  assert result.pattern is None and result.expanded == 5
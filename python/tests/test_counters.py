@@ -0,0 +1,24 @@
+'''
+tests for counters.py: the golden performance counters
+'''
+import pytest
+from main.counters import count, load_golden, regressions
+
+GOLDEN = load_golden()
+
+@pytest.mark.parametrize('name', sorted(GOLDEN['benchmarks']))
+def test_counters_match_golden(name):
+  assert not regressions(name, count(f'../benchmarks/{name}', GOLDEN['max_states']), GOLDEN)
+
+def _counters(**changes) -> dict:
+  return {'expanded': 100, 'generated': 200, 'evaluations': 1000, 'visits': 50, 'pattern': '0.*', **changes}
+
+def test_regressions():
+  golden = {'max_states': 10, 'tolerance': 0.1, 'benchmarks': {'b': _counters()}}
+  assert not regressions('b', _counters(expanded=110, generated=180), golden)
+  assert regressions('b', _counters(expanded=111), golden) == ['b: expanded grew from 100 to 111']
+  assert regressions('b', _counters(visits=56), golden) == ['b: visits grew from 50 to 56']
+  assert len(regressions('b', _counters(pattern='0*'), golden)) == 1
+  assert regressions('b', None, golden) == ['b: no longer finishes within 10 states']
+  assert regressions('b', _counters(evaluations=899), golden) == \
+    ['b: evaluations shrank from 1000 to 899; update the golden file (python3 -m main.counters --update)']
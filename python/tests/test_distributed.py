@@ -0,0 +1,73 @@
+'''
+tests for distributed.py
+'''
+import json
+import socket
+import threading
+import time
+from main.distributed import Coordinator, distributed_search, serve, work
+from main.partial_regex import serialize, Literal, Star
+
+def test_distributed_search_starts_with_0():
+  P = {'0', '00', '01', '000', '001', '010', '011'}
+  N = {'', '1', '10', '11', '100', '101', '110', '111'}
+  pattern = distributed_search(P, N, workers=3)
+  assert pattern == '0.*'
+
+def test_distributed_search_ends_with_01():
+  P = {'01', '001', '101', '0001', '0101', '1001', '1101'}
+  N = {'', '0', '1', '00', '10', '11', '100', '110', '111'}
+  pattern = distributed_search(P, N, workers=2)
+  assert pattern == '.*01'
+
+def test_coordinator_partitions_and_steals():
+  coordinator = Coordinator({'0'}, {'1'}, nodes=2)
+  total = sum(len(partition) for partition in coordinator.partitions)
+  for node in range(2):
+    for _, _, encoding in coordinator.partitions[node]:
+      assert coordinator.owner(encoding) == node
+  coordinator.partitions[1].clear()
+  batch = coordinator.take(1)
+  assert batch
+  assert all(coordinator.owner(encoding) == 0 for encoding in batch)
+  assert coordinator.in_flight == len(batch)
+  assert total > 0
+
+def test_coordinator_bound_prunes():
+  coordinator = Coordinator({'0'}, {'1'}, nodes=1)
+  coordinator.give([], [(21, '0*')], 0)
+  # no cheaper than the best solution
+  coordinator.give([(serialize(Star(Literal('1'))), 21)], [], 0)
+  assert serialize(Star(Literal('1'))) not in coordinator.v_pre[0]
+  coordinator.give([], [(1, '0')], 0)
+  assert coordinator.bound() == 1
+  coordinator.give([(serialize(Star(Literal('0'))), 21)], [], 0)
+  assert serialize(Star(Literal('0'))) not in coordinator.v_pre[0]
+
+def test_crashed_worker_batch_is_processed_again():
+  P = {'0', '00', '01', '000', '001', '010', '011'}
+  N = {'', '1', '10', '11', '100', '101', '110', '111'}
+  coordinator = Coordinator(P, N, nodes=1)
+  server = serve(coordinator, port=0)
+  try:
+    # a worker that takes a batch and dies before putting it back
+    with socket.create_connection(server.server_address[:2]) as sock, sock.makefile('rwb') as stream:
+      for request in ({'op': 'hello'}, {'op': 'get', 'node': 0}):
+        stream.write(json.dumps(request).encode('utf-8') + b'\n')
+        stream.flush()
+        reply = json.loads(stream.readline())
+      assert reply['states']
+      assert coordinator.in_flight == len(reply['states'])
+    for _ in range(500):
+      if coordinator.in_flight == 0:
+        break
+      time.sleep(0.01)
+    assert coordinator.in_flight == 0 and not coordinator.leases
+    worker = threading.Thread(target=work, args=server.server_address[:2], daemon=True)
+    worker.start()
+    worker.join(timeout=60)
+    assert coordinator.finished.is_set()
+    assert coordinator.result() == '0.*'
+  finally:
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,74 @@
+'''
+tests for example_trie.py
+'''
+import itertools
+import re
+import pytest
+from main.example_trie import TrieExamples, example_set
+from main.helpers import CachedExamples, OrderedExamples, PatternCache, inflate_all, matches_all, matches_any, count_matches
+from main.search import Search, SearchStats, SharedCaches
+
+PATTERNS = ['', '0', '.', '0.*', '.*01', '(0|1)*011*', '0(1|0)*1+0', '01*0', '(01)*1', '0?1+', '(.*0.*)*', 'ε.*']
+EXAMPLE_SETS = [
+  set(),
+  {''},
+  {'0', '00', '01', '001'},
+  {'1', '10', '0110', '\n', '0\n1'},
+  inflate_all({'0XX1', '1XX', 'XXXX'}, '01'),
+  {''.join(symbols) for length in range(6) for symbols in itertools.product('01', repeat=length)},
+]
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_agrees_with_re(pattern):
+  for examples in EXAMPLE_SETS:
+    trie = TrieExamples(examples)
+    matched = [example for example in examples if re.fullmatch(pattern, example)]
+    assert matches_all(pattern, trie) == (len(matched) == len(examples))
+    assert matches_any(pattern, trie) == bool(matched)
+    assert count_matches(pattern, trie) == len(matched)
+
+def test_dead_subtrees_decide_at_once():
+  trie = TrieExamples(inflate_all({'1XXXXXX', '0'}, '01'))
+  assert not matches_all('0', trie)
+  assert trie.visits <= 2
+  trie.visits = 0
+  assert matches_any('0', trie)
+  assert trie.visits <= 3
+
+def test_set_operations():
+  trie = TrieExamples({'01', '0'})
+  trie |= {'0', '1', ''}
+  assert len(trie) == 4 and trie.nodes == 4
+  assert sorted(trie) == ['', '0', '01', '1']
+  assert repr(trie) == "{'', '0', '1', '01'}"
+
+def test_example_set_prefers_a_trie_for_shared_prefixes():
+  assert isinstance(example_set(inflate_all({'0XXXX'}, '01')), TrieExamples)
+  assert isinstance(example_set({'0', '1', '10'}), OrderedExamples)
+
+def test_cached_trie_compiles_through_the_pattern_cache():
+  patterns = PatternCache()
+  examples = CachedExamples(TrieExamples(inflate_all({'0XX1', '1XX'}, '01')), patterns)
+  assert not matches_all('0.*', examples)
+  assert not matches_all('0.*', examples)
+  assert matches_any('1.*', examples)
+  assert matches_any('1.*', examples)
+  assert examples.hits == 2 and examples.visits > 0 and examples.evaluations == 0
+  assert count_matches('1.*', examples) == 4
+  assert patterns.hits == 1 and patterns.misses == 2 and list(patterns.automata) == ['0.*', '1.*']
+
+def test_instrumented_searches_use_the_trie():
+  P = {'XX0', 'XX0X', 'XX0XX'}
+  N = {'X', 'XX', 'XX1', 'XX1X'}
+  plain = Search(P, N)
+  assert isinstance(plain.P, TrieExamples)
+  assert plain.run() == '..0.*'
+  stats = SearchStats()
+  counted = Search(P, N, stats=stats)
+  cached = Search(P, N, caches=SharedCaches())
+  for s in (counted, cached):
+    assert isinstance(s.P.examples, TrieExamples)
+    assert s.run() == '..0.*'
+    assert s.expanded == plain.expanded
+  counted.statistics()
+  assert stats.visits > 0 and stats.evaluations == 0 and stats.cache_hits > 0
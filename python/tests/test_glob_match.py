@@ -0,0 +1,63 @@
+'''
+tests for glob_match.py
+'''
+import itertools
+import re
+import pytest
+from main import glob_match
+from main.glob_match import PATHS, Glob, Prefiltered, glob_segments, matcher, path_fractions, required_factors
+
+PATTERNS = ['', '0', '.', '0.*', '.*01', '..0.*', '.*', '.*0.*1.*', '0.*.*1', '.0.*1.', '.*0.0.*', 'ε.*', '(0|1)*011*',
+            '0(1|0)*1+0', '01*0', '(01)*1', '0?1+', '1.*(0|1)', '(0|1)|1', '(.*0.*)*']
+EXAMPLES = [''.join(symbols) for length in range(7) for symbols in itertools.product('01', repeat=length)] + \
+           ['ε', 'ε0', '\n', '0\n1', '01\n01']
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_agrees_with_re(pattern):
+  compiled = matcher(pattern)
+  for example in EXAMPLES:
+    expected = bool(re.fullmatch(pattern, example))
+    assert compiled.fullmatch(example) == expected, example
+    if example.isascii():
+      assert compiled.fullmatch(memoryview(example.encode('latin-1'))) == expected, example
+
+def test_classifier():
+  assert glob_segments('..0.*') == ['..0', '']
+  assert glob_segments('.*0.*1.*') == ['', '0', '1', '']
+  assert glob_segments('0') == ['0']
+  assert glob_segments('0*') is None
+  assert glob_segments('(0|1).*') is None
+  assert isinstance(matcher('.*01'), Glob)
+  assert isinstance(matcher('(0|1)*01'), Prefiltered)
+
+def test_required_factors():
+  assert required_factors('(0|1)*011*') == ['01']
+  assert required_factors('0(1|0)*1+0') == ['0', '1']
+  assert required_factors('01(0|1)10') == ['01', '10']
+  assert required_factors('01?') == ['0']
+  assert required_factors('(01)+') == []
+  assert required_factors('0|1') == []
+  assert required_factors('(0|1)|1') == []
+  assert required_factors('\\.0') == []
+
+def test_paths(monkeypatch):
+  monkeypatch.setattr(glob_match, 'counting', True)
+  before = dict(PATHS)
+  matcher('.*01').fullmatch('1101')
+  matcher('(0|1)*011*').fullmatch('111')
+  matcher('(0|1)*011*').fullmatch('1011')
+  matcher('.*01').fullmatch('0\n01')
+  # bytes-like examples are read in place by the automaton, not decoded for the fast paths
+  matcher('.*01').fullmatch(memoryview(b'1101'))
+  matcher('(0|1)*011*').fullmatch(memoryview(b'111'))
+  counts = {path: PATHS[path] - before[path] for path in PATHS}
+  assert counts == {'glob': 1, 'prefilter': 1, 'automaton': 4}
+  assert path_fractions(counts) == {'glob': 1 / 6, 'prefilter': 1 / 6, 'automaton': 4 / 6}
+  assert path_fractions(dict.fromkeys(PATHS, 0)) == dict.fromkeys(PATHS, 0.0)
+
+def test_paths_are_not_counted_by_default(monkeypatch):
+  monkeypatch.setattr(glob_match, 'counting', False)
+  before = dict(PATHS)
+  matcher('.*01').fullmatch('1101')
+  matcher('(0|1)*011*').fullmatch('111')
+  assert PATHS == before
@@ -1,8 +1,8 @@
 '''
 test helpers
 '''
-
-from main.helpers import matches_all, matches_any, inflate
+import pytest
+from main.helpers import CachedExamples, ExampleSet, LRUDict, OrderedExamples, matches_all, matches_any, inflate
 
 def test_matches_all():
   examples = {'0', '00', '01', '001'}
@@ -16,6 +16,33 @@ def test_matches_any():
   assert matches_any('00', examples)
   assert not matches_any('10', examples)
 
+def test_ordered_examples_move_killers_to_front():
+  examples = OrderedExamples({'0', '00', '01', '001'})
+  assert not matches_all('0*', examples)
+  assert examples.all_order[0] == '01'
+  assert examples.evaluations == 3
+  assert not matches_all('0*', examples)
+  assert examples.evaluations == 4
+  assert matches_any('001', examples)
+  assert examples.any_order[0] == '001'
+  # each kind of check keeps its own order
+  assert examples.all_order[0] == '01'
+  assert list(examples) == ['0', '00', '01', '001']
+
+def test_adding_examples_keeps_verdicts_that_still_hold():
+  examples = CachedExamples({'0', '00'})
+  assert matches_all('0*', examples)
+  assert not matches_all('1', examples)
+  assert not matches_any('1', examples)
+  assert matches_any('0', examples)
+  examples |= {'1', '0'}
+  assert list(examples) == ['0', '1', '00']
+  assert examples.examples.all_order[0] == '1'
+  assert examples.all_verdicts == {'1': False}
+  assert examples.any_verdicts == {'0': True}
+  assert not matches_all('0*', examples)
+  assert matches_any('1', examples)
+
 def test_inflate():
   e = 'X'
   es = inflate(e,'01')
@@ -24,3 +51,21 @@ def test_inflate():
   e = 'XX'
   es = inflate(e, '01')
   assert es == ['00', '01', '10', '11']
+
+def test_example_set_is_abstract():
+  class Incomplete(ExampleSet):
+    def matches_all(self, pattern: str) -> bool:
+      return True
+  with pytest.raises(TypeError):
+    Incomplete()  # pylint: disable=abstract-class-instantiated
+
+def test_lru_dict_evicts_least_recently_used():
+  entries = LRUDict(2)
+  entries['a'] = 1
+  entries.setdefault('b', 2)
+  assert entries.get('a') == 1
+  entries['c'] = 3
+  assert list(entries) == ['a', 'c'] and entries.evictions == 1
+  assert entries.setdefault('a', 0) == 1
+  entries['d'] = 4
+  assert list(entries) == ['a', 'd'] and entries.evictions == 2
@@ -0,0 +1,23 @@
+'''
+tests for interactive_main.py
+'''
+from main.interactive_main import interactive_search
+from main.partial_regex import Hole, Star
+
+def test_interactive_search(capsys):
+  P = {'XXX', 'XXXXXX'}
+  N = {'X', 'XX', 'XXXX'}
+  assert interactive_search(P, N, '01', pause=False) == '(...)*'
+  out = capsys.readouterr().out
+  assert 'is DEAD' in out
+  assert '  over=.*\n  under=∅\n' in out
+  assert '  checking /(...)*/\n' in out
+  assert '/(...)*/ PASS' in out
+
+def test_interactive_search_from_initial(capsys):
+  P = {'', '0', '00'}
+  N = {'1', '01'}
+  assert interactive_search(P, N, pause=False, verbose=False, initial=Star(Hole())) == '0*'
+  out = capsys.readouterr().out
+  assert out.startswith("N=['01', '1']\n")
+  assert 'is DEAD' not in out
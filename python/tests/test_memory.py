@@ -0,0 +1,35 @@
+'''
+tests for memory.py
+'''
+import sys
+from main import memory
+from main.automaton import automaton
+from main.glob_match import matcher
+from main.memory import STRUCTURES, attribute, plot, sample
+from main.partial_regex import Literal
+from main.search import Search, SharedCaches
+
+def test_sample():
+  samples = sample('../benchmarks/no02_end_with_01', interval=50)
+  assert [row['expanded'] for row in samples] == [50, 100, 150, 187]
+  assert all(row['traced_bytes'] > 0 and row['bytes_per_state'] > 0 for row in samples)
+  assert samples[-1]['v_pre'] > samples[0]['v_pre']
+  # every pattern the process-wide caches hold is at least an object with a __dict__
+  cached = matcher.cache_info().currsize + automaton.cache_info().currsize
+  assert samples[-1]['match_caches'] >= cached * (sys.getsizeof(matcher('.*01')) + sys.getsizeof({}))
+  assert len(plot(samples).splitlines()) == 4
+
+def test_attribute_shared_caches():
+  P = {'01', '001', '101', '0001', '0101', '1001', '1101'}
+  N = {'', '0', '1', '00', '10', '11', '100', '110', '111'}
+  s = Search(P, N, caches=SharedCaches())
+  s.run()
+  sizes = attribute(s)
+  assert set(sizes) == set(STRUCTURES)
+  assert all(size > 0 for size in sizes.values())
+
+def test_sample_stops_when_the_frontier_drains(monkeypatch):
+  # a closed initial state that is not a solution leaves nothing to expand
+  monkeypatch.setattr(memory, 'Search', lambda P, N, caches=None: Search(P, N, caches=caches, initial=Literal('1')))
+  samples = sample('../benchmarks/no01_start_with_0', interval=50)
+  assert [row['expanded'] for row in samples] == [1]
@@ -2,7 +2,7 @@
 tests for partial_regex.py
 '''
 import pytest
-from main.partial_regex import PartialRegexNode, PartialRegexNodeType, Literal, Union, Concatenation, Star, Hole, EmptyLanguage, EmptyString, opt, ZeroOrOne, opt_concatentation, opt_optional, opt_star, opt_union
+from main.partial_regex import PartialRegexNode, PartialRegexNodeType, Literal, Union, Concatenation, Star, Hole, EmptyLanguage, EmptyString, opt, ZeroOrOne, opt_concatentation, opt_optional, opt_star, opt_union, serialize, deserialize
 
 def test_concat_literals():
   s1 = Literal('a')
@@ -466,6 +466,14 @@ def test_get_depth():
   assert Union().get_depth() == 2
   assert Literal('a').get_depth() == 1
 
+def test_holes_and_depth_are_cached_through_expansion():
+  s = Literal('a') * Star(Hole())
+  assert (s.holes(), s.depth()) == (1, 3)
+  for state in s.next_states('ab'):
+    # the hole-free left operand keeps its counts; the rest is counted afresh
+    assert state.holes() == repr(state).count('Hole()')
+    assert state.depth() == state.get_depth()
+
 def test_overapproximation_of_optional():
   assert ZeroOrOne().overapproximation() == ZeroOrOne(Star(Literal('.')))
 
@@ -786,3 +794,16 @@ def test_is_dead_no30():
     '100111'
     }
   assert not state.is_dead(P, N)
+
+def test_serialize_round_trip():
+  s = Concatenation(Star(Union(Literal('0'), Hole())), ZeroOrOne(EmptyString())) + EmptyLanguage()
+  encoding = serialize(s)
+  assert encoding == '|·*|a0□?ε∅'
+  assert deserialize(encoding) == s
+  assert repr(deserialize(encoding)) == repr(s)
+
+def test_deserialize_malformed():
+  with pytest.raises(ValueError):
+    deserialize('·a0')
+  with pytest.raises(ValueError):
+    deserialize('a0a1')
@@ -0,0 +1,46 @@
+'''
+tests for profiler.py
+'''
+import io
+import json
+from main import profiler
+from main.search import search
+
+P = {'01', '001', '101', '0001', '0101', '1001', '1101'}
+N = {'', '0', '1', '00', '10', '11', '100', '110', '111'}
+
+def test_search_events(tmp_path):
+  profiler.enable(trace=True)
+  try:
+    assert search(P, N) == '.*01'
+  finally:
+    profiler.disable()
+  totals = profiler.totals()
+  for name in ('Worklist.choose', 'Solution', 'Dead.over', 'Dead.under', 'Expand', 'Worklist.explored',
+               'Worklist.add.insert'):
+    assert totals[name][0] > 0
+  assert totals['Worklist.choose'][0] == totals['Solution'][0]
+  out = io.StringIO()
+  profiler.report(out)
+  assert 'Dead.over' in out.getvalue()
+  path = tmp_path / 'trace.json'
+  profiler.write_trace(str(path))
+  events = json.loads(path.read_text())['traceEvents']
+  assert len(events) == sum(count for count, _ in totals.values())
+  assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+
+def test_disabled_records_nothing():
+  profiler.reset()
+  search(P, N)
+  assert not profiler.totals()
+
+def test_nested_events_count_once():
+  profiler.enable(trace=True)
+  profiler.start_event('outer')
+  profiler.start_event('outer')
+  profiler.finish_event('outer')
+  profiler.finish_event('outer')
+  profiler.disable()
+  count, seconds = profiler.totals()['outer']
+  assert count == 2 and seconds >= 0
+  assert len(profiler._trace) == 1 # pylint: disable=protected-access
@@ -1,7 +1,15 @@
 '''
 tests for search.py
 '''
-from main.search import search
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from main import search as search_module
+from main.helpers import matches_all, matches_any
+from main.partial_regex import Hole
+from main.search import (search, search_async, search_many, iter_solutions, TIE_BREAKS, search_with_budget, Budget,
+  Search, SharedCaches, SearchStats, SearchObserver, SOLVED, STATES, TIME, MEMORY)
 
 def test_search_starts_with_0():
   P = {'0', '00', '01', '000', '001', '010', '011'}
@@ -51,4 +59,200 @@ def test_no5_length_at_least3_and_third_0():
   P = {'XX0', 'XX0X', 'XX0XX'}
   N = {'X', 'XX', 'XX1', 'XX1X'}
   pattern = search(P, N).replace('X', '.')
-  assert pattern == '..0.*'
\ No newline at end of file
+  assert pattern == '..0.*'
+
+def test_search_resumes_in_steps():
+  P = {'0', '00', '01', '000', '001', '010', '011'}
+  N = {'', '1', '10', '11', '100', '101', '110', '111'}
+  s = Search(P, N)
+  assert s.run(max_steps=1) is None
+  assert s.progress().expanded == 1
+  assert s.run() == '0.*'
+  assert s.progress().expanded > 1
+
+def test_search_async():
+  P = {'01', '001', '101', '0001', '0101', '1001', '1101'}
+  N = {'', '0', '1', '00', '10', '11', '100', '110', '111'}
+  events = []
+  pattern = asyncio.run(search_async(P, N, on_progress=events.append, slice_seconds=0.001))
+  assert pattern == '.*01'
+  assert events
+  assert events[-1].expanded >= events[0].expanded
+
+def test_search_async_in_executor():
+  P = {'0', '00', '01', '000', '001', '010', '011'}
+  N = {'', '1', '10', '11', '100', '101', '110', '111'}
+  with ThreadPoolExecutor(1) as executor:
+    assert asyncio.run(search_async(P, N, executor=executor)) == '0.*'
+
+def test_search_async_timeout_cancels():
+  # not yet observed to terminate, see test_search_contains_0101
+  P = {'0101', '00101', '01010', '10101', '01011'}
+  N = {'0000', '0001', '0010', '0011', '0100', '0110', '0111', '1000', '1001', '1010', '1011', '1100', '1101', '1110', '1111'}
+  async def run() -> None:
+    await asyncio.wait_for(search_async(P, N), timeout=0.2)
+  with pytest.raises(asyncio.TimeoutError):
+    asyncio.run(run())
+
+def test_search_many_shares_caches():
+  starts_with_0 = ({'0', '00', '01', '000', '001', '010', '011'}, {'', '1', '10', '11', '100', '101', '110', '111'})
+  ends_with_01 = ({'01', '001', '101', '0001', '0101', '1001', '1101'}, {'', '0', '1', '00', '10', '11', '100', '110', '111'})
+  patterns, report = search_many([starts_with_0, ends_with_01, starts_with_0])
+  assert patterns == ['0.*', '.*01', '0.*']
+  assert report['expansions_avoided'] > 0
+  assert report['pattern_compiles_avoided'] > 0
+  assert report['library_states'] > 0
+
+def test_shared_caches_evict_beyond_max_entries():
+  starts_with_0 = ({'0', '00', '01', '000', '001', '010', '011'}, {'', '1', '10', '11', '100', '101', '110', '111'})
+  ends_with_01 = ({'01', '001', '101', '0001', '0101', '1001', '1101'}, {'', '0', '1', '00', '10', '11', '100', '110', '111'})
+  caches = SharedCaches(max_entries=10)
+  patterns, report = search_many([starts_with_0, ends_with_01, starts_with_0], caches=caches)
+  assert patterns == ['0.*', '.*01', '0.*']
+  assert len(caches.patterns.patterns) <= 10 and len(caches.library) <= 10 and len(caches.expansions) <= 10
+  assert report['evictions'] > 0
+
+def test_search_with_caches_for_other_alphabet():
+  with pytest.raises(ValueError):
+    Search({'a'}, {'b'}, 'ab', SharedCaches('01'))
+
+def test_search_with_budget_solves():
+  P = {'0', '00', '01', '000', '001', '010', '011'}
+  N = {'', '1', '10', '11', '100', '101', '110', '111'}
+  result = search_with_budget(P, N, seconds=30)
+  assert result.status == SOLVED
+  assert result.pattern == '0.*'
+  assert result.best_closed == '0.*'
+  assert result.best_closed_errors == 0
+
+def test_search_with_budget_contains_0101():
+  # runs for more than 30s without a budget (see test_search_contains_0101)
+  P = {'0101', '00101', '01010', '10101', '01011'}
+  N = {'0000', '0001', '0010', '0011', '0100', '0110', '0111', '1000', '1001', '1010', '1011', '1100', '1101', '1110', '1111'}
+  result = search_with_budget(P, N, budget=Budget(states=500))
+  assert result.status == STATES
+  assert result.pattern is None
+  assert result.expanded == 500
+  assert result.best_partial is not None
+  assert 0 < result.best_closed_errors < len(P) + len(N)
+
+def test_search_with_budget_time_and_memory():
+  # runs for more than 500s without a budget (see test_search_each_0_followed_by_some_1s)
+  P = {'', '01', '011', '0101', '011', '10101', '101', '1101', '111', '010110111011110111110111111', '010101', '01010111', '011101101110101'}
+  N = {'0', '10', '00', '010', '10', '110', '0010', '0011', '0110', '0111'}
+  result = search_with_budget(P, N, seconds=0.2)
+  assert result.status == TIME
+  assert result.seconds < 5
+  assert search_with_budget(P, N, memory_mb=1).status == MEMORY
+
+def test_run_budgeted_counts_errors_of_non_solutions_only(monkeypatch):
+  P = {'0', '00', '01', '000', '001', '010', '011'}
+  N = {'', '1', '10', '11', '100', '101', '110', '111'}
+  counted = []
+  count_matches = search_module.count_matches
+  def counting(pattern, examples):
+    counted.append(pattern)
+    return count_matches(pattern, examples)
+  monkeypatch.setattr(search_module, 'count_matches', counting)
+  s = Search(P, N)
+  result = s.run_budgeted(Budget(seconds=30))
+  assert result.pattern == result.best_closed == '0.*' and result.best_closed_errors == 0
+  assert counted and str(s.solution_state) not in counted
+
+def test_memory_budget_counts_growth_during_the_search():
+  # the first search runs out of memory, after which the process's peak RSS is far above the second's budget
+  P = {'', '01', '011', '0101', '011', '10101', '101', '1101', '111', '010110111011110111110111111', '010101', '01010111', '011101101110101'}
+  N = {'0', '10', '00', '010', '10', '110', '0010', '0011', '0110', '0111'}
+  assert search_with_budget(P, N, memory_mb=1).status == MEMORY
+  ballast = bytearray(b'x') * (64 << 20)
+  del ballast
+  result = search_with_budget({'0', '00', '01', '000'}, {'', '1', '10', '11'}, memory_mb=16)
+  assert result.status == SOLVED
+  assert result.peak_rss_kb > 16 * 1024
+
+def test_iter_solutions():
+  P = {'0', '00', '01', '000', '001', '010', '011'}
+  N = {'', '1', '10', '11', '100', '101', '110', '111'}
+  solutions = list(itertools.islice(iter_solutions(P, N), 5))
+  assert solutions[0] == search(P, N)
+  assert len(set(solutions)) == 5
+  for pattern in solutions:
+    assert matches_all(pattern, P) and not matches_any(pattern, N)
+
+def test_solutions_resume_frontier():
+  P = {'01', '001', '101', '0001', '0101', '1001', '1101'}
+  N = {'', '0', '1', '00', '10', '11', '100', '110', '111'}
+  s = Search(P, N)
+  assert s.run() == '.*01'
+  solutions = s.solutions()
+  assert next(solutions) == '.*01'
+  expanded = s.expanded
+  assert next(solutions) != '.*01'
+  assert s.expanded > expanded
+
+def test_tie_breaks():
+  P = {'01', '001', '101', '0001', '0101', '1001', '1101'}
+  N = {'', '0', '1', '00', '10', '11', '100', '110', '111'}
+  expanded = {}
+  for policy in TIE_BREAKS:
+    s = Search(P, N, tie_break=policy)
+    assert s.run() == '.*01'
+    expanded[policy] = s.expanded
+    again = Search(P, N, tie_break=policy)
+    again.run()
+    assert again.expanded == s.expanded
+  assert Search(P, N).priority is TIE_BREAKS['insertion']
+  with pytest.raises(ValueError):
+    Search(P, N, tie_break='random')
+
+def test_search_stats():
+  P = {'01', '001', '101', '0001', '0101', '1001', '1101'}
+  N = {'', '0', '1', '00', '10', '11', '100', '110', '111'}
+  stats = SearchStats()
+  assert search(P, N, stats=stats) == '.*01'
+  s = Search(P, N)
+  s.run()
+  assert s.statistics() is None
+  assert stats.expanded == s.expanded
+  # everything generated was either rejected or pushed, after the productions of the first hole
+  assert stats.generated - stats.duplicates == s.sequence - len(Hole().next_states('01'))
+  assert sum(stats.pruned.values()) > 0 and all(count >= 0 for count in stats.pruned.values())
+  assert stats.evaluations > 0
+  # every evaluation was decided by exactly one matcher path
+  assert sum(stats.paths.values()) == stats.evaluations and stats.paths['glob'] > 0
+  assert stats.cache_hits > 0
+  assert 0 < stats.peak_frontier <= s.sequence
+  assert set(stats.seconds) == {'solution', 'dead', 'expand'}
+
+def test_observer():
+  P = {'01', '001', '101', '0001', '0101', '1001', '1101'}
+  N = {'', '0', '1', '00', '10', '11', '100', '110', '111'}
+
+  class Recorder(SearchObserver):
+    def __init__(self):
+      self.events = []
+
+    def on_pop(self, state):
+      self.events.append(('pop', state))
+
+    def on_prune(self, state, reason):
+      self.events.append((reason, state))
+
+    def on_push(self, state):
+      self.events.append(('push', state))
+
+    def on_solution(self, state, pattern):
+      self.events.append(('solution', pattern))
+
+  recorder = Recorder()
+  stats = SearchStats()
+  s = Search(P, N, observer=recorder, stats=stats)
+  assert s.run() == '.*01'
+  kinds = [kind for kind, _ in recorder.events]
+  assert kinds.count('pop') == s.expanded
+  assert kinds.count('push') == s.sequence
+  for reason, count in stats.pruned.items():
+    assert kinds.count(reason) == count
+  assert recorder.events[-1] == ('solution', '.*01')
+  # a popped state is pruned, solved, or followed by its pushes
+  assert kinds[kinds.index('pop') + 1] in ('push', 'pop', *stats.pruned)
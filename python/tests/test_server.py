@@ -0,0 +1,100 @@
+'''
+tests for server.py
+'''
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+import pytest
+from main.server import SynthesisService, serve
+
+STARTS_WITH_0 = (['0', '00', '01', '000', '001', '010', '011'], ['', '1', '10', '11', '100', '101', '110', '111'])
+# not yet observed to terminate, see tests/test_search.py
+CONTAINS_0101 = (['0101', '00101', '01010', '10101', '01011'],
+                 ['0000', '0001', '0010', '0011', '0100', '0110', '0111', '1000', '1001', '1010', '1011', '1100',
+                  '1101', '1110', '1111'])
+
+@pytest.fixture(name='service')
+def fixture_service():
+  service = SynthesisService(workers=1, slice_seconds=0.01)
+  yield service
+  service.close()
+
+def test_job_runs_and_reports_latency(service):
+  job = service.submit(*STARTS_WITH_0)
+  job = service.wait(job.id, timeout=30)
+  assert job.status == 'done'
+  assert job.pattern == '0.*'
+  report = job.report()
+  assert report['latency'] >= report['run_seconds'] >= 0
+  assert report['expanded'] > 0
+
+def test_budget_and_priority(service):
+  slow = service.submit(*CONTAINS_0101, budget=0.3)
+  low = service.submit(*STARTS_WITH_0, priority=5)
+  high = service.submit(*STARTS_WITH_0, priority=1)
+  assert service.wait(slow.id, timeout=30).status == 'timeout'
+  assert service.wait(low.id, timeout=30).status == 'done'
+  assert high.started < low.started
+
+def test_cancel_running_and_queued(service):
+  running = service.submit(*CONTAINS_0101)
+  queued = service.submit(*STARTS_WITH_0)
+  service.cancel(queued.id)
+  service.wait(running.id, timeout=0.2)
+  service.cancel(running.id)
+  assert service.wait(running.id, timeout=30).status == 'cancelled'
+  assert queued.status == 'cancelled'
+  assert queued.started is None
+  assert service.cancel(12345) is None
+
+def test_cancel_as_job_starts(service):
+  next_job = service.next_job
+  def next_job_then_cancel(worker):
+    job = next_job(worker)
+    if job is not None and job.P == CONTAINS_0101[0]:
+      # a DELETE that arrives just after the job is marked running
+      service.cancel(job.id)
+    return job
+  service.next_job = next_job_then_cancel
+  # the dispatcher is already waiting in the unpatched next_job, so let it take one job first
+  service.wait(service.submit(*STARTS_WITH_0).id, timeout=30)
+  job = service.submit(*CONTAINS_0101)
+  assert service.wait(job.id, timeout=30).status == 'cancelled'
+
+def test_crashed_worker_fails_its_job_and_is_replaced(service):
+  job = service.submit(*CONTAINS_0101)
+  assert service.wait(job.id, timeout=0.2).status == 'running'
+  service.workers[0].process.kill()
+  assert service.wait(job.id, timeout=30).status == 'failed'
+  assert 'exited' in job.error
+  assert service.wait(service.submit(*STARTS_WITH_0).id, timeout=30).pattern == '0.*'
+
+def test_submit_checks_types(service):
+  for P, N, budget in (('01', ['1'], None), (['0'], [1], None), (['0'], ['1'], '10')):
+    with pytest.raises(TypeError):
+      service.submit(P, N, budget=budget)
+  with pytest.raises(ValueError):
+    service.submit(['0'], ['1'], budget=-1)
+  assert not service.jobs
+
+def test_http(service):
+  server = serve(service, port=0)
+  url = f'http://127.0.0.1:{server.server_address[1]}/jobs'
+  try:
+    body = json.dumps({'P': STARTS_WITH_0[0], 'N': STARTS_WITH_0[1]}).encode('utf-8')
+    with urlopen(Request(url, data=body, method='POST')) as response:
+      job = json.load(response)
+    assert response.status == 201
+    service.wait(job['id'], timeout=30)
+    with urlopen(f"{url}/{job['id']}") as response:
+      assert json.load(response)['pattern'] == '0.*'
+    with urlopen(url) as response:
+      assert len(json.load(response)) == 1
+    with urlopen(Request(f"{url}/{job['id']}", method='DELETE')) as response:
+      assert json.load(response)['status'] == 'done'
+    with pytest.raises(HTTPError) as error:
+      urlopen(Request(url, data=json.dumps({'P': '0', 'N': []}).encode('utf-8'), method='POST'))
+    assert error.value.code == 400
+  finally:
+    server.shutdown()
+    server.server_close()
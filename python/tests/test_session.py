@@ -0,0 +1,73 @@
+'''
+tests for session.py
+'''
+import pytest
+from main.partial_regex import Hole, Literal, Union
+from main.search import Search, search
+from main.session import SynthesisSession
+
+def test_session_resumes_after_new_examples():
+  session = SynthesisSession({'0', '00'}, {'', '1'})
+  first = session.solve()
+  assert first == search({'0', '00'}, {'', '1'})
+  expanded = session.search.expanded
+  session.add_positive('01', '000', '001', '010', '011')
+  session.add_negative('10', '11', '100', '101', '110', '111')
+  assert session.solve() == '0.*'
+  assert session.search.expanded > expanded
+
+def test_session_keeps_a_solution_that_still_holds():
+  session = SynthesisSession({'0', '00', '01', '000', '001', '010', '011'}, {'', '1', '10', '11'})
+  assert session.solve() == '0.*'
+  expanded = session.search.expanded
+  session.add_negative('100', '101', '110', '111')
+  assert session.solve() == '0.*'
+  assert session.search.expanded == expanded
+
+def test_session_matches_fresh_search():
+  P = {'01', '001', '101', '0001', '0101', '1001', '1101'}
+  N = {'', '0', '1', '00', '10', '11', '100', '110', '111'}
+  session = SynthesisSession(['01', '101'], ['', '0'])
+  session.solve()
+  session.add_positive(*P)
+  session.add_negative(*N)
+  assert session.solve() == search(P, N)
+
+def test_session_revives_redundant_states():
+  P, N = {'0', '101'}, {'000', '111'}
+  session = SynthesisSession(P, N)
+  assert session.solve() == '.(01)?'
+  assert session.search.split_pruned
+  session.add_positive('110')
+  # without the states pruned as redundant before 110 arrived, the session settles for (0|1*01*)
+  assert session.solve() == search(P | {'110'}, N) == '1*01*'
+
+def test_session_rejects_conflicts():
+  session = SynthesisSession(['0X'])
+  assert session.P == {'0X'}
+  with pytest.raises(ValueError):
+    session.add_negative('01')
+  with pytest.raises(ValueError):
+    session.add_negative('X1')
+  session.add_negative('1X')
+
+def test_session_leaves_inflating_to_the_search():
+  session = SynthesisSession(['0X'], ['1X'])
+  assert session.solve() == '0.'
+  assert not session.search.symbolic and set(session.search.P) == {'00', '01'}
+  session.add_positive('0' + 'X' * 10)
+  # inflated by the search, which chose to when it was created
+  assert len(session.search.P) == 2 + 2 ** 10
+  session = SynthesisSession(['0' + 'X' * 20], ['1' + 'X' * 20])
+  assert session.solve() == '0.*'
+  assert session.search.symbolic and set(session.search.P) == {'0' + 'X' * 20}
+
+def test_new_positive_examples_revive_redundant_states():
+  s = Search({'0'}, {'11'}, initial=Union(Literal('1'), Hole()))
+  s.step()
+  # 1 matches no positive example, so the union is redundant
+  assert s.split_pruned == [Union(Literal('1'), Hole())] and not s.q
+  s.add_examples(N={'111'})
+  assert s.split_pruned and not s.q
+  s.add_examples(P={'1'})
+  assert not s.split_pruned and s.peek() == Union(Literal('1'), Hole())
@@ -0,0 +1,34 @@
+'''
+tests for shared_examples.py
+'''
+import multiprocessing
+from main.helpers import matches_all, matches_any
+from main.shared_examples import SharedExamples
+
+def _count_matches(name: str, pattern: str, results) -> None:
+  shared = SharedExamples.attach(name)
+  results.put((matches_all(pattern, shared.P), matches_any(pattern, shared.N), len(shared.P)))
+  shared.close()
+
+def test_create_inflates_and_packs():
+  with SharedExamples.create({'0X', '1'}, {'', 'X1'}) as shared:
+    assert shared.P.strings() == {'00', '01', '1'}
+    assert shared.N.strings() == {'', '01', '11'}
+    assert all(isinstance(example, memoryview) for example in shared.P)
+
+def test_matches_read_shared_block():
+  with SharedExamples.create({'00', '01'}, {'1', '10'}) as shared:
+    assert matches_all('0.*', shared.P)
+    assert not matches_all('0', shared.P)
+    assert matches_any('1.*', shared.N)
+    assert not matches_any('0.*', shared.N)
+    assert not matches_any('ε', shared.N)
+    assert not matches_any('∅', shared.N)
+
+def test_attach_from_worker_process():
+  with SharedExamples.create({'0X'}, {'1'}) as shared:
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_count_matches, args=(shared.name, '0.', results))
+    process.start()
+    process.join()
+    assert results.get() == (True, False, 2)
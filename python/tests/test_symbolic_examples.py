@@ -0,0 +1,48 @@
+'''
+tests for symbolic_examples.py
+'''
+import pytest
+from main import search as search_module
+from main.helpers import count_matches, inflate_all, matches_all, matches_any
+from main.search import Search, SearchStats
+from main.symbolic_examples import SymbolicExamples, inflated_symbols
+
+PATTERNS = ['', '0', '.', '0.*', '.*01', '(0|1)*011*', '0(1|0)*1+0', '01*0', '(01)*1', '0?1+', '(.*0.*)*', '.*1...',
+            '1.*(0|1)', '(0|2)*1']
+EXAMPLE_SETS = [set(), {''}, {'X'}, {'0X', '1'}, {'1XXXX', 'X1XXXX', 'XX1XXXX'}, {'0XX1', '1X0X', '2X0'}, {'XX'}]
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_agrees_with_inflation(pattern):
+  for examples in EXAMPLE_SETS:
+    for alphabet in ('01', '012'):
+      symbolic = SymbolicExamples(examples, alphabet)
+      inflated = inflate_all(examples, alphabet)
+      assert matches_all(pattern, symbolic) == matches_all(pattern, inflated), (examples, alphabet)
+      assert matches_any(pattern, symbolic) == matches_any(pattern, inflated), (examples, alphabet)
+      assert count_matches(pattern, symbolic) == count_matches(pattern, inflated), (examples, alphabet)
+      assert len(symbolic) == len(inflated)
+
+def test_overlapping_examples_count_twice():
+  examples = SymbolicExamples({'0X', '00'})
+  assert len(examples) == 3
+  assert count_matches('0.', examples) == 3
+  assert sorted(examples) == ['00', '0X']
+
+def test_inflated_symbols():
+  assert inflated_symbols(['0X', '1'], '01') == 2
+  assert inflated_symbols(['XXX'], '0123456789') == 3 * 999
+
+def test_search_keeps_large_inflations_symbolic(monkeypatch):
+  P = {'1XXXX', 'X1XXXX', 'XX1XXXX'}
+  N = {'0XXXX', 'X0XXXX', 'XX0XXXX'}
+  inflated = Search(P, N)
+  assert not isinstance(inflated.P, SymbolicExamples)
+  monkeypatch.setattr(search_module, 'MAX_INFLATED_SYMBOLS', 0)
+  symbolic = Search(P, N)
+  assert isinstance(symbolic.P, SymbolicExamples)
+  assert symbolic.run() == inflated.run() == '.*1....'
+  assert symbolic.expanded == inflated.expanded
+  # counting checks does not inflate the examples either
+  counted = Search(P, N, stats=SearchStats())
+  assert isinstance(counted.P.examples, SymbolicExamples)
+  assert counted.run() == '.*1....'
@@ -0,0 +1,15 @@
+'''
+tests for tie_breaks.py
+'''
+from main.search import Budget, TIE_BREAKS
+from main.tie_breaks import measure
+
+def test_measure():
+  results = measure(['../benchmarks/no01_start_with_0'], Budget(states=1000))
+  by_policy = results['../benchmarks/no01_start_with_0']
+  assert set(by_policy) == set(TIE_BREAKS)
+  assert all(pattern == '0.*' for _, pattern in by_policy.values())
+
+def test_measure_out_of_states():
+  results = measure(['../benchmarks/no07_zeros_divisible_by_3'], Budget(states=50))
+  assert set(results['../benchmarks/no07_zeros_divisible_by_3'].values()) == {(50, 'STATES')}
@@ -0,0 +1,40 @@
+'''
+tests for workload.py
+'''
+import re
+import pytest
+from main.helpers import inflate_all
+from main.main import read_examples
+from main.search import Budget
+from main.workload import Workload, generate, write_examples, sweep, chart
+
+def test_generate():
+  w = Workload(target='.*01', positive=30, negative=40, max_length=10, alphabet='012', seed=1)
+  P, N = generate(w)
+  assert len(P) == 30 and len(N) == 40
+  assert all(re.fullmatch('.*01', example) for example in P)
+  assert not any(re.fullmatch('.*01', example) for example in N)
+  assert all(set(example) <= set('012') for example in P | N)
+  assert generate(w) == (P, N)
+
+def test_generate_wildcards_keep_their_class():
+  w = Workload(target='0.*1', positive=20, negative=20, x_density=0.5, seed=2)
+  P, N = generate(w)
+  assert any('X' in example for example in P | N)
+  assert all(re.fullmatch('0.*1', example) for example in inflate_all(P, '01'))
+  assert not any(re.fullmatch('0.*1', example) for example in inflate_all(N, '01'))
+
+def test_generate_too_few():
+  with pytest.raises(ValueError):
+    generate(Workload(positive=100, max_length=3), max_attempts=10_000)
+
+def test_write_examples(tmp_path):
+  P, N = generate(Workload(positive=5, negative=5))
+  path = tmp_path / 'examples'
+  write_examples(str(path), 'ends with 01', P, N)
+  assert read_examples(str(path), verbose=False) == {'P': P, 'N': N}
+
+def test_sweep():
+  rows = sweep('count', [5, 10], Workload(), Budget(states=2000))
+  assert [row['pattern'] for row in rows] == ['.*01', '.*01']
+  assert len(chart(rows).splitlines()) == 2